@@ -0,0 +1,228 @@
+"""Banc d'essai des performances avec contrôle de régression.
+
+Exemples :
+    python -m benchmarks.run                      # mesure et affiche
+    python -m benchmarks.run --record             # enregistre la référence
+    python -m benchmarks.run --check --tolerance 0.3
+    python -m benchmarks.run --only startup.cold_import --scales small
+"""
+import argparse
+import contextlib
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime
+from pathlib import Path
+
+from benchmarks.synthetic import SCALES, generate_club
+from core.models import score_roster
+from services import analytics
+from services.reports import generate_player_pdf
+from storage import repository
+
+
+BASELINE_FILE = Path(__file__).with_name("baseline.json")
+
+BENCHMARKS = {}
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Ce qu'un démarrage à froid importe avant d'afficher la page par défaut (« Joueurs »).
+STARTUP_MODULES = ("ui.main", "ui.pages.players")
+# Dépendances lourdes qui ne doivent être chargées que par les pages qui s'en servent.
+HEAVY_MODULES = ("pandas", "reportlab", "pyarrow")
+
+
+def benchmark(name):
+    """Déclare un benchmark : `setup(data, workdir)` retourne l'opération à chronométrer."""
+
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+
+    return register
+
+
+@contextlib.contextmanager
+def _data_file(workdir):
+    previous = repository.DATA_FILE
+    repository.DATA_FILE = Path(workdir) / "u9_data.json"
+    try:
+        yield repository.DATA_FILE
+    finally:
+        repository.DATA_FILE = previous
+        repository.clear_load_cache()
+
+
+@benchmark("storage.save")
+def _bench_save(data, workdir):
+    return lambda: repository.save_data(data)
+
+
+@benchmark("storage.load")
+def _bench_load(data, workdir):
+    repository.save_data(data)
+
+    def run():
+        repository.clear_load_cache()
+        repository.load_data()
+
+    return run
+
+
+@benchmark("storage.load_cached")
+def _bench_load_cached(data, workdir):
+    repository.save_data(data)
+    repository.load_data()
+    return repository.load_data
+
+
+@benchmark("storage.add_performance")
+def _bench_add_performance(data, workdir):
+    repository.save_data(data)
+    loaded = repository.load_data()
+    match_id = loaded["matches"][0]["id"]
+    perf = dict(loaded["matches"][0]["performances"][0])
+    return lambda: repository.add_performance(loaded, match_id, dict(perf))
+
+
+@benchmark("analytics.dashboard")
+def _bench_dashboard(data, workdir):
+    today = date(2025, 6, 1)
+
+    def run():
+        analytics._cache.clear()
+        analytics.build_profile_rows(data)
+        analytics.aggregate_match_means(data)
+        df_all = analytics.get_all_match_performances(data)
+        analytics.aggregate_minutes(df_all)
+        analytics.compute_progress_deltas(df_all, today=today)
+
+    return run
+
+
+@benchmark("scoring.batch")
+def _bench_scoring(data, workdir):
+    return lambda: score_roster(data["players"])
+
+
+@benchmark("reports.player_pdf")
+def _bench_player_pdf(data, workdir):
+    player = data["players"][0]
+    return lambda: generate_player_pdf(player, data)
+
+
+def _import_in_fresh_interpreter(modules):
+    """Importe `modules` dans un nouvel interpréteur et retourne les modules lourds chargés."""
+    script = (
+        "import importlib, sys\n"
+        f"for name in {list(modules)!r}:\n"
+        "    importlib.import_module(name)\n"
+        f"print(','.join(m for m in {list(HEAVY_MODULES)!r} if m in sys.modules))\n"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", script], cwd=ROOT, check=True, capture_output=True, text=True,
+    ).stdout.strip()
+    return [name for name in output.split(",") if name]
+
+
+def startup_heavy_modules(modules=STARTUP_MODULES):
+    """Modules lourds (pandas, reportlab…) chargés par un démarrage à froid de l'application."""
+    return _import_in_fresh_interpreter(modules)
+
+
+@benchmark("startup.cold_import")
+def _bench_cold_import(data, workdir):
+    # Interpréteur neuf à chaque mesure : le temps inclut le lancement de Python,
+    # identique d'une version à l'autre, et tous les imports du chemin de démarrage.
+    return lambda: _import_in_fresh_interpreter(STARTUP_MODULES)
+
+
+def time_operation(operation, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        operation()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run_benchmarks(scales, names=None, repeat=5, seed=0, out=sys.stdout):
+    """Retourne {"nom[échelle]": secondes (meilleur de `repeat`)}."""
+    results = {}
+    for scale in scales:
+        data = generate_club(seed=seed, **SCALES[scale])
+        for name, setup in BENCHMARKS.items():
+            if names and name not in names:
+                continue
+            with tempfile.TemporaryDirectory() as workdir, _data_file(workdir):
+                operation = setup(data, workdir)
+                seconds = time_operation(operation, repeat)
+            key = f"{name}[{scale}]"
+            results[key] = seconds
+            print(f"{key:<40} {seconds * 1000:10.2f} ms", file=out)
+    return results
+
+
+def record_baseline(results, path=BASELINE_FILE):
+    payload = {
+        "recorded_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+    Path(path).write_text(json.dumps(payload, indent=2, sort_keys=True), encoding="utf-8")
+
+
+def find_regressions(results, baseline, tolerance):
+    """Liste (clé, référence, mesure) des benchmarks plus lents que la référence × (1 + tolérance)."""
+    regressions = []
+    for key, seconds in results.items():
+        reference = baseline.get(key)
+        if reference is not None and seconds > reference * (1 + tolerance):
+            regressions.append((key, reference, seconds))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", default="small,medium", help="échelles séparées par des virgules")
+    parser.add_argument("--only", default="", help="benchmarks à lancer, séparés par des virgules")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", type=Path, default=BASELINE_FILE)
+    parser.add_argument("--record", action="store_true", help="enregistrer les mesures comme référence")
+    parser.add_argument("--check", action="store_true", help="échouer en cas de régression")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="marge tolérée (0.25 = +25 %%)")
+    args = parser.parse_args(argv)
+
+    scales = [s for s in args.scales.split(",") if s]
+    names = [n for n in args.only.split(",") if n] or None
+    results = run_benchmarks(scales, names=names, repeat=args.repeat, seed=args.seed)
+
+    if args.record:
+        record_baseline(results, args.baseline)
+        print(f"Référence enregistrée dans {args.baseline}")
+
+    if args.check:
+        if not args.baseline.exists():
+            print(f"Aucune référence ({args.baseline}) : lancer d'abord --record", file=sys.stderr)
+            return 2
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))["results"]
+        regressions = find_regressions(results, baseline, args.tolerance)
+        for key, reference, seconds in regressions:
+            print(
+                f"RÉGRESSION {key}: {reference * 1000:.2f} ms -> {seconds * 1000:.2f} ms",
+                file=sys.stderr,
+            )
+        if regressions:
+            return 1
+        print(f"Aucune régression au-delà de {args.tolerance:.0%}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
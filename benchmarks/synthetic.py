@@ -0,0 +1,110 @@
+"""Générateur déterministe de données de club synthétiques (même format que u9_data.json)."""
+import random
+from datetime import date, timedelta
+
+from core.constants import POSITION_WEIGHTS, SKILLS
+
+
+FIRST_NAMES = [
+    "Adam", "Léa", "Noé", "Inès", "Louis", "Jade", "Gabriel", "Chloé", "Raphaël", "Zoé",
+    "Arthur", "Lina", "Jules", "Emma", "Hugo", "Manon", "Nathan", "Camille", "Théo", "Élise",
+]
+LAST_NAMES = [
+    "Martin", "Bernard", "Dubois", "Thomas", "Robert", "Richard", "Petit", "Durand",
+    "Leroy", "Moreau", "Simon", "Laurent", "Lefèvre", "Michel", "Garcia", "Bonnet",
+]
+TRAINING_TYPES = ["Technique", "Physique", "Match / Jeu", "Coordination / Motricité", "Autre"]
+COMPETITIONS = ["Plateau", "Amical", "Tournoi", "Festival foot"]
+
+# Tailles prédéfinies utilisées par le banc d'essai.
+SCALES = {
+    "small": dict(players=15, matches=20, perfs_per_match=8, trainings=40, attendance_density=0.85),
+    "medium": dict(players=60, matches=120, perfs_per_match=10, trainings=200, attendance_density=0.8),
+    "large": dict(players=250, matches=600, perfs_per_match=12, trainings=900, attendance_density=0.75),
+}
+
+
+def generate_club(
+    seed=0,
+    players=15,
+    matches=20,
+    perfs_per_match=8,
+    trainings=40,
+    attendance_density=0.85,
+    start=date(2022, 9, 1),
+):
+    """Construit un jeu de données reproductible pour une graine et une taille données.
+
+    `attendance_density` est la proportion de joueurs ayant une fiche de
+    présence à chaque séance.
+    """
+    rng = random.Random(seed)
+    positions = list(POSITION_WEIGHTS)
+
+    player_list = []
+    for player_id in range(1, players + 1):
+        player_list.append(
+            {
+                "id": player_id,
+                "name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                "birth_year": rng.choice([2015, 2016, 2017]),
+                "preferred_position": rng.choice(positions + [None]),
+                "foot": rng.choice(["Droit", "Gauche", "Ambidextre", None]),
+                "base_ratings": {
+                    skill: rng.randint(1, 5) for skill in SKILLS if rng.random() < 0.9
+                },
+            }
+        )
+
+    days_span = 3 * 365
+    match_list = []
+    for match_id in range(1, matches + 1):
+        squad = rng.sample(player_list, min(perfs_per_match, players))
+        match_list.append(
+            {
+                "id": match_id,
+                "date": (start + timedelta(days=rng.randrange(days_span))).isoformat(),
+                "opponent": f"FC {rng.choice(LAST_NAMES)}",
+                "competition": rng.choice(COMPETITIONS),
+                "performances": [
+                    {
+                        "player_id": p["id"],
+                        "position": rng.choice(positions),
+                        "minutes": rng.choice([10, 20, 30, 40]),
+                        "tech": rng.randint(1, 5),
+                        "phys": rng.randint(1, 5),
+                        "tact": rng.randint(1, 5),
+                        "mental": rng.randint(1, 5),
+                        "goals": rng.choice([0, 0, 0, 1, 2]),
+                        "assists": rng.choice([0, 0, 1]),
+                        "comment": "",
+                    }
+                    for p in squad
+                ],
+            }
+        )
+
+    training_list = []
+    for training_id in range(1, trainings + 1):
+        training_list.append(
+            {
+                "id": training_id,
+                "date": (start + timedelta(days=rng.randrange(days_span))).isoformat(),
+                "theme": rng.choice(SKILLS),
+                "type": rng.choice(TRAINING_TYPES),
+                "notes": "",
+                "attendances": [
+                    {
+                        "player_id": p["id"],
+                        "present": rng.random() < 0.9,
+                        "effort": rng.randint(1, 5),
+                        "focus": rng.randint(1, 5),
+                        "comment": "",
+                    }
+                    for p in player_list
+                    if rng.random() < attendance_density
+                ],
+            }
+        )
+
+    return {"players": player_list, "matches": match_list, "trainings": training_list}
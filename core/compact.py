@@ -0,0 +1,302 @@
+"""Modèle compact en mémoire : entités à slots, perfs et présences en colonnes typées.
+
+`freeze(data)` convertit les données JSON chargées ; `thaw` / `to_data`
+redonnent exactement les mêmes dictionnaires. Entités et lignes se lisent
+comme des dictionnaires (`match["date"]`, `perf.get("tech")`) mais sont en
+lecture seule : pour modifier, on repasse par `thaw`. Une entité ou une
+ligne qui ne suit pas le format produit par l'application (clé en plus ou
+en moins, autre ordre, valeur d'un autre type) est gardée telle quelle.
+
+`thaw` copie : l'entité compacte, ses colonnes et les vues de lignes déjà
+distribuées ne changent jamais et gardent les valeurs d'avant l'écriture.
+Après une écriture, l'appelant relit l'enregistrement par le repository
+(`find_match`, `find_training`…) au lieu de réutiliser ce qu'il tenait.
+"""
+from array import array
+from collections import abc
+
+from core.models import POSITIONS, Match, Player, Training
+
+
+# Valeur stockée pour un poste : indice dans POSITIONS, -1 pour aucun poste.
+_POSITION_CODES = {None: -1, **{position: code for code, position in enumerate(POSITIONS)}}
+_POSITION_BY_CODE = (*POSITIONS, None)
+
+# Type de colonne → (code d'array ou None pour une liste, type Python accepté, décodage ou None).
+_KINDS = {
+    "int8": ("b", int, None),
+    "int16": ("h", int, None),
+    "int32": ("i", int, None),
+    "bool": ("b", bool, bool),
+    "position": ("b", None, _POSITION_BY_CODE.__getitem__),
+    "str": (None, str, None),
+}
+
+
+def _encode_column(kind, values):
+    """Valeurs prêtes à stocker, ou None si l'une d'elles ne rentre pas dans ce type de colonne."""
+    typecode, pytype, _ = _KINDS[kind]
+    if pytype is None:
+        try:
+            values = [_POSITION_CODES[value] for value in values]
+        except (KeyError, TypeError):
+            return None
+    elif not set(map(type, values)) <= {pytype}:
+        return None
+    if typecode is None:
+        return values
+    try:
+        return array(typecode, values)
+    except OverflowError:
+        return None
+
+
+class _RowView(abc.Mapping):
+    """Une ligne d'un bloc de colonnes, lue comme un dictionnaire."""
+
+    __slots__ = ("_columns", "_index")
+
+    def __init__(self, columns, index):
+        self._columns = columns
+        self._index = index
+
+    def __getitem__(self, key):
+        return self._columns.value(self._index, key)
+
+    def __iter__(self):
+        return iter(self._columns.FIELDS)
+
+    def __len__(self):
+        return len(self._columns.FIELDS)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class _Columns(abc.Sequence):
+    """Lignes de même format stockées colonne par colonne (arrays d'entiers, liste de textes)."""
+
+    FIELDS = {}
+
+    __slots__ = ("_cols", "_extra", "_length")
+
+    def __init__(self, rows=()):
+        self._cols = {
+            name: (array(_KINDS[kind][0]) if _KINDS[kind][0] else [])
+            for name, kind in self.FIELDS.items()
+        }
+        self._extra = None
+        self._length = 0
+        rows = list(rows)
+        if not self._extend_uniform(rows):
+            for row in rows:
+                self._append(row)
+
+    def _extend_uniform(self, rows):
+        """Chemin rapide, colonne par colonne, quand toutes les lignes sont au format."""
+        fields = list(self.FIELDS)
+        if not all(type(row) is dict and list(row) == fields for row in rows):
+            return False
+        columns = {}
+        for name, kind in self.FIELDS.items():
+            column = _encode_column(kind, [row[name] for row in rows])
+            if column is None:
+                return False
+            columns[name] = column
+        self._cols = columns
+        self._length = len(rows)
+        return True
+
+    def _append(self, row):
+        fields = list(self.FIELDS)
+        encoded = None
+        if type(row) is dict and list(row) == fields:
+            encoded = [_encode_column(kind, [row[name]]) for name, kind in self.FIELDS.items()]
+        if encoded is not None and all(value is not None for value in encoded):
+            for name, value in zip(fields, encoded):
+                self._cols[name].extend(value)
+        else:
+            # Ligne hors format : valeurs neutres dans les colonnes, original à part.
+            for name, kind in self.FIELDS.items():
+                self._cols[name].append("" if kind == "str" else 0)
+            if self._extra is None:
+                self._extra = {}
+            self._extra[self._length] = row
+        self._length += 1
+
+    def value(self, index, key):
+        column = self._cols.get(key)
+        if column is None:
+            raise KeyError(key)
+        decode = _KINDS[self.FIELDS[key]][2]
+        return column[index] if decode is None else decode(column[index])
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._length))]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError(index)
+        if self._extra is not None and index in self._extra:
+            return self._extra[index]
+        return _RowView(self, index)
+
+    def __eq__(self, other):
+        if not isinstance(other, (list, tuple, _Columns)):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(self.to_list())
+
+    def iter_tuples(self, fields, defaults=None):
+        """Tuples des champs demandés, ligne par ligne, sans créer de dictionnaire."""
+        if self._extra is not None:
+            return iter_rows(list(self), fields, defaults)
+        return zip(*self.iter_columns(fields))
+
+    def iter_columns(self, fields, defaults=None):
+        """Un itérable de valeurs par champ demandé (les colonnes elles-mêmes si possible)."""
+        if self._extra is not None:
+            return iter_columns(list(self), fields, defaults)
+        columns = []
+        for name in fields:
+            decode = _KINDS[self.FIELDS[name]][2]
+            columns.append(self._cols[name] if decode is None else map(decode, self._cols[name]))
+        return columns
+
+    def to_list(self):
+        if self._extra is None:
+            fields = list(self.FIELDS)
+            return [dict(zip(fields, values)) for values in self.iter_tuples(fields)]
+        return [row if type(row) is dict else dict(row) for row in self]
+
+
+class PerformanceColumns(_Columns):
+    FIELDS = {
+        "player_id": "int32",
+        "position": "position",
+        "minutes": "int16",
+        "tech": "int8",
+        "phys": "int8",
+        "tact": "int8",
+        "mental": "int8",
+        "goals": "int16",
+        "assists": "int16",
+        "comment": "str",
+    }
+
+    __slots__ = ()
+
+
+class AttendanceColumns(_Columns):
+    FIELDS = {
+        "player_id": "int32",
+        "present": "bool",
+        "effort": "int8",
+        "focus": "int8",
+        "comment": "str",
+    }
+
+    __slots__ = ()
+
+
+def iter_rows(rows, fields, defaults=None):
+    """Tuples des champs demandés pour une liste de dictionnaires ou un bloc de colonnes.
+
+    Un champ absent prend sa valeur dans `defaults` s'il y figure, sinon lève KeyError.
+    """
+    if isinstance(rows, _Columns):
+        return rows.iter_tuples(fields, defaults)
+    if not defaults:
+        return (tuple(row[name] for name in fields) for row in rows)
+    return (
+        tuple(row.get(name, defaults[name]) if name in defaults else row[name] for name in fields)
+        for row in rows
+    )
+
+
+def iter_columns(rows, fields, defaults=None):
+    """Comme `iter_rows`, mais un itérable de valeurs par champ plutôt qu'un tuple par ligne."""
+    if isinstance(rows, _Columns):
+        return rows.iter_columns(fields, defaults)
+    rows = list(iter_rows(rows, fields, defaults))
+    return [[row[i] for row in rows] for i in range(len(fields))]
+
+
+# Classe d'entité → (clés attendues dans l'ordre, colonnes de la sous-liste, nom de la sous-liste).
+_ENTITIES = {
+    Player: (list(Player.__dataclass_fields__), None, None),
+    Match: (list(Match.__dataclass_fields__), PerformanceColumns, "performances"),
+    Training: (list(Training.__dataclass_fields__), AttendanceColumns, "attendances"),
+}
+
+_COLLECTIONS = {"players": Player, "matches": Match, "trainings": Training}
+
+
+def _freeze_entity(cls, item):
+    keys, columns, rows_key = _ENTITIES[cls]
+    if type(item) is not dict or list(item) != keys:
+        return item
+    values = dict(item)
+    if rows_key is not None:
+        if type(values[rows_key]) is not list:
+            return item
+        values[rows_key] = columns(values[rows_key])
+    return cls(**values)
+
+
+def freeze(data):
+    """Remplace sur place les listes de `data` par leurs versions compactes ; retourne `data`."""
+    for name, cls in _COLLECTIONS.items():
+        if name in data:
+            data[name] = [_freeze_entity(cls, item) for item in data[name]]
+    return data
+
+
+def snapshot(data):
+    """Copie figée de `data` : listes neuves et entités compactes (en lecture seule).
+
+    Les entités déjà compactes sont partagées, les autres sont converties :
+    un autre thread peut lire la copie pendant que `data` est modifié.
+    """
+    return freeze({name: list(data.get(name, [])) for name in _COLLECTIONS})
+
+
+def thaw(item):
+    """Dictionnaire modifiable équivalent à une entité (compacte ou non).
+
+    C'est une copie : `item` et ses vues de lignes restent inchangés.
+    """
+    if type(item) is dict:
+        return item
+    values = dict(item)
+    for rows_key in ("performances", "attendances"):
+        rows = values.get(rows_key)
+        if isinstance(rows, _Columns):
+            values[rows_key] = rows.to_list()
+    return values
+
+
+def to_data(data):
+    """Copie de `data` en dictionnaires et listes ordinaires (identique au JSON d'origine)."""
+    plain = dict(data)
+    for name in _COLLECTIONS:
+        if name in plain:
+            plain[name] = [thaw(item) for item in plain[name]]
+    return plain
+
+
+def json_default(obj):
+    """Pour `json.dump(..., default=json_default)` : sérialise les vues compactes."""
+    if isinstance(obj, _Columns):
+        return obj.to_list()
+    if isinstance(obj, abc.Mapping):
+        return dict(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
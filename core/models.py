@@ -1,12 +1,32 @@
 """Core dataclasses and scoring helpers."""
+from collections import abc
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Mapping, MutableMapping, Optional
+from typing import Any, Dict, List, Mapping, MutableMapping, Optional, Sequence, Tuple
 
-from core.constants import POSITION_WEIGHTS
+import numpy as np
 
+from core.constants import POSITION_WEIGHTS, SKILLS
 
-@dataclass
-class Player:
+
+class _RecordMapping(abc.Mapping):
+    """Lecture façon dictionnaire (`player["name"]`, `match.get("date")`), dans l'ordre du JSON."""
+
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        if key not in self.__dataclass_fields__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self):
+        return iter(self.__dataclass_fields__)
+
+    def __len__(self):
+        return len(self.__dataclass_fields__)
+
+
+@dataclass(eq=False, slots=True)
+class Player(_RecordMapping):
     id: int
     name: str
     birth_year: int
@@ -15,23 +35,25 @@ class Player:
     base_ratings: Dict[str, int] = field(default_factory=dict)
 
 
-@dataclass
-class Match:
+@dataclass(eq=False, slots=True)
+class Match(_RecordMapping):
     id: int
     date: str
     opponent: str
     competition: str
-    performances: List[Dict[str, Any]] = field(default_factory=list)
+    # Liste de dictionnaires, ou colonnes typées (`core.compact.PerformanceColumns`).
+    performances: Sequence[Mapping[str, Any]] = field(default_factory=list)
 
 
-@dataclass
-class Training:
+@dataclass(eq=False, slots=True)
+class Training(_RecordMapping):
     id: int
     date: str
     theme: str
     type: str
     notes: str = ""
-    attendances: List[Dict[str, Any]] = field(default_factory=list)
+    # Liste de dictionnaires, ou colonnes typées (`core.compact.AttendanceColumns`).
+    attendances: Sequence[Mapping[str, Any]] = field(default_factory=list)
 
 
 def _get_base_ratings(player: Any) -> Mapping[str, int]:
@@ -42,19 +64,55 @@ def _get_base_ratings(player: Any) -> Mapping[str, int]:
     return {}
 
 
-def compute_position_scores(player: Any) -> Dict[str, Optional[float]]:
-    ratings = _get_base_ratings(player)
-    scores: Dict[str, Optional[float]] = {}
-    for pos, weights in POSITION_WEIGHTS.items():
-        num = 0
-        den = 0
+def _compile_weight_matrix():
+    """Matrice postes × compétences des poids (> 0), compilée une seule fois."""
+    skills = list(dict.fromkeys(SKILLS + [s for w in POSITION_WEIGHTS.values() for s in w]))
+    matrix = np.zeros((len(POSITION_WEIGHTS), len(skills)))
+    for i, weights in enumerate(POSITION_WEIGHTS.values()):
         for skill, weight in weights.items():
-            note = ratings.get(skill)
-            if note is not None and weight > 0:
-                num += note * weight
-                den += weight
-        scores[pos] = round(num / den, 2) if den > 0 else None
-    return scores
+            if weight > 0:
+                matrix[i, skills.index(skill)] = weight
+    return skills, matrix
+
+
+POSITIONS = list(POSITION_WEIGHTS)
+_SKILL_ORDER, _WEIGHT_MATRIX = _compile_weight_matrix()
+
+
+def score_roster(
+    players: Sequence[Any],
+) -> Tuple[List[Dict[str, Optional[float]]], List[Optional[str]]]:
+    """Scores par poste et poste recommandé de tout un effectif, en un produit matriciel.
+
+    Une compétence non notée est exclue du numérateur et du dénominateur,
+    comme dans `compute_position_scores`.
+    """
+    if not players:
+        return [], []
+    ratings = np.array(
+        [[_get_base_ratings(p).get(skill) for skill in _SKILL_ORDER] for p in players],
+        dtype=float,
+    )
+    present = ~np.isnan(ratings)
+    num = np.where(present, ratings, 0.0) @ _WEIGHT_MATRIX.T
+    den = present.astype(float) @ _WEIGHT_MATRIX.T
+    with np.errstate(invalid="ignore", divide="ignore"):
+        raw = np.where(den > 0, num / den, np.nan)
+
+    rounded = [[None if np.isnan(v) else round(float(v), 2) for v in row] for row in raw]
+    ranked = np.array([[-np.inf if v is None else v for v in row] for row in rounded])
+    best_idx = ranked.argmax(axis=1)
+
+    all_scores = [dict(zip(POSITIONS, row)) for row in rounded]
+    best = [
+        POSITIONS[idx] if row[idx] is not None else None
+        for idx, row in zip(best_idx, rounded)
+    ]
+    return all_scores, best
+
+
+def compute_position_scores(player: Any) -> Dict[str, Optional[float]]:
+    return score_roster([player])[0][0]
 
 
 def best_position_from_scores(scores: Mapping[str, Optional[float]]) -> Optional[str]:
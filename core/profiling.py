@@ -0,0 +1,192 @@
+"""Profilage léger : durées (spans), compteurs et octets lus / écrits.
+
+Désactivé par défaut. `U9_PROFILE=1` (ou `enable()`) l'active pour tout le
+processus ; `session(session_id)` ne l'active que pour le thread courant, et
+les mesures sont alors étiquetées avec cette session (une session Streamlit
+ne voit que les siennes). Sans profilage actif, chaque point de mesure se
+réduit à un test de booléen.
+"""
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+
+# Nombre de spans gardés en mémoire (les plus anciens sont oubliés).
+MAX_SPANS = 5000
+
+_enabled = os.environ.get("U9_PROFILE", "") not in ("", "0")
+_lock = threading.Lock()
+_spans = deque(maxlen=MAX_SPANS)
+_counters = {}
+_local = threading.local()
+# Nombre de blocs `session()` ouverts, tous threads confondus.
+_active_sessions = 0
+
+
+def is_enabled():
+    """Vrai si les mesures du thread courant sont enregistrées."""
+    return _enabled or (_active_sessions > 0 and getattr(_local, "session", None) is not None)
+
+
+def current_session():
+    return getattr(_local, "session", None)
+
+
+@contextlib.contextmanager
+def session(session_id):
+    """Active le profilage pour le thread courant, mesures étiquetées `session_id`."""
+    global _active_sessions
+    previous = getattr(_local, "session", None)
+    _local.session = session_id
+    with _lock:
+        _active_sessions += 1
+    try:
+        yield
+    finally:
+        with _lock:
+            _active_sessions -= 1
+        _local.session = previous
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def reset(session=None):
+    """Efface les mesures ; seulement celles de `session` si elle est donnée."""
+    with _lock:
+        if session is None:
+            _spans.clear()
+            _counters.clear()
+            return
+        kept = [record for record in _spans if record.get("session") != session]
+        _spans.clear()
+        _spans.extend(kept)
+        for key in [key for key in _counters if key[0] == session]:
+            del _counters[key]
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("name", "attrs", "start", "parent")
+
+    def __init__(self, name, attrs):
+        self.name = name
+        self.attrs = attrs
+
+    def __enter__(self):
+        stack = _local.__dict__.setdefault("stack", [])
+        self.parent = stack[-1] if stack else None
+        stack.append(self.name)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        duration = time.perf_counter() - self.start
+        _local.stack.pop()
+        record = {
+            "name": self.name,
+            "parent": self.parent,
+            "start": time.time() - duration,
+            "ms": round(duration * 1000, 3),
+            "thread": threading.current_thread().name,
+            "session": current_session(),
+        }
+        if exc_type is not None:
+            record["error"] = exc_type.__name__
+        if self.attrs:
+            record.update(self.attrs)
+        with _lock:
+            _spans.append(record)
+        return False
+
+
+def span(name, **attrs):
+    """Mesure la durée du bloc `with` (sans effet si le profilage est désactivé)."""
+    if not is_enabled():
+        return _NULL_SPAN
+    return _Span(name, attrs)
+
+
+def profiled(name):
+    """Décorateur : un span par appel de la fonction."""
+
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not is_enabled():
+                return func(*args, **kwargs)
+            with _Span(name, None):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def count(name, value=1):
+    """Incrémente un compteur (appels, octets…)."""
+    if not is_enabled():
+        return
+    key = (current_session(), name)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def spans(session=None):
+    """Spans enregistrés ; seulement ceux de `session` si elle est donnée."""
+    with _lock:
+        return [record for record in _spans if session is None or record["session"] == session]
+
+
+def counters(session=None):
+    """Compteurs par nom (toutes sessions additionnées, ou seulement `session`)."""
+    totals = {}
+    with _lock:
+        for (owner, name), value in _counters.items():
+            if session is None or owner == session:
+                totals[name] = totals.get(name, 0) + value
+    return totals
+
+
+def summary(session=None):
+    """Par nom de span : nombre d'appels, durée totale, moyenne et maximale (ms), triés par total."""
+    totals = {}
+    for record in spans(session):
+        entry = totals.setdefault(record["name"], {"name": record["name"], "calls": 0, "total_ms": 0.0, "max_ms": 0.0})
+        entry["calls"] += 1
+        entry["total_ms"] += record["ms"]
+        entry["max_ms"] = max(entry["max_ms"], record["ms"])
+    rows = sorted(totals.values(), key=lambda entry: entry["total_ms"], reverse=True)
+    for entry in rows:
+        entry["total_ms"] = round(entry["total_ms"], 3)
+        entry["mean_ms"] = round(entry["total_ms"] / entry["calls"], 3)
+    return rows
+
+
+def dump_jsonl(fileobj, session=None):
+    """Écrit les spans puis les compteurs, une ligne JSON chacun, pour analyse hors ligne."""
+    for record in spans(session):
+        fileobj.write(json.dumps({"type": "span", **record}, ensure_ascii=False) + "\n")
+    for name, value in sorted(counters(session).items()):
+        fileobj.write(json.dumps({"type": "counter", "name": name, "value": value}, ensure_ascii=False) + "\n")
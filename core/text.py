@@ -0,0 +1,8 @@
+"""Comparaison de textes saisis : noms de joueurs, en-têtes de colonnes."""
+import unicodedata
+
+
+def fold(text):
+    """Minuscules sans accents ni espaces superflus : 'Poste joué ' → 'poste joue'."""
+    decomposed = unicodedata.normalize("NFKD", str(text))
+    return " ".join("".join(c for c in decomposed if not unicodedata.combining(c)).casefold().split())
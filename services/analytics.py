@@ -1,48 +1,279 @@
+import functools
+import threading
+from collections import OrderedDict
+
+import numpy as np
 import pandas as pd
-from datetime import date, timedelta
+from datetime import date
 
-from core.models import best_position_from_scores, compute_position_scores
+from core import profiling
+from core.compact import iter_rows
+from core.models import score_roster
+from services import columnar
+from services.progression import ProgressionEngine
 from storage import repository as repo
+from storage.aggregates import FIELDS as TOTAL_FIELDS
 
 
-def get_all_match_performances(data):
-    """Retourne un DataFrame avec toutes les perfs de match, une ligne par joueur/match."""
-    rows = []
-    for match in data.get("matches", []):
-        match_date = pd.to_datetime(match["date"]).date()
-        for perf in match.get("performances", []):
-            player = repo.find_player(data, perf["player_id"])
-            if not player:
+class AnalyticsCache:
+    """Cache LRU borné des résultats d'analytics, indexé par révision des données."""
+
+    def __init__(self, maxsize=64):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key, compute):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+        value = compute()
+        with self._lock:
+            self._entries[key] = value
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+    def peek(self, key):
+        with self._lock:
+            return self._entries.get(key)
+
+    def invalidate_revision(self, revision):
+        with self._lock:
+            for key in [k for k in self._entries if k[1] == revision]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+            }
+
+
+_cache = AnalyticsCache()
+repo.add_change_listener(_cache.invalidate_revision)
+
+
+def cache_stats():
+    return _cache.stats()
+
+
+def cached_on_data(func):
+    """Met en cache `func(data, ...)` tant que la révision des données ne change pas."""
+
+    @functools.wraps(func)
+    @profiling.profiled(f"analytics.{func.__name__}")
+    def wrapper(data, *args):
+        key = (func.__name__, repo.data_revision(data), args)
+        return _cache.get_or_compute(key, lambda: func(data, *args))
+
+    return wrapper
+
+
+def _cached_on_frame(func):
+    """Met en cache `func(df_all, ...)` quand `df_all` est le DataFrame partagé du cache.
+
+    Un DataFrame filtré ou modifié par l'appelant n'est jamais mis en cache.
+    """
+
+    @functools.wraps(func)
+    @profiling.profiled(f"analytics.{func.__name__}")
+    def wrapper(df_all, *args, **kwargs):
+        revision = df_all.attrs.get("data_revision")
+        shared = _cache.peek(("get_all_match_performances", revision, ()))
+        if revision is None or shared is not df_all:
+            return func(df_all, *args, **kwargs)
+        key = (func.__name__, revision, args + tuple(sorted(kwargs.items())))
+        return _cache.get_or_compute(key, lambda: func(df_all, *args, **kwargs))
+
+    return wrapper
+
+
+RATING_COLUMNS = ["Tech", "Phys", "Tact", "Mental"]
+
+# Colonnes du DataFrame des perfs de match, dans l'ordre d'affichage.
+PERFORMANCE_COLUMNS = [
+    "Joueur", "player_id", "date", "overall", "Tech", "Phys", "Tact", "Mental",
+    "Minutes", "Buts", "Passes", "match_id", "adversaire", "competition",
+]
+
+_CATEGORICAL_COLUMNS = ["Joueur", "adversaire", "competition"]
+_COMPACT_DTYPES = {
+    "player_id": "int32",
+    "match_id": "int32",
+    "Tech": "int8",
+    "Phys": "int8",
+    "Tact": "int8",
+    "Mental": "int8",
+    "Minutes": "int16",
+    "Buts": "int16",
+    "Passes": "int16",
+}
+
+
+def _as_columnar(df):
+    """Types compacts : catégories pour les libellés, petits entiers, dates datetime64."""
+    df["date"] = pd.to_datetime(df["date"])
+    for col in _CATEGORICAL_COLUMNS:
+        df[col] = df[col].astype("category")
+    return df.astype(_COMPACT_DTYPES)
+
+
+_FRAME_FIELDS = ("player_id", "tech", "phys", "tact", "mental", "minutes", "goals", "assists")
+
+
+def build_performance_frame(data):
+    """Construit en une seule passe le DataFrame colonnaire de toutes les perfs de match.
+
+    Les noms sont joints via un dictionnaire id → nom et les dates des matchs
+    sont converties en un seul appel vectorisé.
+    """
+    names = {p["id"]: p["name"] for p in data.get("players", [])}
+    match_dates = []
+    columns = {
+        "Joueur": [], "player_id": [], "Tech": [], "Phys": [], "Tact": [], "Mental": [],
+        "Minutes": [], "Buts": [], "Passes": [], "match_id": [], "adversaire": [], "competition": [],
+    }
+    row_match = []
+    for match_pos, match in enumerate(data.get("matches", [])):
+        match_dates.append(match["date"])
+        for player_id, tech, phys, tact, mental, minutes, goals, assists in iter_rows(
+            match.get("performances", []), _FRAME_FIELDS
+        ):
+            name = names.get(player_id)
+            if name is None:
                 continue
-            overall = (perf["tech"] + perf["phys"] + perf["tact"] + perf["mental"]) / 4
-            rows.append(
-                {
-                    "Joueur": player["name"],
-                    "player_id": player["id"],
-                    "date": match_date,
-                    "overall": overall,
-                    "Tech": perf["tech"],
-                    "Phys": perf["phys"],
-                    "Tact": perf["tact"],
-                    "Mental": perf["mental"],
-                    "Minutes": perf["minutes"],
-                    "Buts": perf["goals"],
-                    "Passes": perf["assists"],
-                    "match_id": match["id"],
-                    "adversaire": match["opponent"],
-                    "competition": match["competition"],
-                }
-            )
+            row_match.append(match_pos)
+            columns["Joueur"].append(name)
+            columns["player_id"].append(player_id)
+            columns["Tech"].append(tech)
+            columns["Phys"].append(phys)
+            columns["Tact"].append(tact)
+            columns["Mental"].append(mental)
+            columns["Minutes"].append(minutes)
+            columns["Buts"].append(goals)
+            columns["Passes"].append(assists)
+            columns["match_id"].append(match["id"])
+            columns["adversaire"].append(match["opponent"])
+            columns["competition"].append(match["competition"])
+
+    if not row_match:
+        return pd.DataFrame()
+
+    dates = pd.to_datetime(pd.Series(match_dates)).to_numpy()[np.asarray(row_match)]
+    df = pd.DataFrame(columns)
+    df.insert(2, "date", dates)
+    df.insert(3, "overall", df[RATING_COLUMNS].sum(axis=1) / 4)
+    return _as_columnar(df)
+
+
+# Tables du snapshot colonnaire lues pour construire le DataFrame des perfs.
+_SNAPSHOT_TABLES = ("players", "matches", "performances")
+
+# Colonne du DataFrame des perfs → colonne de la table "performances".
+_SNAPSHOT_COLUMNS = {
+    "Tech": "tech", "Phys": "phys", "Tact": "tact", "Mental": "mental",
+    "Minutes": "minutes", "Buts": "goals", "Passes": "assists",
+}
+
+
+def performance_frame_from_tables(tables):
+    """Même DataFrame que `build_performance_frame`, à partir des tables du snapshot colonnaire."""
+    players = tables["players"]
+    names = dict(zip(players.column("id").to_pylist(), players.column("name").to_pylist()))
+    perfs = tables["performances"].select(["match_id", "player_id", *_SNAPSHOT_COLUMNS.values()]).to_pandas()
+    joueur = perfs["player_id"].map(names)
+    perfs = perfs[joueur.notna()]
+    if perfs.empty:
+        return pd.DataFrame()
+
+    matches = tables["matches"].to_pandas()
+    rows = pd.Index(matches["id"]).get_indexer(perfs["match_id"])
+    columns = {"Joueur": joueur[perfs.index].to_numpy(), "player_id": perfs["player_id"].to_numpy("int64")}
+    columns.update({label: perfs[field].to_numpy("int64") for label, field in _SNAPSHOT_COLUMNS.items()})
+    columns["match_id"] = perfs["match_id"].to_numpy("int64")
+    columns["adversaire"] = matches["opponent"].to_numpy(object)[rows]
+    columns["competition"] = matches["competition"].astype(object).to_numpy()[rows]
+
+    df = pd.DataFrame(columns)
+    # Dates repassées en texte ISO pour être converties exactement comme dans `build_performance_frame`.
+    dates = pd.Series(tables["matches"].column("date").cast("string").to_numpy(zero_copy_only=False))
+    df.insert(2, "date", pd.to_datetime(dates).to_numpy()[rows])
+    df.insert(3, "overall", df[RATING_COLUMNS].sum(axis=1) / 4)
+    return _as_columnar(df)
+
+
+@cached_on_data
+def get_all_match_performances(data):
+    """Retourne un DataFrame avec toutes les perfs de match, une ligne par joueur/match.
+
+    Pour les données chargées depuis le fichier, le DataFrame est relu depuis
+    le snapshot colonnaire s'il est à jour (démarrage à froid).
+    Le DataFrame est partagé via le cache : ne pas le modifier en place.
+    """
+    tables = columnar.snapshot_tables(data, _SNAPSHOT_TABLES)
+    df = build_performance_frame(data) if tables is None else performance_frame_from_tables(tables)
+    df.attrs["data_revision"] = repo.data_revision(data)
+    return df
+
+
+def get_match_performances_from_store(store, start=None, end=None, player_ids=None):
+    """Même DataFrame que `get_all_match_performances`, filtré directement en SQL.
+
+    `store` est un `storage.sqlite_repository.SqliteRepository` ; `start` / `end`
+    bornent la date du match (incluses), `player_ids` restreint les joueurs.
+    """
+    rows = store.query_performances(start=start, end=end, player_ids=player_ids)
     if not rows:
         return pd.DataFrame()
-    return pd.DataFrame(rows)
+    return _as_columnar(pd.DataFrame.from_records(rows, columns=PERFORMANCE_COLUMNS))
 
 
+def performances_between(data, start=None, end=None, store=None):
+    """Perfs de match dont la date est entre `start` et `end` (incluses, bornes optionnelles).
+
+    Sans borne, c'est le DataFrame partagé de `get_all_match_performances`.
+    Avec un `store` SQLite, le filtre est fait en SQL ; sinon sur le
+    DataFrame en mémoire. Le résultat est mis en cache par révision.
+    """
+    if start is None and end is None:
+        return get_all_match_performances(data)
+
+    def compute():
+        if store is not None:
+            return get_match_performances_from_store(store, start=start, end=end)
+        df_all = get_all_match_performances(data)
+        mask = pd.Series(True, index=df_all.index)
+        if start is not None:
+            mask &= df_all["date"] >= pd.Timestamp(start)
+        if end is not None:
+            mask &= df_all["date"] <= pd.Timestamp(end)
+        return df_all.loc[mask].reset_index(drop=True)
+
+    key = ("performances_between", repo.data_revision(data), (str(start), str(end), store is not None))
+    return _cache.get_or_compute(key, compute)
+
+
+@cached_on_data
 def build_profile_rows(data):
     rows = []
-    for player in data.get("players", []):
-        scores = compute_position_scores(player)
-        best_pos = best_position_from_scores(scores)
+    players = data.get("players", [])
+    all_scores, best_positions = score_roster(players)
+    for player, scores, best_pos in zip(players, all_scores, best_positions):
         row = {
             "Nom": player["name"],
             "Poste préf. (déclaré)": player.get("preferred_position") or "",
@@ -55,73 +286,90 @@ def build_profile_rows(data):
     return rows
 
 
+def _totals_by_name(data):
+    """Agrégats matérialisés regroupés par nom (comme le groupby sur "Joueur")."""
+    aggregates = repo.player_aggregates(data)
+    by_name = {}
+    for player in data.get("players", []):
+        totals = aggregates.get(player["id"])
+        if totals is None or not totals.count:
+            continue
+        acc = by_name.setdefault(player["name"], dict.fromkeys(("count",) + TOTAL_FIELDS, 0))
+        acc["count"] += totals.count
+        for field in TOTAL_FIELDS:
+            acc[field] += totals.sums[field]
+    return dict(sorted(by_name.items()))
+
+
+@cached_on_data
 def aggregate_match_means(data):
-    all_perfs = []
-    for match in data.get("matches", []):
-        for perf in match.get("performances", []):
-            player = repo.find_player(data, perf["player_id"])
-            if not player:
-                continue
-            all_perfs.append(
-                {
-                    "Joueur": player["name"],
-                    "Tech": perf["tech"],
-                    "Phys": perf["phys"],
-                    "Tact": perf["tact"],
-                    "Mental": perf["mental"],
-                    "Buts": perf["goals"],
-                    "Passes": perf["assists"],
-                }
-            )
-
-    if not all_perfs:
+    by_name = _totals_by_name(data)
+    if not by_name:
         return pd.DataFrame()
 
-    dfp = pd.DataFrame(all_perfs)
-    agg = dfp.groupby("Joueur").agg(
+    index = pd.Index(list(by_name), name="Joueur")
+    totals = list(by_name.values())
+    agg = pd.DataFrame(
         {
-            "Tech": "mean",
-            "Phys": "mean",
-            "Tact": "mean",
-            "Mental": "mean",
-            "Buts": "sum",
-            "Passes": "sum",
-        }
+            "Tech": [t["tech"] / t["count"] for t in totals],
+            "Phys": [t["phys"] / t["count"] for t in totals],
+            "Tact": [t["tact"] / t["count"] for t in totals],
+            "Mental": [t["mental"] / t["count"] for t in totals],
+            "Buts": [t["goals"] for t in totals],
+            "Passes": [t["assists"] for t in totals],
+        },
+        index=index,
     ).round(2)
     return agg
 
 
-def compute_progress_deltas(df_all, today=None):
-    today = today or date.today()
-    recent_start = today - timedelta(days=30)
-    prev_start = today - timedelta(days=60)
+@cached_on_data
+def aggregate_player_minutes(data):
+    """Même tableau que `aggregate_minutes`, lu depuis les agrégats matérialisés."""
+    by_name = _totals_by_name(data)
+    if not by_name:
+        return pd.DataFrame()
+
+    agg_minutes = pd.DataFrame(
+        {
+            "Matches": [t["count"] for t in by_name.values()],
+            "Minutes_totales": [t["minutes"] for t in by_name.values()],
+        },
+        index=pd.Index(list(by_name), name="Joueur"),
+    )
+    agg_minutes["Minutes / match"] = (
+        agg_minutes["Minutes_totales"] / agg_minutes["Matches"]
+    ).round(1)
+    return agg_minutes
 
-    df_recent = df_all[df_all["date"] >= recent_start]
-    df_prev = df_all[(df_all["date"] < recent_start) & (df_all["date"] >= prev_start)]
 
-    if df_recent.empty or df_prev.empty:
-        return pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
+def minutes_between(data, start=None, end=None, store=None):
+    """Temps de jeu par joueur sur la période (voir `performances_between`).
 
-    recent_mean = df_recent.groupby("Joueur")["overall"].mean()
-    prev_mean = df_prev.groupby("Joueur")["overall"].mean()
+    Sans borne, le tableau vient des agrégats matérialisés ; sinon il est
+    calculé sur les perfs de la période.
+    """
+    if start is None and end is None:
+        return aggregate_player_minutes(data)
+    df_period = performances_between(data, start, end, store=store)
+    if df_period.empty:
+        return pd.DataFrame()
+    return aggregate_minutes(df_period)
 
-    df_delta = pd.DataFrame(
-        {"Note 30 derniers jours": recent_mean, "Note 30–60 jours": prev_mean}
-    ).dropna()
 
-    if df_delta.empty:
-        return pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
+@_cached_on_frame
+def get_progression_engine(df_all):
+    """Moteur de progression (perfs triées par date une fois), partagé via le cache."""
+    return ProgressionEngine(df_all)
 
-    df_delta["Delta"] = (
-        df_delta["Note 30 derniers jours"] - df_delta["Note 30–60 jours"]
-    ).round(2)
-    top_up = df_delta.sort_values("Delta", ascending=False).head(5)
-    top_down = df_delta.sort_values("Delta", ascending=True).head(5)
-    return df_delta, top_up, top_down
 
+def compute_progress_deltas(df_all, today=None):
+    return get_progression_engine(df_all).compare_days(30, today or date.today())
 
+
+@_cached_on_frame
 def aggregate_minutes(df_all):
-    agg_minutes = df_all.groupby("Joueur").agg(
+    agg_minutes = df_all.groupby("Joueur", observed=True).agg(
         Matches=("overall", "count"),
         Minutes_totales=("Minutes", "sum"),
     )
@@ -131,11 +379,26 @@ def aggregate_minutes(df_all):
     return agg_minutes
 
 
+_TOP_THREE_COLUMNS = ["Joueur", "Note globale", "Minutes", "Buts", "Passes"]
+
+
+@_cached_on_frame
+def top_three_by_match(df_all):
+    """Top 3 de tous les matchs en un seul tri : `(lignes, {match_id: positions dans lignes})`.
+
+    Note globale décroissante ; à note égale, l'ordre de saisie est conservé.
+    """
+    if df_all.empty:
+        return pd.DataFrame(columns=_TOP_THREE_COLUMNS), {}
+    ranked = df_all.assign(**{"Note globale": df_all["overall"].round(2)}).sort_values(
+        ["match_id", "Note globale"], ascending=[True, False], kind="stable"
+    )
+    top = ranked.groupby("match_id", sort=False).head(3)
+    return top[_TOP_THREE_COLUMNS], top.groupby("match_id", sort=False).indices
+
+
 def top_three_for_match(df_all, match_id):
-    df_match = df_all[df_all["match_id"] == match_id].copy()
-    if df_match.empty:
+    top, positions = top_three_by_match(df_all)
+    if match_id not in positions:
         return pd.DataFrame()
-    df_match["Note globale"] = df_match["overall"].round(2)
-    return df_match.sort_values("Note globale", ascending=False).head(3)[
-        ["Joueur", "Note globale", "Minutes", "Buts", "Passes"]
-    ]
+    return top.iloc[positions[match_id]]
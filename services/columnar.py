@@ -0,0 +1,268 @@
+"""Snapshot colonnaire (Parquet ou Arrow IPC) : une table typée par entité.
+
+Les six tables (joueurs, notes de base, matchs, perfs, séances, présences)
+sont produites en une seule passe sur les données. Le même snapshot, écrit à
+côté du fichier de données à chaque réécriture de celui-ci (`save_data`,
+compaction du journal), sert de cache de démarrage aux analytics ; il note la version des données
+et l'identité du fichier dont elles viennent.
+pyarrow est optionnel : sans lui, `available()` est faux. Il n'est importé
+qu'au premier usage.
+"""
+import functools
+import importlib.util
+import io
+import json
+import os
+import tempfile
+import zipfile
+from pathlib import Path
+
+from core import profiling
+from core.compact import iter_columns
+from storage import journal
+from storage import repository as repo
+
+
+# Table → colonnes (nom, type Arrow). "category" : texte encodé en dictionnaire.
+TABLES = {
+    "players": [
+        ("id", "int32"), ("name", "string"), ("birth_year", "int16"),
+        ("preferred_position", "category"), ("foot", "category"),
+    ],
+    "base_ratings": [("player_id", "int32"), ("skill", "category"), ("rating", "int8")],
+    "matches": [("id", "int32"), ("date", "date32"), ("opponent", "string"), ("competition", "category")],
+    "performances": [
+        ("match_id", "int32"), ("player_id", "int32"), ("position", "category"), ("minutes", "int16"),
+        ("tech", "int8"), ("phys", "int8"), ("tact", "int8"), ("mental", "int8"),
+        ("goals", "int16"), ("assists", "int16"), ("comment", "string"),
+    ],
+    "trainings": [("id", "int32"), ("date", "date32"), ("theme", "string"), ("type", "category"), ("notes", "string")],
+    "attendances": [
+        ("training_id", "int32"), ("player_id", "int32"), ("present", "bool"),
+        ("effort", "int8"), ("focus", "int8"), ("comment", "string"),
+    ],
+}
+
+# Variantes proposées : (libellé, extension des tables dans l'archive).
+FORMATS = {
+    "parquet": ("Parquet (une table par fichier, archive ZIP)", ".parquet"),
+    "arrow": ("Arrow IPC (une table par fichier, archive ZIP)", ".arrow"),
+}
+
+# Clé des métadonnées de schéma où sont notées la source et la version des données.
+_METADATA_KEY = b"u9"
+
+_PERF_FIELDS = [name for name, _ in TABLES["performances"][1:]]
+_ATTENDANCE_FIELDS = [name for name, _ in TABLES["attendances"][1:]]
+_PERF_DEFAULTS = dict.fromkeys(_PERF_FIELDS)
+_ATTENDANCE_DEFAULTS = dict.fromkeys(_ATTENDANCE_FIELDS)
+
+
+@functools.cache
+def available():
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def snapshot_dir_for(data_file):
+    data_file = Path(data_file)
+    return data_file.with_name(data_file.stem + ".columnar")
+
+
+@profiling.profiled("columnar.flatten")
+def flatten(data):
+    """Colonnes de chaque table (listes Python), en une seule passe sur `data`.
+
+    Un champ absent donne une valeur nulle ; les sous-listes compactes sont
+    lues colonne par colonne, sans créer de dictionnaire par ligne.
+    """
+    tables = {name: {column: [] for column, _ in columns} for name, columns in TABLES.items()}
+    players, ratings = tables["players"], tables["base_ratings"]
+    for player in data.get("players", []):
+        for column in players:
+            players[column].append(player.get(column))
+        for skill, rating in (player.get("base_ratings") or {}).items():
+            ratings["player_id"].append(player["id"])
+            ratings["skill"].append(skill)
+            ratings["rating"].append(rating)
+
+    _flatten_parents(data.get("matches", []), tables["matches"], tables["performances"],
+                     "performances", "match_id", _PERF_FIELDS, _PERF_DEFAULTS)
+    _flatten_parents(data.get("trainings", []), tables["trainings"], tables["attendances"],
+                     "attendances", "training_id", _ATTENDANCE_FIELDS, _ATTENDANCE_DEFAULTS)
+    return tables
+
+
+def _flatten_parents(items, parents, children, rows_key, parent_column, fields, defaults):
+    child_columns = [children[field] for field in fields]
+    parent_ids = children[parent_column]
+    for item in items:
+        for column in parents:
+            parents[column].append(item.get(column))
+        start = len(child_columns[0])
+        for column, values in zip(child_columns, iter_columns(item.get(rows_key) or [], fields, defaults)):
+            column.extend(values)
+        parent_ids.extend([item["id"]] * (len(child_columns[0]) - start))
+
+
+def _arrow_type(kind):
+    import pyarrow as pa
+
+    if kind == "category":
+        return pa.dictionary(pa.int32(), pa.string())
+    if kind == "date32":
+        return pa.date32()
+    return pa.type_for_alias(kind)
+
+
+def _arrow_column(values, kind):
+    import pyarrow as pa
+
+    if kind == "date32":
+        return pa.array(values, pa.string()).cast(pa.date32())
+    if kind == "category":
+        return pa.array(values, pa.string()).dictionary_encode()
+    return pa.array(values, _arrow_type(kind))
+
+
+def to_arrow(data, version=None, source=None):
+    """Tables pyarrow typées ; `version` / `source` sont notées dans les métadonnées."""
+    import pyarrow as pa
+
+    metadata = {_METADATA_KEY: json.dumps({"version": version, "source": source}).encode("utf-8")}
+    tables = {}
+    for name, columns in flatten(data).items():
+        schema = pa.schema([(column, _arrow_type(kind)) for column, kind in TABLES[name]], metadata=metadata)
+        arrays = [_arrow_column(columns[column], kind) for column, kind in TABLES[name]]
+        tables[name] = pa.Table.from_arrays(arrays, schema=schema)
+    return tables
+
+
+def _write_table(table, sink, fmt):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    if fmt == "parquet":
+        pq.write_table(table, sink)
+    else:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+@profiling.profiled("columnar.write_archive")
+def write_archive(data, fileobj, fmt="parquet"):
+    """Écrit une archive ZIP avec une table par fichier (Parquet ou Arrow IPC)."""
+    _, extension = FORMATS[fmt]
+    with zipfile.ZipFile(fileobj, "w", compression=zipfile.ZIP_STORED) as archive:
+        for name, table in to_arrow(data, version=data.get("version")).items():
+            buffer = io.BytesIO()
+            _write_table(table, buffer, fmt)
+            archive.writestr(name + extension, buffer.getvalue())
+    return fileobj
+
+
+def read_archive(fileobj):
+    """Relit une archive produite par `write_archive` : {nom de table: pyarrow.Table}."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    tables = {}
+    with zipfile.ZipFile(fileobj) as archive:
+        for entry in archive.namelist():
+            name, extension = os.path.splitext(entry)
+            payload = pa.py_buffer(archive.read(entry))
+            if extension == ".parquet":
+                tables[name] = pq.read_table(pa.BufferReader(payload))
+            else:
+                tables[name] = pa.ipc.open_file(payload).read_all()
+    return tables
+
+
+@profiling.profiled("columnar.write_snapshot")
+def write_snapshot(tables, directory):
+    """Écrit (ou remplace) les tables Parquet du snapshot dans `directory`.
+
+    Chaque table est écrite dans un fichier temporaire puis renommée : un
+    lecteur voit soit l'ancienne, soit la nouvelle table, et `read_snapshot`
+    vérifie que toutes portent la même version.
+    """
+    import pyarrow.parquet as pq
+
+    directory = Path(directory)
+    directory.mkdir(exist_ok=True)
+    for name, table in tables.items():
+        path = directory / (name + ".parquet")
+        fd, tmp_name = tempfile.mkstemp(prefix=path.name + ".", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pq.write_table(table, f)
+            os.replace(tmp_name, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_name)
+            except OSError:
+                pass
+            raise
+
+
+def _metadata(schema):
+    raw = (schema.metadata or {}).get(_METADATA_KEY)
+    return json.loads(raw) if raw else None
+
+
+def _source(signature):
+    """Identité JSON d'un fichier de données : (mtime_ns, taille, inode), voir `journal.file_signature`."""
+    return list(signature) if signature is not None else None
+
+
+@profiling.profiled("columnar.read_snapshot")
+def read_snapshot(directory, names, version, source=None):
+    """Tables `names` du snapshot si elles correspondent toutes à `version` et `source`, sinon None."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    expected = {"version": version, "source": source}
+    paths = [Path(directory) / (name + ".parquet") for name in names]
+    try:
+        if any(_metadata(pq.read_schema(path)) != expected for path in paths):
+            return None
+        tables = {name: pq.read_table(path) for name, path in zip(names, paths)}
+    except (OSError, pa.ArrowInvalid):
+        return None
+    # Une table a pu être remplacée entre la vérification et la lecture.
+    if any(_metadata(table.schema) != expected for table in tables.values()):
+        return None
+    return tables
+
+
+def snapshot_tables(data, names):
+    """Tables `names` de `data`, lues depuis le snapshot disque s'il vient du même fichier à la même version.
+
+    Ne fait que lire : le snapshot n'est réécrit qu'avec le fichier de
+    données (voir `refresh_snapshot`). Retourne None sans pyarrow, si le
+    snapshot est en retard sur les données ou a été écrit pour un autre
+    fichier (remplacé ou restauré, même à version égale), ou si `data` n'est
+    pas chargé depuis le fichier de données ; l'appelant construit alors ses
+    tables en mémoire.
+    """
+    version = data.get("version")
+    disk_signature = repo.get_repository(data).disk_signature
+    if version is None or disk_signature is None or disk_signature[1] is None or not available():
+        return None
+    tables = read_snapshot(snapshot_dir_for(repo.DATA_FILE), names, version, source=_source(disk_signature[1]))
+    if tables is not None:
+        profiling.count("columnar.snapshot_hits")
+    return tables
+
+
+def refresh_snapshot(data):
+    """Réécrit le snapshot colonnaire après une réécriture du fichier de données."""
+    if not available():
+        return
+    source = _source(journal.file_signature(repo.DATA_FILE))
+    try:
+        write_snapshot(to_arrow(data, version=data.get("version"), source=source), snapshot_dir_for(repo.DATA_FILE))
+    except OSError:
+        pass  # Cache seulement : l'analytics fonctionne sans.
+
+
+repo.add_snapshot_listener(refresh_snapshot)
@@ -0,0 +1,89 @@
+"""Export brut des données (JSON, ou tables Parquet / Arrow), produit à la demande."""
+import gzip
+import io
+import json
+
+from core import compact, profiling
+from services import columnar
+from services.analytics import AnalyticsCache
+from storage import repository as repo
+
+
+# Variantes proposées : (libellé, indentation, compression gzip, nom de fichier, type MIME)
+JSON_VARIANTS = {
+    "lisible": ("JSON lisible (indenté)", 2, False, "u9_data.json", "application/json"),
+    "compact": ("JSON compact", None, False, "u9_data.json", "application/json"),
+    "gzip": ("JSON compact compressé (gzip)", None, True, "u9_data.json.gz", "application/gzip"),
+}
+
+# Taille des écritures groupées pendant l'encodage incrémental.
+CHUNK_SIZE = 64 * 1024
+
+_export_cache = AnalyticsCache(maxsize=4)
+repo.add_change_listener(_export_cache.invalidate_revision)
+
+
+def iter_json_chunks(data, indent=None):
+    """Encode `data` morceau par morceau (jamais de chaîne JSON complète en mémoire)."""
+    separators = (",", ": ") if indent is not None else (",", ":")
+    encoder = json.JSONEncoder(
+        ensure_ascii=False, indent=indent, separators=separators, default=compact.json_default
+    )
+    pending = []
+    size = 0
+    for chunk in encoder.iterencode(data):
+        pending.append(chunk)
+        size += len(chunk)
+        if size >= CHUNK_SIZE:
+            yield "".join(pending)
+            pending = []
+            size = 0
+    if pending:
+        yield "".join(pending)
+
+
+def write_json(data, fileobj, variant="lisible"):
+    """Écrit l'export JSON dans un fichier binaire, en flux."""
+    _, indent, compressed, _, _ = JSON_VARIANTS[variant]
+    target = gzip.GzipFile(fileobj=fileobj, mode="wb") if compressed else fileobj
+    try:
+        for chunk in iter_json_chunks(data, indent=indent):
+            target.write(chunk.encode("utf-8"))
+    finally:
+        if compressed:
+            target.close()
+    return fileobj
+
+
+def _build_json_export(data, variant):
+    buffer = io.BytesIO()
+    write_json(data, buffer, variant)
+    return buffer.getvalue()
+
+
+def peek_json_export(data, variant="lisible"):
+    """Export déjà produit pour la révision courante des données, ou None."""
+    return _export_cache.peek(("json", repo.data_revision(data), (variant,)))
+
+
+@profiling.profiled("exports.json")
+def export_json_bytes(data, variant="lisible"):
+    """Export JSON en bytes, mis en cache tant que les données ne changent pas."""
+    key = ("json", repo.data_revision(data), (variant,))
+    return _export_cache.get_or_compute(key, lambda: _build_json_export(data, variant))
+
+
+def peek_columnar_export(data, fmt="parquet"):
+    return _export_cache.peek(("columnar", repo.data_revision(data), (fmt,)))
+
+
+@profiling.profiled("exports.columnar")
+def export_columnar_bytes(data, fmt="parquet"):
+    """Archive ZIP des tables (Parquet ou Arrow IPC), mise en cache comme l'export JSON."""
+
+    def build():
+        buffer = io.BytesIO()
+        columnar.write_archive(data, buffer, fmt)
+        return buffer.getvalue()
+
+    return _export_cache.get_or_compute(("columnar", repo.data_revision(data), (fmt,)), build)
@@ -0,0 +1,146 @@
+"""Saisie en grille : un tableau éditable par feuille, seules les lignes modifiées sont écrites."""
+import pandas as pd
+
+from core.models import POSITIONS
+from services.match_import import NUMERIC_FIELDS
+
+
+# Colonnes de la grille de présence → champ d'une présence.
+ATTENDANCE_GRID = {"Présent": "present", "Effort": "effort", "Concentration": "focus", "Commentaire": "comment"}
+ATTENDANCE_DEFAULTS = {"present": True, "effort": 3, "focus": 3, "comment": ""}
+# Champ numérique d'une présence → (minimum, maximum), comme les curseurs du formulaire.
+ATTENDANCE_NUMERIC_FIELDS = {"effort": (1, 5), "focus": (1, 5)}
+
+# Colonnes de la grille de match → champ d'une perf.
+MATCH_GRID = {
+    "Poste": "position",
+    "Minutes": "minutes",
+    "Tech": "tech",
+    "Phys": "phys",
+    "Tact": "tact",
+    "Mental": "mental",
+    "Buts": "goals",
+    "Passes": "assists",
+    "Commentaire": "comment",
+}
+
+
+def _grid(players, columns, rows_by_player, defaults, played=False):
+    """Une ligne par joueur (index player_id), valeurs enregistrées ou valeurs par défaut."""
+    labels = ["Joueur", *(["Joué"] if played else []), *columns]
+    records = []
+    for player in players:
+        row = rows_by_player.get(player["id"])
+        fallback = defaults(player)
+        source = row if row is not None else fallback
+        record = {"player_id": player["id"], "Joueur": player["name"]}
+        if played:
+            record["Joué"] = row is not None
+        record.update({label: source.get(field, fallback.get(field)) for label, field in columns.items()})
+        records.append(record)
+    return pd.DataFrame.from_records(records, index="player_id", columns=["player_id", *labels])
+
+
+def _text(value):
+    return "" if pd.isna(value) else str(value).strip()
+
+
+def _numeric_values(row, columns, bounds):
+    """Valeurs entières des colonnes numériques de `row`, et erreurs (cellule vide ou hors limites)."""
+    values, errors = {}, []
+    for label, field in columns.items():
+        if field not in bounds:
+            continue
+        low, high = bounds[field][:2]
+        value = row[label]
+        if pd.isna(value) or not low <= value <= high:
+            errors.append(f"{label} hors limites ({low}-{high})")
+        else:
+            values[field] = int(value)
+    return values, errors
+
+
+def _first_by_player(rows):
+    by_player = {}
+    for row in rows:
+        by_player.setdefault(row["player_id"], row)
+    return by_player
+
+
+def changed_rows(original, edited):
+    """player_ids des lignes dont au moins une cellule diffère (les deux vides comptent pour égales)."""
+    edited = edited.reindex(index=original.index, columns=original.columns)
+    same = (original == edited) | (original.isna() & edited.isna())
+    return original.index[~same.all(axis=1)].tolist()
+
+
+def attendance_grid(players, training):
+    return _grid(players, ATTENDANCE_GRID, _first_by_player(training.get("attendances", [])),
+                 lambda player: ATTENDANCE_DEFAULTS)
+
+
+def attendance_changes(players, training, edited):
+    """Retourne `(présences à écrire, erreurs)` : lignes modifiées, plus les joueurs encore sans présence.
+
+    Une ligne dont l'effort ou la concentration est vide ou hors limites est
+    signalée dans les erreurs au lieu d'être écrite.
+    """
+    stored = _first_by_player(training.get("attendances", []))
+    original = attendance_grid(players, training)
+    player_ids = set(changed_rows(original, edited)) | {pid for pid in original.index if pid not in stored}
+    changes, errors = [], []
+    names = original["Joueur"]
+    for player_id in original.index:
+        if player_id not in player_ids:
+            continue
+        row = edited.loc[player_id]
+        values, row_errors = _numeric_values(row, ATTENDANCE_GRID, ATTENDANCE_NUMERIC_FIELDS)
+        if row_errors:
+            errors.append(f"{names[player_id]} : " + " ; ".join(row_errors))
+            continue
+        changes.append({
+            "player_id": int(player_id),
+            "present": bool(row["Présent"]),
+            **values,
+            "comment": _text(row["Commentaire"]),
+        })
+    return changes, errors
+
+
+def match_grid(players, match):
+    """Grille d'un match ; « Joué » est coché pour les joueurs qui ont déjà une perf."""
+    stored = _first_by_player(match.get("performances", []))
+    defaults = {field: default for field, (_, _, default) in NUMERIC_FIELDS.items()}
+    return _grid(
+        players, MATCH_GRID, stored,
+        lambda player: {"position": player.get("preferred_position"), "comment": "", **defaults},
+        played=True,
+    )
+
+
+def match_changes(players, match, edited):
+    """Retourne `(perfs à écrire, joueurs à retirer, erreurs)` d'après les lignes modifiées."""
+    original = match_grid(players, match)
+    performances, removed, errors = [], [], []
+    names = original["Joueur"]
+    for player_id in changed_rows(original, edited):
+        row = edited.loc[player_id]
+        if not row["Joué"]:
+            if original.at[player_id, "Joué"]:
+                removed.append(int(player_id))
+            continue
+        row_errors = []
+        if row["Poste"] not in POSITIONS:
+            row_errors.append("poste manquant")
+        values, numeric_errors = _numeric_values(row, MATCH_GRID, NUMERIC_FIELDS)
+        row_errors.extend(numeric_errors)
+        if row_errors:
+            errors.append(f"{names[player_id]} : " + " ; ".join(row_errors))
+            continue
+        performances.append({
+            "player_id": int(player_id),
+            "position": row["Poste"],
+            **values,
+            "comment": _text(row["Commentaire"]),
+        })
+    return performances, removed, errors
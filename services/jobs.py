@@ -0,0 +1,226 @@
+"""File de tâches en arrière-plan pour les fiches PDF et les exports.
+
+Une tâche est identifiée par sa clé `(type, révision des données, paramètres)` :
+redemander la même fiche sur les mêmes données renvoie la tâche existante au
+lieu d'en relancer une. Les pages soumettent la tâche, gardent son id dans la
+session et viennent relire son état aux reruns suivants ; le script Streamlit
+n'attend jamais la fin du rendu. Chaque tâche écrit dans un fichier
+temporaire : les résultats terminés ne restent pas en mémoire.
+"""
+import atexit
+import itertools
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from core import profiling
+from storage import repository as repo
+
+
+PENDING = "en attente"
+RUNNING = "en cours"
+DONE = "terminé"
+FAILED = "échec"
+
+
+class Job:
+    """Une génération en cours ou terminée ; le fichier produit est `path` (`size` octets)."""
+
+    def __init__(self, job_id, key, label):
+        self.id = job_id
+        self.key = key
+        self.label = label
+        self.state = PENDING
+        self.done = 0
+        self.total = 0
+        self.path = None
+        self.size = 0
+        self.error = None
+        self.submitted_at = time.time()
+        self.finished_at = None
+
+    @property
+    def finished(self):
+        return self.state in (DONE, FAILED)
+
+    @property
+    def fraction(self):
+        return self.done / self.total if self.total else 0.0
+
+    def progress(self, done, total):
+        """Rappel `progress(done, total)` passé aux fonctions de génération."""
+        self.done = done
+        self.total = total
+
+    def open(self):
+        """Fichier produit, ouvert en lecture binaire ; None s'il a été supprimé entre-temps."""
+        try:
+            return open(self.path, "rb")
+        except (OSError, TypeError):
+            return None
+
+    def _discard(self):
+        if self.path is not None:
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+
+
+class JobQueue:
+    """Exécute les tâches dans un petit pool de threads et garde leurs résultats.
+
+    Les tâches terminées, réussies ou en échec, sont conservées dans un
+    magasin LRU borné en nombre (`max_results`) et en taille totale des
+    fichiers (`max_bytes`, un échec ne compte pour rien) ; une tâche évincée
+    est oubliée (fichier supprimé, clé libérée) et doit être resoumise. Les
+    tâches en attente ou en cours ne sont jamais évincées.
+    """
+
+    def __init__(self, max_workers=2, max_results=8, max_bytes=64 * 1024 * 1024):
+        self.max_workers = max_workers
+        self.max_results = max_results
+        self.max_bytes = max_bytes
+        self.submitted = 0
+        self.deduplicated = 0
+        self._ids = itertools.count(1)
+        self._jobs = {}
+        self._by_key = {}
+        self._results = OrderedDict()
+        self._result_bytes = 0
+        self._lock = threading.Lock()
+        self._pool = None
+
+    def submit(self, key, build, label=""):
+        """Lance `build(fileobj, progress)` (qui écrit dans `fileobj`) sauf si une tâche de même clé existe déjà."""
+        with self._lock:
+            job = self._by_key.get(key)
+            if job is not None and job.state != FAILED:
+                self.deduplicated += 1
+                if job.id in self._results:
+                    self._results.move_to_end(job.id)
+                return job
+            if job is not None:
+                self._forget(job)
+            job = Job(next(self._ids), key, label)
+            self._jobs[job.id] = job
+            self._by_key[key] = job
+            self.submitted += 1
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="u9-jobs")
+            pool = self._pool
+        pool.submit(self._run, job, build)
+        return job
+
+    def get(self, job_id):
+        """La tâche `job_id`, ou None si elle est inconnue ou que son résultat a été évincé."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and job.id in self._results:
+                self._results.move_to_end(job.id)
+            return job
+
+    def _run(self, job, build):
+        job.state = RUNNING
+        try:
+            with tempfile.NamedTemporaryFile(prefix="u9-job-", delete=False) as fileobj:
+                job.path = fileobj.name
+                with profiling.span(f"jobs.{job.key[0]}"):
+                    build(fileobj, job.progress)
+            job.size = os.path.getsize(job.path)
+        except Exception as exc:
+            job.error = f"{type(exc).__name__}: {exc}"
+            job.state = FAILED
+            job._discard()
+        else:
+            job.state = DONE
+        job.finished_at = time.time()
+        with self._lock:
+            if self._jobs.get(job.id) is job:
+                self._store(job)
+            else:
+                job._discard()
+
+    def _store(self, job):
+        self._results[job.id] = job
+        self._result_bytes += job.size
+        # La tâche la plus récente reste disponible, même si elle dépasse seule `max_bytes`.
+        while len(self._results) > 1 and (
+            len(self._results) > self.max_results or self._result_bytes > self.max_bytes
+        ):
+            self._forget(self._results[next(iter(self._results))])
+
+    def _forget(self, job):
+        if self._results.pop(job.id, None) is not None:
+            self._result_bytes -= job.size
+            job._discard()
+        self._jobs.pop(job.id, None)
+        if self._by_key.get(job.key) is job:
+            del self._by_key[job.key]
+
+    def invalidate_revision(self, revision):
+        """Oublie les tâches des données `revision` : les résultats sont libérés,
+        celles encore en cours se terminent sans être reprises par une nouvelle demande."""
+        with self._lock:
+            for job in [j for j in self._jobs.values() if j.key[1] == revision]:
+                if job.finished:
+                    self._forget(job)
+                elif self._by_key.get(job.key) is job:
+                    del self._by_key[job.key]
+
+    def clear(self):
+        with self._lock:
+            for job in self._results.values():
+                job._discard()
+            self._jobs.clear()
+            self._by_key.clear()
+            self._results.clear()
+            self._result_bytes = 0
+            self.submitted = 0
+            self.deduplicated = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "submitted": self.submitted,
+                "deduplicated": self.deduplicated,
+                "running": sum(1 for job in self._jobs.values() if not job.finished),
+                "results": len(self._results),
+                "failed": sum(1 for job in self._results.values() if job.state == FAILED),
+                "result_bytes": self._result_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait)
+        with self._lock:
+            for job in list(self._results.values()):
+                self._forget(job)
+
+
+_queue = JobQueue()
+repo.add_change_listener(_queue.invalidate_revision)
+atexit.register(_queue.clear)
+
+
+def job_stats():
+    return _queue.stats()
+
+
+def get_job(job_id):
+    return _queue.get(job_id)
+
+
+def submit(kind, data, params, build, label=""):
+    """Soumet `build(fileobj, progress)` sous la clé `(kind, révision de data, params)`.
+
+    `build` s'exécute dans un autre thread : il ne doit lire qu'une copie
+    figée des données (voir `storage.repository.snapshot`), pas `data` lui-même.
+    """
+    return _queue.submit((kind, repo.data_revision(data), tuple(params)), build, label=label)
@@ -0,0 +1,128 @@
+"""Composition optimale : affectation joueurs → postes qui maximise la somme des scores par poste."""
+import numpy as np
+
+from core.models import POSITIONS, score_roster
+
+
+# Systèmes proposés : poste → nombre de joueurs.
+FORMATIONS = {
+    "Foot à 5 : 1-2-1": {"Gardien": 1, "Défenseur": 1, "Milieu": 2, "Attaquant": 1},
+    "Foot à 5 : 2-2": {"Gardien": 1, "Défenseur": 2, "Milieu": 0, "Attaquant": 2},
+    "Foot à 7 : 2-2-2": {"Gardien": 1, "Défenseur": 2, "Milieu": 2, "Attaquant": 2},
+    "Foot à 7 : 3-2-1": {"Gardien": 1, "Défenseur": 3, "Milieu": 2, "Attaquant": 1},
+}
+
+# Coût d'une affectation interdite par le plafond de répétition (les scores vont de 1 à 5).
+_FORBIDDEN = 1e6
+
+
+def solve_assignment(cost):
+    """Affectation de coût total minimal (algorithme hongrois, O(n² m)).
+
+    `cost` est une matrice n × m ; retourne, pour chaque ligne, la colonne
+    qui lui est affectée (toutes les lignes si n ≤ m, sinon m d'entre elles
+    et -1 pour les autres).
+    """
+    cost = np.asarray(cost, dtype=float)
+    if cost.shape[0] > cost.shape[1]:
+        columns = solve_assignment(cost.T)
+        rows = np.full(cost.shape[0], -1)
+        rows[columns] = np.arange(cost.shape[1])
+        return rows
+    n, m = cost.shape
+    # Potentiels u (lignes) et v (colonnes) ; col_row[j] : ligne (1..n) affectée à la colonne j, 0 si libre.
+    # La colonne 0 est fictive : elle porte la ligne en cours d'insertion.
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    col_row = np.zeros(m + 1, dtype=int)
+    way = np.zeros(m + 1, dtype=int)
+    for row in range(1, n + 1):
+        col_row[0] = row
+        j0 = 0
+        min_slack = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+        while True:
+            used[j0] = True
+            i0 = col_row[j0]
+            free = ~used
+            free[0] = False
+            slack = cost[i0 - 1] - u[i0] - v[1:]
+            better = free[1:] & (slack < min_slack[1:])
+            min_slack[1:][better] = slack[better]
+            way[1:][better] = j0
+            candidates = np.where(free, min_slack, np.inf)
+            j1 = int(candidates.argmin())
+            delta = candidates[j1]
+            u[col_row[used]] += delta
+            v[used] -= delta
+            min_slack[free] -= delta
+            j0 = j1
+            if col_row[j0] == 0:
+                break
+        # Chemin augmentant : on décale les affectations le long de `way`.
+        while j0:
+            j1 = way[j0]
+            col_row[j0] = col_row[j1]
+            j0 = j1
+    rows = np.full(n, -1)
+    assigned = np.nonzero(col_row[1:])[0]
+    rows[col_row[1:][assigned] - 1] = assigned
+    return rows
+
+
+def recent_position_counts(matches, last=5):
+    """Sur les `last` matchs les plus récents : (nombre de matchs, {player_id: {poste: nombre}})."""
+    recent = sorted(matches, key=lambda m: m["date"], reverse=True)[:last]
+    counts = {}
+    for match in recent:
+        for perf in match.get("performances", []):
+            by_position = counts.setdefault(perf["player_id"], {})
+            by_position[perf.get("position")] = by_position.get(perf.get("position"), 0) + 1
+    return len(recent), counts
+
+
+def optimize_lineup(players, formation, recent=None, max_share=None):
+    """Meilleure composition pour `formation` ({poste: nombre}) avec les joueurs disponibles.
+
+    Avec `recent` (voir `recent_position_counts`) et `max_share`, un joueur
+    n'est pas placé à un poste si sa part à ce poste, match à venir compris,
+    dépasserait `max_share`. Un joueur sans note de base compte pour 0.
+
+    Retourne `(affectations, postes non pourvus)` ; une affectation est un
+    dictionnaire {"position", "player_id", "name", "score"}, dans l'ordre des postes.
+    """
+    slots = [position for position in POSITIONS for _ in range(formation.get(position, 0))]
+    if not slots or not players:
+        return [], slots
+    all_scores, _ = score_roster(players)
+    scores = np.array([[s.get(position) or 0.0 for position in slots] for s in all_scores])
+    cost = -scores
+
+    if recent is not None and max_share is not None:
+        match_count, counts = recent
+        if match_count:
+            for i, player in enumerate(players):
+                played = counts.get(player["id"], {})
+                for k, position in enumerate(slots):
+                    if (played.get(position, 0) + 1) / (match_count + 1) > max_share:
+                        cost[i, k] = _FORBIDDEN
+
+    slot_of_player = solve_assignment(cost)
+    player_of_slot = np.full(len(slots), -1)
+    for i, k in enumerate(slot_of_player):
+        if k >= 0 and cost[i, k] < _FORBIDDEN:
+            player_of_slot[k] = i
+
+    assignments, unfilled = [], []
+    for k, position in enumerate(slots):
+        i = player_of_slot[k]
+        if i < 0:
+            unfilled.append(position)
+            continue
+        assignments.append({
+            "position": position,
+            "player_id": players[i]["id"],
+            "name": players[i]["name"],
+            "score": round(float(scores[i, k]), 2),
+        })
+    return assignments, unfilled
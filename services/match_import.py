@@ -0,0 +1,174 @@
+"""Import groupé d'une feuille de match (CSV ou tableau collé) en une seule écriture."""
+import csv
+import io
+import re
+
+from core.models import POSITIONS
+from core.text import fold
+
+
+# Champ de perf → en-têtes acceptés (comparés sans accents ni casse).
+COLUMNS = {
+    "player": ("joueur", "player", "nom", "name"),
+    "player_id": ("id", "id joueur", "player id", "player_id"),
+    "position": ("poste", "position", "poste joue"),
+    "minutes": ("minutes", "min"),
+    "tech": ("tech", "technique"),
+    "phys": ("phys", "physique"),
+    "tact": ("tact", "tactique"),
+    "mental": ("mental", "mentale"),
+    "goals": ("buts", "goals"),
+    "assists": ("passes", "passes decisives", "assists"),
+    "comment": ("commentaire", "commentaires", "comment"),
+}
+
+# Champ numérique → (minimum, maximum, valeur si la cellule est vide), comme le formulaire.
+NUMERIC_FIELDS = {
+    "minutes": (0, 90, 40),
+    "tech": (1, 5, 3),
+    "phys": (1, 5, 3),
+    "tact": (1, 5, 3),
+    "mental": (1, 5, 3),
+    "goals": (0, 10, 0),
+    "assists": (0, 10, 0),
+}
+
+TEMPLATE = "Joueur;Poste;Minutes;Tech;Phys;Tact;Mental;Buts;Passes;Commentaire\n"
+
+# « Nom (#id) » : nom suivi de l'id du joueur, comme dans les listes de l'application.
+_NAME_WITH_ID = re.compile(r"^(?P<name>.*?)\s*\(#(?P<id>\d+)\)$")
+
+
+_HEADERS = {fold(alias): name for name, aliases in COLUMNS.items() for alias in aliases}
+_POSITIONS = {fold(position): position for position in POSITIONS}
+
+
+def _dialect(text):
+    sample = text[:4096]
+    try:
+        return csv.Sniffer().sniff(sample, delimiters="\t;,")
+    except csv.Error:
+        return csv.excel_tab if "\t" in sample else csv.excel
+
+
+def _player_index(players):
+    """Nom replié → ids des joueurs portant ce nom (plusieurs en cas d'homonymes)."""
+    index = {}
+    for player in players:
+        index.setdefault(fold(player["name"]), []).append(player["id"])
+    return index
+
+
+def _resolve_player(cells, index, names_by_id):
+    """`(player_id, erreur)` d'une ligne : par l'id (colonne « Id » ou « Nom (#id) »), sinon par le nom.
+
+    Un nom porté par plusieurs joueurs est signalé avec les formes qui les
+    distinguent ; un id donné avec un nom doit désigner ce joueur.
+    """
+    name = cells.get("player", "")
+    raw_id = cells.get("player_id", "")
+    suffixed = _NAME_WITH_ID.match(name)
+    if suffixed and not raw_id:
+        name, raw_id = suffixed["name"], suffixed["id"]
+    if raw_id:
+        try:
+            player_id = int(raw_id)
+        except ValueError:
+            return None, f"id de joueur invalide « {raw_id} »"
+        if player_id not in names_by_id:
+            return None, f"aucun joueur n'a l'id {player_id}"
+        if name and fold(name) != fold(names_by_id[player_id]):
+            return None, f"l'id {player_id} est celui de « {names_by_id[player_id]} », pas de « {name} »"
+        return player_id, None
+    player_ids = index.get(fold(name), [])
+    if not player_ids:
+        return None, f"joueur inconnu « {name} »"
+    if len(player_ids) > 1:
+        choices = " ou ".join(f"« {name} (#{player_id}) »" for player_id in player_ids)
+        return None, f"plusieurs joueurs s'appellent « {name} » : écrire {choices}, ou remplir la colonne « Id »"
+    return player_ids[0], None
+
+
+def parse_match_sheet(text, players, existing_player_ids=()):
+    """Lit et valide toute la feuille en une passe.
+
+    Les joueurs sont reconnus par leur nom ; les homonymes se distinguent par
+    « Nom (#id) » ou par une colonne « Id ». Retourne `(performances, errors)` :
+    `errors` liste des messages « Ligne N : … » ; les perfs ne sont à
+    enregistrer que si elle est vide.
+    """
+    text = text.lstrip("\ufeff")
+    rows = [row for row in csv.reader(io.StringIO(text), _dialect(text)) if any(cell.strip() for cell in row)]
+    if not rows:
+        return [], ["Aucune ligne à importer."]
+
+    header = [_HEADERS.get(fold(cell)) for cell in rows[0]]
+    if "player" not in header and "player_id" not in header:
+        return [], ["En-tête : colonne « Joueur » introuvable."]
+    unknown = [cell for cell, name in zip(rows[0], header) if name is None and cell.strip()]
+    errors = [f"En-tête : colonne inconnue « {cell} »." for cell in unknown]
+
+    index = _player_index(players)
+    names_by_id = {player["id"]: player["name"] for player in players}
+    seen = set(existing_player_ids)
+    performances = []
+    for line, row in enumerate(rows[1:], start=2):
+        cells = {name: cell.strip() for name, cell in zip(header, row) if name is not None}
+        row_errors = []
+
+        player_id, player_error = _resolve_player(cells, index, names_by_id)
+        if player_error is not None:
+            row_errors.append(player_error)
+        elif player_id in seen:
+            row_errors.append(f"« {names_by_id[player_id]} » a déjà une performance pour ce match")
+        else:
+            seen.add(player_id)
+
+        position = _POSITIONS.get(fold(cells.get("position", "")))
+        if position is None:
+            row_errors.append(f"poste invalide « {cells.get('position', '')} » (attendu : {', '.join(POSITIONS)})")
+
+        values = {}
+        for name, (low, high, default) in NUMERIC_FIELDS.items():
+            raw = cells.get(name, "")
+            if not raw:
+                values[name] = default
+                continue
+            try:
+                value = int(raw)
+            except ValueError:
+                row_errors.append(f"{name} n'est pas un entier (« {raw} »)")
+                continue
+            if not low <= value <= high:
+                row_errors.append(f"{name} hors limites ({low}-{high}) : {value}")
+            values[name] = value
+
+        if row_errors:
+            errors.append(f"Ligne {line} : " + " ; ".join(row_errors))
+            continue
+        performances.append({
+            "player_id": player_id,
+            "position": position,
+            **values,
+            "comment": cells.get("comment", ""),
+        })
+
+    if not errors and not performances:
+        errors.append("Aucune ligne à importer.")
+    return performances, errors
+
+
+def import_match_sheet(repo, data, match_id, text):
+    """Valide la feuille puis enregistre toutes ses perfs en une écriture.
+
+    Rien n'est écrit si une ligne est invalide ; retourne `(performances, errors)`.
+    """
+    match = repo.find_match(data, match_id)
+    if match is None:
+        raise KeyError(f"Match inconnu : {match_id}")
+    existing = [perf["player_id"] for perf in match.get("performances", [])]
+    performances, errors = parse_match_sheet(text, data["players"], existing)
+    if errors:
+        return [], errors
+    repo.add_performances(data, match_id, performances)
+    return performances, []
@@ -0,0 +1,109 @@
+"""Comparaisons de fenêtres et courbes de progression sur les perfs de match."""
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from storage.seasons import SEASON_START_MONTH, season_of
+
+
+def _empty_result():
+    return pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
+
+
+def season_start(today):
+    """Premier jour de la saison en cours (voir `storage.seasons.season_of`)."""
+    return date(int(season_of(today.isoformat())[:4]), SEASON_START_MONTH, 1)
+
+
+class ProgressionEngine:
+    """Trie les perfs par date une seule fois puis répond aux comparaisons de fenêtres.
+
+    Les fenêtres de dates sont des tranches obtenues par recherche
+    dichotomique (`np.searchsorted`) dans les dates triées, sans masque
+    booléen sur tout l'historique.
+    """
+
+    def __init__(self, df_all):
+        frame = df_all.assign(date=pd.to_datetime(df_all["date"]))
+        order = np.argsort(frame["date"].to_numpy(), kind="stable")
+        self.frame = frame.iloc[order].reset_index(drop=True)
+        self.dates = self.frame["date"].to_numpy()
+        self._rank_from_end = None
+        self._curves = {}
+
+    def window(self, start=None, end=None):
+        """Perfs avec start <= date < end (bornes optionnelles)."""
+        lo = 0 if start is None else np.searchsorted(self.dates, pd.Timestamp(start).to_datetime64(), "left")
+        hi = len(self.dates) if end is None else np.searchsorted(self.dates, pd.Timestamp(end).to_datetime64(), "left")
+        return self.frame.iloc[lo:hi]
+
+    @staticmethod
+    def compare(df_recent, df_prev, recent_label, prev_label):
+        """Moyennes par joueur des deux fenêtres, écart et top 5 hausses / baisses."""
+        if df_recent.empty or df_prev.empty:
+            return _empty_result()
+
+        recent_mean = df_recent.groupby("Joueur", observed=True)["overall"].mean()
+        prev_mean = df_prev.groupby("Joueur", observed=True)["overall"].mean()
+
+        df_delta = pd.DataFrame({recent_label: recent_mean, prev_label: prev_mean}).dropna()
+        if df_delta.empty:
+            return _empty_result()
+
+        df_delta["Delta"] = (df_delta[recent_label] - df_delta[prev_label]).round(2)
+        top_up = df_delta.sort_values("Delta", ascending=False).head(5)
+        top_down = df_delta.sort_values("Delta", ascending=True).head(5)
+        return df_delta, top_up, top_down
+
+    def compare_days(self, days, today=None):
+        """N derniers jours contre les N jours précédents."""
+        today = today or date.today()
+        recent_start = today - timedelta(days=days)
+        prev_start = today - timedelta(days=2 * days)
+        return self.compare(
+            self.window(start=recent_start),
+            self.window(start=prev_start, end=recent_start),
+            f"Note {days} derniers jours",
+            f"Note {days}–{2 * days} jours",
+        )
+
+    def compare_matches(self, count):
+        """K derniers matchs de chaque joueur contre ses K matchs précédents."""
+        if self._rank_from_end is None:
+            self._rank_from_end = self.frame.groupby("player_id").cumcount(ascending=False).to_numpy()
+        rank = self._rank_from_end
+        return self.compare(
+            self.frame[rank < count],
+            self.frame[(rank >= count) & (rank < 2 * count)],
+            f"Note {count} derniers matchs",
+            f"Note {count} matchs précédents",
+        )
+
+    def compare_season(self, today=None):
+        """Saison en cours (à date) contre la saison précédente."""
+        today = today or date.today()
+        start = season_start(today)
+        prev_start = start.replace(year=start.year - 1)
+        return self.compare(
+            self.window(start=start, end=today + timedelta(days=1)),
+            self.window(start=prev_start, end=start),
+            "Note saison en cours",
+            "Note saison précédente",
+        )
+
+    def curves(self, window=3, span=3):
+        """Note, moyenne glissante et moyenne exponentielle (EWMA) par joueur et par match.
+
+        Calculées pour tous les joueurs en une passe groupée.
+        """
+        key = (window, span)
+        if key not in self._curves:
+            frame = self.frame.sort_values(["player_id", "date"], kind="stable")
+            grouped = frame.groupby("player_id", sort=False)["overall"]
+            rolling = grouped.rolling(window, min_periods=1).mean().reset_index(level=0, drop=True)
+            ewma = grouped.ewm(span=span).mean().reset_index(level=0, drop=True)
+            self._curves[key] = frame[["Joueur", "player_id", "date", "overall"]].assign(
+                **{"Moyenne glissante": rolling, "Moyenne exponentielle": ewma}
+            )
+        return self._curves[key]
@@ -1,34 +1,120 @@
+import os
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from io import BytesIO
 
-import pandas as pd
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
-
+from core import profiling
 from core.constants import SKILLS
 from core.models import best_position_from_scores, compute_position_scores
+from services.analytics import get_all_match_performances, top_three_for_match
+from services.training_analytics import attendance_totals
+from storage import repository as repo
+from storage.seasons import season_of
+
+
+_MATCH_FIELDS = ("tech", "phys", "tact", "mental", "minutes", "goals", "assists")
+
+
+def _empty_stats():
+    return {
+        "sessions": 0, "present": 0, "effort": 0, "focus": 0,
+        "matches": 0, "tech": 0, "phys": 0, "tact": 0, "mental": 0, "minutes": 0, "goals": 0, "assists": 0,
+    }
+
+
+def compute_player_stats(data, player_ids=None):
+    """Stats par joueur pour les fiches : présences via l'index de
+    `services.training_analytics`, perfs de match via les agrégats
+    matérialisés du repository.
+
+    Retourne {player_id: stats} (sommes et comptes), pour tous les joueurs
+    ou seulement ceux de `player_ids`.
+    """
+    if player_ids is None:
+        player_ids = [p["id"] for p in data.get("players", [])]
+    stats = {player_id: _empty_stats() for player_id in player_ids}
+
+    attendance = attendance_totals(data)
+    for player_id, acc in stats.items():
+        acc.update(attendance.get(player_id, {}))
+
+    aggregates = repo.player_aggregates(data)
+    for player_id, acc in stats.items():
+        totals = aggregates.get(player_id)
+        if totals is None:
+            continue
+        acc["matches"] = totals.count
+        for field in _MATCH_FIELDS:
+            acc[field] = totals.sums[field]
+    return stats
+
 
+def pdf_file_name(player):
+    return f"Fiche_{player['name'].replace(' ', '_')}.pdf"
 
+
+@profiling.profiled("reports.player_pdf")
 def generate_player_pdf(player, data):
     """
     Génère un PDF (en mémoire) avec la fiche complète du joueur.
     Retourne un bytes (ready pour st.download_button).
     """
+    stats = compute_player_stats(data, [player["id"]])[player["id"]]
+    return render_player_pdf(player, stats)
+
+
+class _PageWriter:
+    """Écrit ligne à ligne sur un canvas A4, avec saut de page automatique en bas de page.
+
+    reportlab n'est importé qu'à la première génération de PDF.
+    """
+
+    def __init__(self, fileobj):
+        from reportlab.lib.pagesizes import A4
+        from reportlab.pdfgen import canvas
+
+        self.c = canvas.Canvas(fileobj, pagesize=A4)
+        self.width, self.height = A4
+        # Marges & position de départ
+        self.x_margin = 40
+        self.y = self.height - 50
+
+    def line(self, text, size=10, bold=False, dy=14):
+        if self.y < 60:  # nouvelle page si trop bas
+            self.new_page()
+        self.c.setFont("Helvetica-Bold" if bold else "Helvetica", size)
+        self.c.drawString(self.x_margin, self.y, text)
+        self.y -= dy
+
+    def row(self, values, widths, size=9, bold=False, dy=13):
+        """Une ligne de tableau : chaque valeur dans sa colonne de largeur `widths[i]`."""
+        if self.y < 60:
+            self.new_page()
+        self.c.setFont("Helvetica-Bold" if bold else "Helvetica", size)
+        x = self.x_margin
+        for value, width in zip(values, widths):
+            self.c.drawString(x, self.y, str(value))
+            x += width
+        self.y -= dy
+
+    def new_page(self):
+        self.c.showPage()
+        self.y = self.height - 50
+
+
+def render_player_pdf(player, stats):
+    """Dessine la fiche joueur à partir de stats déjà agrégées (voir `compute_player_stats`)."""
     buffer = BytesIO()
-    c = canvas.Canvas(buffer, pagesize=A4)
-    width, height = A4
-
-    # Marges & position de départ
-    x_margin = 40
-    y = height - 50
-
-    def line(text, size=10, bold=False, dy=14):
-        nonlocal y
-        if y < 60:  # nouvelle page si trop bas
-            c.showPage()
-            y = height - 50
-        c.setFont("Helvetica-Bold" if bold else "Helvetica", size)
-        c.drawString(x_margin, y, text)
-        y -= dy
+    writer = _PageWriter(buffer)
+    _draw_player_sheet(writer, player, stats)
+    writer.c.showPage()
+    writer.c.save()
+    buffer.seek(0)
+    return buffer.getvalue()
+
+
+def _draw_player_sheet(writer, player, stats):
+    line = writer.line
 
     # ========= En-tête =========
     line("FICHE JOUEUR – U9", size=16, bold=True, dy=22)
@@ -66,19 +152,12 @@ def generate_player_pdf(player, data):
     line(" ", dy=10)
 
     # ========= Stats Entraînements =========
-    attendances = []
-    for training in data.get("trainings", []):
-        for att in training.get("attendances", []):
-            if att.get("player_id") == player["id"]:
-                attendances.append(att)
-
     line("Entraînements", size=12, bold=True, dy=18)
-    if attendances:
-        total_sessions = len(attendances)
-        present_sessions = sum(1 for a in attendances if a.get("present"))
-        avg_effort = round(sum(a.get("effort", 0) for a in attendances) / total_sessions, 2)
-        avg_focus = round(sum(a.get("focus", 0) for a in attendances) / total_sessions, 2)
-        line(f"Séances suivies : {present_sessions} / {total_sessions}", size=10)
+    if stats["sessions"]:
+        total_sessions = stats["sessions"]
+        avg_effort = round(stats["effort"] / total_sessions, 2)
+        avg_focus = round(stats["focus"] / total_sessions, 2)
+        line(f"Séances suivies : {stats['present']} / {total_sessions}", size=10)
         line(f"Effort moyen : {avg_effort}/5", size=10)
         line(f"Concentration moyenne : {avg_focus}/5", size=10)
     else:
@@ -87,29 +166,21 @@ def generate_player_pdf(player, data):
     line(" ", dy=10)
 
     # ========= Stats Matchs =========
-    perfs = []
-    for match in data.get("matches", []):
-        for perf in match.get("performances", []):
-            if perf.get("player_id") == player["id"]:
-                perfs.append(perf)
-
     line("Matchs", size=12, bold=True, dy=18)
-    if perfs:
-        dfp = pd.DataFrame(perfs)
-        avg_tech = round(dfp["tech"].mean(), 2)
-        avg_phys = round(dfp["phys"].mean(), 2)
-        avg_tact = round(dfp["tact"].mean(), 2)
-        avg_mental = round(dfp["mental"].mean(), 2)
-        total_goals = int(dfp["goals"].sum())
-        total_assists = int(dfp["assists"].sum())
-
-        line(f"Nombre de feuilles de match : {len(perfs)}", size=10)
+    if stats["matches"]:
+        n_matches = stats["matches"]
+        avg_tech = round(stats["tech"] / n_matches, 2)
+        avg_phys = round(stats["phys"] / n_matches, 2)
+        avg_tact = round(stats["tact"] / n_matches, 2)
+        avg_mental = round(stats["mental"] / n_matches, 2)
+
+        line(f"Nombre de feuilles de match : {n_matches}", size=10)
         line(
             "Tech / Phys / Tact / Mental (moyennes) : "
             f"{avg_tech} / {avg_phys} / {avg_tact} / {avg_mental}",
             size=10,
         )
-        line(f"Buts : {total_goals}  |  Passes décisives : {total_assists}", size=10)
+        line(f"Buts : {stats['goals']}  |  Passes décisives : {stats['assists']}", size=10)
     else:
         line("Aucune performance de match saisie pour ce joueur.", size=10)
 
@@ -126,7 +197,150 @@ def generate_player_pdf(player, data):
     line("________________________________________", size=10)
     line("________________________________________", size=10)
 
+
+def seasons_in(data):
+    """Saisons ('2024-2025'…) où au moins un match ou une séance a eu lieu, de la plus ancienne à la plus récente."""
+    return sorted({season_of(item["date"]) for name in ("matches", "trainings") for item in data.get(name, [])})
+
+
+def season_data(data, season):
+    """Tous les joueurs, avec seulement les matchs et séances de `season`."""
+    return {
+        "players": data.get("players", []),
+        "matches": [m for m in data.get("matches", []) if season_of(m["date"]) == season],
+        "trainings": [t for t in data.get("trainings", []) if season_of(t["date"]) == season],
+    }
+
+
+def _mean(total, count):
+    return round(total / count, 2) if count else "–"
+
+
+_SUMMARY_HEADERS = ["Joueur", "Matchs", "Minutes", "Note moy.", "Buts", "Passes", "Présence"]
+_SUMMARY_WIDTHS = [150, 50, 55, 65, 45, 50, 60]
+
+
+def _draw_squad_summary(writer, players, stats):
+    writer.line("Synthèse de l'effectif", size=12, bold=True, dy=20)
+    writer.row(_SUMMARY_HEADERS, _SUMMARY_WIDTHS, bold=True)
+    for player in players:
+        acc = stats[player["id"]]
+        ratings = acc["tech"] + acc["phys"] + acc["tact"] + acc["mental"]
+        attendance = f"{acc['present']} / {acc['sessions']}" if acc["sessions"] else "–"
+        writer.row(
+            [player["name"][:28], acc["matches"], acc["minutes"], _mean(ratings, 4 * acc["matches"]),
+             acc["goals"], acc["assists"], attendance],
+            _SUMMARY_WIDTHS,
+        )
+
+
+def _draw_match_podiums(writer, matches, top_three):
+    writer.line("Top 3 par match", size=14, bold=True, dy=22)
+    for match in sorted(matches, key=lambda m: m["date"]):
+        writer.line(f"{match['date']} – {match['opponent']} ({match['competition']})", size=11, bold=True, dy=16)
+        top = top_three[match["id"]]
+        if top.empty:
+            writer.line("Aucune performance saisie.", size=9, dy=16)
+            continue
+        for rank, row in enumerate(top.itertuples(index=False), start=1):
+            writer.line(
+                f"{rank}. {row.Joueur} – {row[1]}/5 – {row.Minutes} min – "
+                f"{row.Buts} but(s), {row.Passes} passe(s)",
+                size=9, dy=12,
+            )
+        writer.y -= 4
+
+
+@profiling.profiled("reports.season_pdf")
+def write_season_report(data, fileobj, title="", progress=None):
+    """Écrit dans `fileobj` le bilan de saison : synthèse de l'effectif, une
+    page par joueur, puis le top 3 de chaque match.
+
+    Les stats par joueur et les top 3 de tous les matchs sont calculés une
+    seule fois avant le dessin, puis partagés entre les pages : la durée
+    croît avec la taille des données, pas avec joueurs × historique.
+    `progress(done, total)` est appelé après chaque page joueur.
+
+    Le canvas reportlab garde tout le document en mémoire et ne l'écrit dans
+    `fileobj` qu'au `save()` final : la mémoire croît avec la taille du PDF.
+    Passer un fichier plutôt qu'un BytesIO évite seulement une seconde copie
+    du document une fois écrit.
+    """
+    players = data.get("players", [])
+    matches = data.get("matches", [])
+    stats = compute_player_stats(data)
+    df_all = get_all_match_performances(data)
+    top_three = {match["id"]: top_three_for_match(df_all, match["id"]) for match in matches}
+
+    writer = _PageWriter(fileobj)
+    c = writer.c
+    c.setTitle(f"Bilan de saison {title}".strip())
+    writer.line(f"BILAN DE SAISON – U9 {title}".strip(), size=16, bold=True, dy=22)
+    writer.line(f"{len(players)} joueurs · {len(matches)} matchs · "
+                f"{len(data.get('trainings', []))} séances", size=10, dy=20)
+    _draw_squad_summary(writer, players, stats)
+
+    for done, player in enumerate(players, start=1):
+        writer.new_page()
+        _draw_player_sheet(writer, player, stats[player["id"]])
+        if progress is not None:
+            progress(done, len(players))
+
+    writer.new_page()
+    _draw_match_podiums(writer, matches, top_three)
     c.showPage()
     c.save()
-    buffer.seek(0)
-    return buffer.getvalue()
+    return fileobj
+
+
+def _zip_entry_name(player, used):
+    name = pdf_file_name(player)
+    if name in used:
+        name = name[: -len(".pdf")] + f"_{player['id']}.pdf"
+    used.add(name)
+    return name
+
+
+@profiling.profiled("reports.squad_zip")
+def export_squad_zip(data, fileobj, progress=None, max_workers=None):
+    """Écrit dans `fileobj` une archive ZIP contenant la fiche PDF de chaque joueur.
+
+    Les stats sont agrégées en une passe, les PDF sont rendus dans un pool de
+    processus et ajoutés à l'archive dès qu'ils sont prêts ; seules quelques
+    fiches sont en mémoire à la fois. `progress(done, total)` est appelé
+    après chaque fiche. `max_workers=1` rend les fiches dans le processus courant.
+    """
+    players = data.get("players", [])
+    stats = compute_player_stats(data)
+    total = len(players)
+    used_names = set()
+
+    with zipfile.ZipFile(fileobj, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        def write(player, pdf_bytes, done):
+            archive.writestr(_zip_entry_name(player, used_names), pdf_bytes)
+            if progress is not None:
+                progress(done, total)
+
+        if max_workers == 1:
+            for done, player in enumerate(players, start=1):
+                write(player, render_player_pdf(player, stats[player["id"]]), done)
+            return fileobj
+
+        workers = max_workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            window = workers * 2
+            pending = {}
+            queue = iter(players)
+            done = 0
+            while True:
+                for player in queue:
+                    pending[pool.submit(render_player_pdf, player, stats[player["id"]])] = player
+                    if len(pending) >= window:
+                        break
+                if not pending:
+                    break
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    done += 1
+                    write(pending.pop(future), future.result(), done)
+    return fileobj
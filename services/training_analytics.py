@@ -0,0 +1,187 @@
+"""Statistiques d'assiduité aux entraînements pour tout l'effectif."""
+import numpy as np
+import pandas as pd
+
+from core.compact import iter_rows
+from services import columnar
+from services.analytics import cached_on_data
+
+
+ATTENDANCE_COLUMNS = ["player_id", "training_id", "date", "type", "present", "effort", "focus"]
+
+_FRAME_FIELDS = ("player_id", "present", "effort", "focus")
+_FRAME_DEFAULTS = {"present": False, "effort": 0, "focus": 0}
+
+
+# Tables du snapshot colonnaire lues pour construire le DataFrame des présences.
+_SNAPSHOT_TABLES = ("trainings", "attendances")
+
+
+def attendance_frame_from_tables(tables):
+    """Même DataFrame que `build_attendance_frame`, à partir des tables du snapshot colonnaire."""
+    attendances = tables["attendances"].select(["player_id", "training_id", *_FRAME_DEFAULTS]).to_pandas()
+    if attendances.empty:
+        return pd.DataFrame(columns=ATTENDANCE_COLUMNS)
+
+    trainings = tables["trainings"]
+    rows = pd.Index(trainings.column("id").to_numpy()).get_indexer(attendances["training_id"])
+    df = attendances.fillna(_FRAME_DEFAULTS)
+    df["present"] = df["present"].astype(bool)
+    dates = pd.Series(trainings.column("date").cast("string").to_numpy(zero_copy_only=False))
+    df["date"] = pd.to_datetime(dates).to_numpy()[rows]
+    types = trainings.column("type").cast("string").fill_null("").to_numpy(zero_copy_only=False)
+    df["type"] = pd.Categorical(types.astype(object)[rows])
+    df = df.astype({"player_id": "int32", "training_id": "int32", "effort": "int8", "focus": "int8"})
+    return df[ATTENDANCE_COLUMNS]
+
+
+@cached_on_data
+def build_attendance_frame(data):
+    """Une ligne par fiche de présence, construite en une seule passe sur les séances.
+
+    Relue depuis le snapshot colonnaire quand il est à jour (voir `analytics.get_all_match_performances`).
+    """
+    tables = columnar.snapshot_tables(data, _SNAPSHOT_TABLES)
+    if tables is not None:
+        return attendance_frame_from_tables(tables)
+    training_dates = []
+    training_types = []
+    row_training = []
+    columns = {"player_id": [], "training_id": [], "present": [], "effort": [], "focus": []}
+    for training_pos, training in enumerate(data.get("trainings", [])):
+        training_dates.append(training["date"])
+        training_types.append(training.get("type") or "")
+        for player_id, present, effort, focus in iter_rows(
+            training.get("attendances", []), _FRAME_FIELDS, _FRAME_DEFAULTS
+        ):
+            row_training.append(training_pos)
+            columns["player_id"].append(player_id)
+            columns["training_id"].append(training["id"])
+            columns["present"].append(bool(present))
+            columns["effort"].append(effort)
+            columns["focus"].append(focus)
+
+    if not row_training:
+        return pd.DataFrame(columns=ATTENDANCE_COLUMNS)
+
+    rows = np.asarray(row_training)
+    df = pd.DataFrame(columns)
+    df["date"] = pd.to_datetime(pd.Series(training_dates)).to_numpy()[rows]
+    df["type"] = pd.Categorical(np.asarray(training_types, dtype=object)[rows])
+    df = df.astype({"player_id": "int32", "training_id": "int32", "effort": "int8", "focus": "int8"})
+    return df[ATTENDANCE_COLUMNS]
+
+
+@cached_on_data
+def attendance_index(data):
+    """player_id → positions (dans `build_attendance_frame`) de ses fiches de présence."""
+    df = build_attendance_frame(data)
+    if df.empty:
+        return {}
+    return df.groupby("player_id").indices
+
+
+def player_attendances(data, player_id):
+    df = build_attendance_frame(data)
+    positions = attendance_index(data).get(player_id)
+    if positions is None:
+        return df.iloc[0:0]
+    return df.iloc[positions]
+
+
+@cached_on_data
+def attendance_totals(data):
+    """player_id → {"sessions", "present", "effort", "focus"} (sommes sur toutes les fiches)."""
+    df = build_attendance_frame(data)
+    if df.empty:
+        return {}
+    totals = df.groupby("player_id").agg(
+        sessions=("present", "size"),
+        present=("present", "sum"),
+        effort=("effort", "sum"),
+        focus=("focus", "sum"),
+    )
+    return {
+        int(player_id): {key: int(value) for key, value in row.items()}
+        for player_id, row in totals.to_dict("index").items()
+    }
+
+
+def _absence_streaks(df):
+    """Série d'absences en cours et plus longue série, par joueur (séances triées par date)."""
+    ordered = df.sort_values(["player_id", "date"], kind="stable")
+    absent = ~ordered["present"]
+    # Chaque présence ouvre une nouvelle « série » ; les absences qui suivent s'y rattachent.
+    run = ordered["present"].astype("int32").groupby(ordered["player_id"]).cumsum()
+    run_lengths = absent.groupby([ordered["player_id"], run]).sum()
+    longest = run_lengths.groupby(level=0).max()
+    current = run_lengths.groupby(level=0).last()
+    return current, longest
+
+
+@cached_on_data
+def squad_attendance_stats(data):
+    """Assiduité de tout l'effectif : taux de présence, effort et concentration moyens, séries d'absences."""
+    df = build_attendance_frame(data)
+    players = data.get("players", [])
+    if df.empty or not players:
+        return pd.DataFrame()
+
+    grouped = df.groupby("player_id")
+    stats = grouped.agg(
+        Séances=("present", "size"),
+        Présences=("present", "sum"),
+        Effort_moyen=("effort", "mean"),
+        Concentration_moyenne=("focus", "mean"),
+    )
+    stats["Taux de présence"] = (stats["Présences"] / stats["Séances"]).round(2)
+    current, longest = _absence_streaks(df)
+    stats["Absences en cours"] = current
+    stats["Plus longue série d'absences"] = longest
+
+    names = pd.Series({p["id"]: p["name"] for p in players}, name="Joueur")
+    stats = stats.join(names, how="inner")
+    stats = stats.rename(
+        columns={"Effort_moyen": "Effort moyen", "Concentration_moyenne": "Concentration moyenne"}
+    ).round({"Effort moyen": 2, "Concentration moyenne": 2})
+    return stats.set_index("Joueur")[
+        [
+            "Séances", "Présences", "Taux de présence", "Effort moyen",
+            "Concentration moyenne", "Absences en cours", "Plus longue série d'absences",
+        ]
+    ].sort_index()
+
+
+@cached_on_data
+def attendance_by_type(data):
+    """Taux de présence, effort et concentration moyens par type de séance."""
+    df = build_attendance_frame(data)
+    if df.empty:
+        return pd.DataFrame()
+    by_type = df.groupby("type", observed=True).agg(
+        Séances=("training_id", "nunique"),
+        Taux_de_présence=("present", "mean"),
+        Effort_moyen=("effort", "mean"),
+        Concentration_moyenne=("focus", "mean"),
+    ).round(2)
+    return by_type.rename(
+        columns={
+            "Taux_de_présence": "Taux de présence",
+            "Effort_moyen": "Effort moyen",
+            "Concentration_moyenne": "Concentration moyenne",
+        }
+    )
+
+
+@cached_on_data
+def attendance_trends(data):
+    """Taux de présence mensuel par type de séance (mois × type)."""
+    df = build_attendance_frame(data)
+    if df.empty:
+        return pd.DataFrame()
+    month = df["date"].dt.to_period("M").dt.to_timestamp()
+    return (
+        df.groupby([month, "type"], observed=True)["present"].mean()
+        .unstack("type")
+        .round(2)
+    )
@@ -0,0 +1,83 @@
+"""Agrégats de match par joueur, tenus à jour à chaque performance ajoutée."""
+import math
+
+
+FIELDS = ("tech", "phys", "tact", "mental", "minutes", "goals", "assists")
+
+
+class PlayerTotals:
+    """Comptes, sommes et sommes des carrés des perfs de match d'un joueur."""
+
+    __slots__ = ("count", "sums", "sumsq")
+
+    def __init__(self):
+        self.count = 0
+        self.sums = dict.fromkeys(FIELDS, 0)
+        self.sumsq = dict.fromkeys(FIELDS, 0)
+
+    def add(self, perf):
+        self.count += 1
+        for field in FIELDS:
+            value = perf.get(field) or 0
+            self.sums[field] += value
+            self.sumsq[field] += value * value
+
+    def remove(self, perf):
+        self.count -= 1
+        for field in FIELDS:
+            value = perf.get(field) or 0
+            self.sums[field] -= value
+            self.sumsq[field] -= value * value
+
+    def mean(self, field):
+        return self.sums[field] / self.count if self.count else None
+
+    def std(self, field):
+        """Écart-type (population) ; None sans perf."""
+        if not self.count:
+            return None
+        mean = self.sums[field] / self.count
+        return math.sqrt(max(self.sumsq[field] / self.count - mean * mean, 0.0))
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, PlayerTotals)
+            and (self.count, self.sums, self.sumsq) == (other.count, other.sums, other.sumsq)
+        )
+
+
+class PlayerAggregates:
+    """player_id → PlayerTotals ; `add` et `remove` sont en O(1), `rebuild` repart de zéro."""
+
+    def __init__(self):
+        self.by_player = {}
+
+    @classmethod
+    def from_data(cls, data):
+        aggregates = cls()
+        aggregates.rebuild(data)
+        return aggregates
+
+    def rebuild(self, data):
+        self.by_player = {}
+        for match in data.get("matches", []):
+            for perf in match.get("performances", []):
+                self.add(perf)
+
+    def add(self, perf):
+        totals = self.by_player.get(perf["player_id"])
+        if totals is None:
+            totals = self.by_player[perf["player_id"]] = PlayerTotals()
+        totals.add(perf)
+
+    def remove(self, perf):
+        totals = self.by_player[perf["player_id"]]
+        totals.remove(perf)
+        if not totals.count:
+            del self.by_player[perf["player_id"]]
+
+    def get(self, player_id):
+        return self.by_player.get(player_id)
+
+    def __eq__(self, other):
+        return isinstance(other, PlayerAggregates) and self.by_player == other.by_player
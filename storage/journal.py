@@ -0,0 +1,139 @@
+"""Journal append-only des mutations et écritures atomiques du snapshot."""
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+from core import compact, profiling
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+def journal_path_for(data_file):
+    data_file = Path(data_file)
+    return data_file.with_name(data_file.stem + ".journal.jsonl")
+
+
+def lock_path_for(data_file):
+    data_file = Path(data_file)
+    return data_file.with_name(data_file.stem + ".lock")
+
+
+@contextmanager
+def file_lock(path):
+    """Verrou exclusif entre processus sur le fichier `path` (bloquant, non réentrant)."""
+    with open(path, "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def file_signature(path):
+    """(mtime_ns, taille, inode) du fichier, ou None s'il n'existe pas."""
+    try:
+        stat = Path(path).stat()
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+
+def atomic_write_json(path, data, indent=2):
+    """Écrit le JSON dans un fichier temporaire puis le renomme sur `path`.
+
+    Un crash pendant l'écriture laisse l'ancien fichier intact.
+    """
+    path = Path(path)
+    fd, tmp_name = tempfile.mkstemp(prefix=path.name + ".", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=indent, default=compact.json_default)
+            f.flush()
+            os.fsync(f.fileno())
+            if profiling.is_enabled():
+                profiling.count("storage.bytes_written", os.fstat(f.fileno()).st_size)
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+
+def append_records(path, records):
+    """Ajoute des enregistrements (une ligne JSON chacun) en fin de journal."""
+    payload = "".join(
+        json.dumps(record, ensure_ascii=False, separators=(",", ":"), default=compact.json_default) + "\n"
+        for record in records
+    ).encode("utf-8")
+    profiling.count("storage.bytes_written", len(payload))
+    with open(path, "a+b") as f:
+        _drop_partial_line(f)
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _drop_partial_line(f):
+    """Coupe le fichier après son dernier saut de ligne (fin d'un ajout interrompu par un crash).
+
+    Sans cela, l'enregistrement suivant serait collé au fragment et illisible.
+    """
+    end = f.seek(0, os.SEEK_END)
+    if end == 0:
+        return
+    f.seek(end - 1)
+    if f.read(1) == b"\n":
+        return
+    position = end
+    while position > 0:
+        start = max(position - 4096, 0)
+        f.seek(start)
+        chunk = f.read(position - start)
+        newline = chunk.rfind(b"\n")
+        if newline != -1:
+            f.truncate(start + newline + 1)
+            return
+        position = start
+    f.truncate(0)
+
+
+def read_records(path):
+    """Relit le journal ; une ligne illisible (ajout interrompu par un crash) est ignorée."""
+    path = Path(path)
+    if not path.exists():
+        return []
+    if profiling.is_enabled():
+        profiling.count("storage.bytes_read", path.stat().st_size)
+    records = []
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return records
+
+
+def truncate(path):
+    path = Path(path)
+    if path.exists():
+        path.unlink()
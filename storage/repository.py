@@ -1,9 +1,34 @@
+import copy
+import itertools
 import json
+import threading
+import weakref
+from collections import OrderedDict
+from contextlib import contextmanager
 from pathlib import Path
 
+from core import profiling
+from core.compact import freeze, snapshot as _frozen_copy, thaw
+from storage import journal
+from storage.aggregates import PlayerAggregates
+from storage.search import PlayerSearchIndex
+
 
 DATA_FILE = Path("u9_data.json")
 
+COLLECTIONS = ("players", "matches", "trainings")
+
+# Au-delà de ce nombre de mutations journalisées, le journal est replié dans le snapshot.
+COMPACT_THRESHOLD = 200
+
+# Nombre de dictionnaires ordinaires indexés gardés en mémoire (voir `get_repository`).
+_REGISTRY_SIZE = 16
+
+
+class ConflictError(Exception):
+    """Une autre session a modifié les mêmes éléments depuis le chargement des données."""
+
+
 def _ensure_structure(data):
     if "players" not in data:
         data["players"] = []
@@ -14,42 +39,770 @@ def _ensure_structure(data):
     return data
 
 
-def load_data():
-    if DATA_FILE.exists():
-        with open(DATA_FILE, "r", encoding="utf-8") as f:
-            data = json.load(f)
+class _CollectionIndex:
+    """Index id → enregistrement (et sa position) d'une liste, synchronisé par la fin de liste."""
+
+    def __init__(self, items):
+        self.items = items
+        self.by_id = {}
+        self.positions = {}
+        self.count = 0
+        self.max_id = 0
+        self.sync()
+
+    def sync(self, items=None):
+        if items is not None and items is not self.items:
+            self.items = items
+            self._rebuild()
+        elif len(self.items) < self.count:
+            self._rebuild()
+        elif len(self.items) > self.count:
+            for position in range(self.count, len(self.items)):
+                self._add(self.items[position], position)
+            self.count = len(self.items)
+
+    def _rebuild(self):
+        self.by_id = {}
+        self.positions = {}
+        self.count = 0
+        for position, item in enumerate(self.items):
+            self._add(item, position)
+        self.count = len(self.items)
+
+    def _add(self, item, position):
+        item_id = item["id"]
+        self.by_id[item_id] = item
+        self.positions[item_id] = position
+        if item_id > self.max_id:
+            self.max_id = item_id
+
+    def next_id(self):
+        return self.max_id + 1
+
+    def replace(self, item_id, item):
+        """Substitue `item` à l'enregistrement `item_id`, à sa position dans la liste."""
+        position = self.positions[item_id]
+        if self.items[position] is not self.by_id[item_id]:
+            # Liste réordonnée ou modifiée hors du repository : positions à recalculer.
+            self._rebuild()
+            position = self.positions[item_id]
+        self.items[position] = item
+        self.by_id[item_id] = item
+
+
+_revisions = itertools.count(1)
+_change_listeners = []
+_snapshot_listeners = []
+
+
+def add_change_listener(callback):
+    """Enregistre `callback(old_revision)`, appelé à chaque mutation d'un jeu de données."""
+    _change_listeners.append(callback)
+
+
+def add_snapshot_listener(callback):
+    """Enregistre `callback(data)`, appelé après chaque réécriture du snapshot (`save_data`, `compact`)."""
+    _snapshot_listeners.append(callback)
+
+
+def _snapshot_written(data):
+    for callback in _snapshot_listeners:
+        callback(data)
+
+
+class Repository:
+    """Accès indexé (O(1)) aux joueurs, matchs et séances d'un jeu de données.
+
+    Les index sont construits une fois au chargement puis tenus à jour à
+    chaque insertion ; les ajouts faits directement dans les listes sont
+    rattrapés à la lecture suivante. `revision` est unique dans le processus
+    et change à chaque mutation : c'est la clé des caches d'analytics.
+    """
+
+    def __init__(self, data):
+        self.data = _ensure_structure(data)
+        self._indexes = {name: _CollectionIndex(self.data[name]) for name in COLLECTIONS}
+        self.revision = next(_revisions)
+        self._aggregates = None
+        self._search = None
+        # Signature des fichiers à laquelle ces données correspondent (voir `_commit`).
+        self.disk_signature = None
+
+    @property
+    def aggregates(self):
+        """Agrégats de match par joueur, construits au premier accès puis incrémentaux."""
+        if self._aggregates is None:
+            self._aggregates = PlayerAggregates.from_data(self.data)
+        return self._aggregates
+
+    @property
+    def search(self):
+        """Index de recherche des joueurs, construit au premier accès puis complété à chaque ajout."""
+        if self._search is None:
+            self._search = PlayerSearchIndex(self.data["players"])
+        else:
+            self._search.sync(self.data["players"])
+        return self._search
+
+    def record_performance(self, performance):
+        """À appeler après l'ajout d'une perf dans un match : mise à jour en O(1)."""
+        if self._aggregates is not None:
+            self._aggregates.add(performance)
+
+    def discard_performance(self, performance):
+        """À appeler après le retrait (ou le remplacement) d'une perf d'un match."""
+        if self._aggregates is not None:
+            self._aggregates.remove(performance)
+
+    def touch(self):
+        old_revision = self.revision
+        self.revision = next(_revisions)
+        for callback in _change_listeners:
+            callback(old_revision)
+
+    def _index(self, name):
+        index = self._indexes[name]
+        index.sync(self.data[name])
+        return index
+
+    def owns(self, items):
+        for name in COLLECTIONS:
+            if self.data.get(name) is items:
+                return name
+        return None
+
+    def next_id(self, name):
+        return self._index(name).next_id()
+
+    def claim_id(self, name, item):
+        """Donne à `item` le prochain id libre si le sien manque ou est déjà pris ; à appeler sous verrou."""
+        if item.get("id") is None or self.find(name, item["id"]) is not None:
+            item["id"] = self.next_id(name)
+        return item["id"]
+
+    def find(self, name, item_id):
+        return self._index(name).by_id.get(item_id)
+
+    def find_player(self, player_id):
+        return self.find("players", player_id)
+
+    def find_match(self, match_id):
+        return self.find("matches", match_id)
+
+    def find_training(self, training_id):
+        return self.find("trainings", training_id)
+
+    def mutable(self, name, item_id):
+        """Version modifiable (dictionnaire) d'un enregistrement, substituée à sa forme compacte.
+
+        L'ancienne forme et ses vues de lignes ne sont pas mises à jour (voir
+        `core.compact`) : après l'écriture, relire par `find`.
+        """
+        item = self.find(name, item_id)
+        if item is None or type(item) is dict:
+            return item
+        plain = thaw(item)
+        self._indexes[name].replace(item_id, plain)
+        return plain
+
+    def insert(self, name, item):
+        """Ajoute un enregistrement (avec un id attribué s'il manque)."""
+        index = self._index(name)
+        if item.get("id") is None:
+            item["id"] = index.next_id()
+        self.data[name].append(item)
+        index.sync()
+        if name == "matches":
+            for performance in item.get("performances", []):
+                self.record_performance(performance)
+        return item
+
+
+class Dataset(dict):
+    """Jeu de données chargé (ou copie figée) : un dictionnaire qui porte son Repository.
+
+    Le Repository vit et meurt avec le dictionnaire ; les copies n'en
+    héritent pas et en construisent un au premier accès.
+    """
+
+    def __copy__(self):
+        return Dataset(self)
+
+    def __deepcopy__(self, memo):
+        return Dataset(copy.deepcopy(dict(self), memo))
+
+    def __reduce__(self):
+        return Dataset, (dict(self),)
+
+
+# Jeux de données chargés encore en vie (références faibles), pour `compact` et `get_next_id`.
+_datasets = weakref.WeakValueDictionary()
+# Dictionnaires ordinaires (construits par l'appelant) : petit LRU, sans effet sur les `Dataset`.
+_registry = OrderedDict()
+_registry_lock = threading.Lock()
+
+
+def get_repository(data):
+    """Retourne le Repository indexé associé à ce jeu de données.
+
+    Un `Dataset` porte le sien. Un dictionnaire ordinaire est indexé dans un
+    LRU de `_REGISTRY_SIZE` entrées qui ne contient jamais de `Dataset`.
+    """
+    if isinstance(data, Dataset):
+        repository = data.__dict__.get("repository")
+        if repository is not None:
+            return repository
+        with _registry_lock:
+            repository = data.__dict__.get("repository")
+            if repository is None:
+                repository = data.repository = Repository(data)
+                _datasets[id(data)] = data
+            return repository
+    key = id(data)
+    with _registry_lock:
+        repository = _registry.get(key)
+        if repository is not None and repository.data is data:
+            _registry.move_to_end(key)
+            return repository
+        repository = Repository(data)
+        _registry[key] = repository
+        while len(_registry) > _REGISTRY_SIZE:
+            _registry.popitem(last=False)
+        return repository
+
+
+def _repositories():
+    """Repositories des jeux de données chargés encore en vie, puis ceux du LRU."""
+    with _registry_lock:
+        loaded = [data.repository for data in _datasets.values()]
+        return [*loaded, *reversed(_registry.values())]
+
+
+def snapshot(data):
+    """Copie figée de `data` (voir `core.compact.snapshot`) pour une lecture dans un autre thread.
+
+    Ses index sont construits à la demande et libérés avec elle.
+    """
+    return Dataset(_frozen_copy(data))
+
+
+def mutable(data, name, item_id):
+    """Enregistrement `item_id` de `data[name]`, modifiable en place (voir `core.compact`)."""
+    return get_repository(data).mutable(name, item_id)
+
+
+def player_aggregates(data):
+    """Agrégats de match par joueur (voir `storage.aggregates`), maintenus à chaque ajout."""
+    return get_repository(data).aggregates
+
+
+def player_search(data):
+    """Index de recherche des joueurs (voir `storage.search`), tenu à jour à chaque ajout."""
+    return get_repository(data).search
+
+
+def data_revision(data):
+    return get_repository(data).revision
+
+
+def _repository_for_items(items):
+    for repository in _repositories():
+        if repository.owns(items):
+            return repository
+    return None
+
+
+_write_lock = threading.RLock()
+_lock_depth = 0
+_journal_lengths = {}
+
+
+def _journal_file():
+    return journal.journal_path_for(DATA_FILE)
+
+
+@contextmanager
+def _locked():
+    """Verrou des écritures : entre threads du processus puis entre processus (réentrant)."""
+    global _lock_depth
+    with _write_lock:
+        if _lock_depth:
+            _lock_depth += 1
+            try:
+                yield
+            finally:
+                _lock_depth -= 1
+            return
+        with journal.file_lock(journal.lock_path_for(DATA_FILE)):
+            _lock_depth = 1
+            try:
+                yield
+            finally:
+                _lock_depth = 0
+
+
+def _read_snapshot(path=None):
+    path = Path(path) if path is not None else DATA_FILE
+    if path.exists():
+        if profiling.is_enabled():
+            profiling.count("storage.bytes_read", path.stat().st_size)
+        with open(path, "r", encoding="utf-8") as f:
+            data = Dataset(json.load(f))
     else:
-        data = {}
+        data = Dataset()
     return _ensure_structure(data)
 
 
+def _replay(data, records):
+    """Rejoue les mutations plus récentes que la version du snapshot."""
+    version = data.get("version", 0)
+    for record in records:
+        if record["version"] <= version:
+            continue
+        _APPLY[record["op"]](data, record)
+        version = record["version"]
+        data["version"] = version
+    return data
+
+
+def load_data_file(path):
+    """Charge un fichier de données quelconque (snapshot + son journal)."""
+    data = _read_snapshot(path)
+    _replay(data, journal.read_records(journal.journal_path_for(path)))
+    return data
+
+
+def _data_signature():
+    return (str(DATA_FILE), journal.file_signature(DATA_FILE), journal.file_signature(_journal_file()))
+
+
+class _LoadCache:
+    """Dernier jeu de données chargé, partagé par toutes les sessions du processus."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.signature = None
+        self.data = None
+        self.hits = 0
+        self.misses = 0
+
+    def refresh(self, data, previous_signature):
+        """Après une écriture de ce processus, évite de relire ce qui vient d'être écrit."""
+        with self.lock:
+            if self.data is data and self.signature == previous_signature:
+                self.signature = _data_signature()
+
+    def publish(self, data, signature):
+        """Remplace le jeu partagé par `data`, qui reflète le disque à `signature`."""
+        with self.lock:
+            self.signature = signature
+            self.data = data
+
+    def clear(self):
+        with self.lock:
+            self.signature = None
+            self.data = None
+            self.hits = 0
+            self.misses = 0
+
+
+_load_cache = _LoadCache()
+
+
+def load_stats():
+    with _load_cache.lock:
+        return {"hits": _load_cache.hits, "misses": _load_cache.misses}
+
+
+def clear_load_cache():
+    _load_cache.clear()
+
+
+def load_history():
+    """Toutes les saisons : avec un seul fichier, c'est `load_data()`."""
+    return load_data()
+
+
+@profiling.profiled("storage.load_data")
+def load_data():
+    """Charge les données, sans relire le fichier s'il n'a pas changé.
+
+    Le fichier n'est relu que si sa date de modification, sa taille ou son
+    inode (ou ceux du journal) ont changé, par exemple après l'écriture d'un
+    autre processus. Les sessions d'un même processus partagent donc le
+    même dictionnaire.
+    """
+    with _load_cache.lock:
+        signature = _data_signature()
+        if _load_cache.data is not None and _load_cache.signature == signature:
+            profiling.count("storage.load_cache_hits")
+            _load_cache.hits += 1
+            return _load_cache.data
+        _load_cache.misses += 1
+        data, records, signature = _read_consistent(signature)
+        _journal_lengths[str(_journal_file())] = len(records)
+        _replay(data, records)
+        freeze(data)
+        get_repository(data).disk_signature = signature
+        _load_cache.signature = signature
+        _load_cache.data = data
+        return data
+
+
+def _read_consistent(signature):
+    """Snapshot + journal lus sans verrou, relus si un autre processus a écrit entre-temps."""
+    while True:
+        data = _read_snapshot()
+        records = journal.read_records(_journal_file())
+        current = _data_signature()
+        if current == signature:
+            return data, records, signature
+        signature = current
+
+
+@profiling.profiled("storage.save_data")
 def save_data(data):
-    with open(DATA_FILE, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    """Réécrit le snapshot complet (atomiquement) et vide le journal.
+
+    Lève `ConflictError` si le fichier contient des modifications absentes
+    de `data` : une réécriture complète ne peut pas être fusionnée.
+    """
+    repository = get_repository(data)
+    with _locked():
+        if _data_signature() != repository.disk_signature:
+            disk_version = _read_disk()[0].get("version", 0)
+            if disk_version > data.get("version", 0):
+                raise ConflictError(
+                    f"Les données ont été modifiées par une autre session (version {disk_version}, "
+                    f"chargée : {data.get('version', 0)}) : recharge avant d'enregistrer."
+                )
+        data["version"] = data.get("version", 0) + 1
+        journal.atomic_write_json(DATA_FILE, data)
+        journal.truncate(_journal_file())
+        _journal_lengths[str(_journal_file())] = 0
+        _load_cache.refresh(data, repository.disk_signature)
+        repository.disk_signature = _data_signature()
+    repository.touch()
+    _snapshot_written(data)
+
+
+def _read_disk():
+    """État courant du disque (snapshot + journal rejoué) et enregistrements du journal."""
+    records = journal.read_records(_journal_file())
+    return _replay(_read_snapshot(), records), records
+
+
+@profiling.profiled("storage.compact")
+def compact():
+    """Replie le journal dans le snapshot (snapshot + rejeu, puis réécriture atomique)."""
+    with _locked():
+        path = _journal_file()
+        records = journal.read_records(path)
+        if not records:
+            return
+        previous_signature = _data_signature()
+        data = _replay(_read_snapshot(), records)
+        journal.atomic_write_json(DATA_FILE, data)
+        journal.truncate(path)
+        _journal_lengths[str(path)] = 0
+        # Le contenu est inchangé : les jeux de données à jour le restent.
+        _load_cache.refresh(_load_cache.data, previous_signature)
+        for repository in _repositories():
+            if repository.disk_signature == previous_signature:
+                repository.disk_signature = _data_signature()
+    _snapshot_written(data)
+
+
+def _journal_length(path):
+    key = str(path)
+    if key not in _journal_lengths:
+        _journal_lengths[key] = len(journal.read_records(path))
+    return _journal_lengths[key]
+
+
+def _commit(data, op, **payload):
+    """Applique une mutation en mémoire puis l'ajoute au journal.
+
+    Si une autre session a écrit depuis le chargement de `data`, ses
+    mutations sont d'abord intégrées (voir `_rebase`) ; la mutation peut
+    alors porter sur un nouveau jeu de données, que `load_data` retourne.
+    L'id d'un ajout est vérifié sous le verrou : un id manquant ou déjà pris
+    (par une autre session du processus ou d'un autre processus) est
+    remplacé par le suivant libre.
+    """
+    repository = get_repository(data)
+    with profiling.span(f"storage.{op}"), _locked():
+        record = {"op": op, **payload}
+        if _data_signature() != repository.disk_signature:
+            data = _rebase(data, record)
+            repository = get_repository(data)
+        name, key = _ADDED.get(op, (None, None))
+        if name is not None:
+            repository.claim_id(name, record[key])
+        base_signature = repository.disk_signature
+        record["version"] = data.get("version", 0) + 1
+        _APPLY[op](data, record)
+        data["version"] = record["version"]
+        path = _journal_file()
+        journal.append_records(path, [record])
+        _journal_lengths[str(path)] = _journal_length(path) + 1
+        _load_cache.refresh(data, base_signature)
+        repository.disk_signature = _data_signature()
+        if _journal_lengths[str(path)] >= COMPACT_THRESHOLD:
+            compact()
+    repository.touch()
+    return record
+
+
+def _rebase(data, record):
+    """Retourne le jeu de données au niveau du disque sur lequel appliquer `record`.
+
+    Si tout ce qui a suivi la version de `data` est encore au journal, ces
+    mutations sont rejouées sur `data` comme des ajouts ordinaires. Sinon
+    (journal compacté entre-temps) un nouveau dictionnaire est relu et publié
+    dans le cache de chargement : `data`, peut-être lu par d'autres sessions,
+    n'est jamais vidé ni remplacé sur place.
+
+    Les ajouts fusionnent toujours (l'id est revérifié par `_commit`) ; une
+    mutation qui remplace des lignes (présences, perfs, notes de base) lève
+    `ConflictError` si une autre session a modifié ces mêmes lignes. Dans les deux cas le jeu retourné par `load_data` reflète
+    ensuite le disque.
+    """
+    profiling.count("storage.rebases")
+    repository = get_repository(data)
+    base_version = data.get("version", 0)
+    records = journal.read_records(_journal_file())
+    _journal_lengths[str(_journal_file())] = len(records)
+    before = {key: copy.deepcopy(_touched_value(data, key)) for key in _touched_keys(record)}
+    signature = _data_signature()
+
+    if records and records[0]["version"] <= base_version + 1:
+        # Tout ce qui a suivi notre version est encore au journal : on le rejoue.
+        _replay(data, records)
+        _load_cache.refresh(data, repository.disk_signature)
+    else:
+        latest = freeze(_replay(_read_snapshot(), records))
+        if latest.get("version", 0) != base_version:
+            data = latest
+            repository = get_repository(data)
+            _load_cache.publish(data, signature)
+    repository.disk_signature = signature
+
+    changed = [key for key, value in before.items() if _touched_value(data, key) != value]
+    if changed:
+        repository.touch()
+        raise ConflictError(
+            f"{_describe(data, changed[0])} a été modifié par une autre session depuis le chargement. "
+            "Les données ont été rechargées : vérifie puis recommence la saisie."
+        )
+    return data
+
+
+# Mutation d'ajout → (collection, clé de l'enregistrement ajouté).
+_ADDED = {"add_player": ("players", "player"), "add_match": ("matches", "match"), "add_training": ("trainings", "training")}
+
+
+def _touched_keys(record):
+    """Lignes remplacées par une mutation : (genre, id du parent, joueur ou None pour toutes)."""
+    op = record["op"]
+    if op == "update_performances":
+        player_ids = {p["player_id"] for p in record["performances"]} | set(record["removed"])
+        return [("performances", record["match_id"], player_id) for player_id in sorted(player_ids)]
+    if op == "update_attendances":
+        return [("attendances", record["training_id"], a["player_id"]) for a in record["attendances"]]
+    if op == "set_attendances":
+        return [("attendances", record["training_id"], None)]
+    if op == "set_base_ratings":
+        return [("base_ratings", record["player_id"], None)]
+    return []
+
+
+def _touched_value(data, key):
+    kind, parent_id, player_id = key
+    if kind == "base_ratings":
+        player = find_player(data, parent_id)
+        return player.get("base_ratings") if player else None
+    parent = find_match(data, parent_id) if kind == "performances" else find_training(data, parent_id)
+    rows = parent.get(kind, []) if parent else []
+    if player_id is None:
+        return rows
+    return next((row for row in rows if row["player_id"] == player_id), None)
+
+
+def _describe(data, key):
+    kind, parent_id, player_id = key
+    player = find_player(data, player_id if kind != "base_ratings" else parent_id)
+    name = player["name"] if player else "?"
+    if kind == "base_ratings":
+        return f"Les notes de base de {name}"
+    if kind == "performances":
+        return f"La performance de {name} (match {parent_id})"
+    if player_id is None:
+        return f"La feuille de présence (séance {parent_id})"
+    return f"La présence de {name} (séance {parent_id})"
+
+
+def _apply_add(name, key):
+    def apply(data, record):
+        get_repository(data).insert(name, record[key])
+    return apply
+
+
+def _apply_add_performance(data, record):
+    match = mutable(data, "matches", record["match_id"])
+    if match is None:
+        raise KeyError(f"Match inconnu : {record['match_id']}")
+    match.setdefault("performances", []).append(record["performance"])
+    get_repository(data).record_performance(record["performance"])
+
+
+def _apply_add_performances(data, record):
+    match = mutable(data, "matches", record["match_id"])
+    if match is None:
+        raise KeyError(f"Match inconnu : {record['match_id']}")
+    match.setdefault("performances", []).extend(record["performances"])
+    repository = get_repository(data)
+    for performance in record["performances"]:
+        repository.record_performance(performance)
+
+
+def merge_player_rows(rows, changed, removed=()):
+    """Fusionne des lignes par joueur (perfs d'un match, présences d'une séance).
+
+    La première ligne d'un joueur de `changed` est remplacée sur place (les
+    nouveaux joueurs sont ajoutés à la fin), celles des joueurs de `removed`
+    sont retirées. Retourne `(nouvelles lignes, lignes écartées)`.
+    """
+    pending = {row["player_id"]: row for row in changed}
+    removed = set(removed)
+    merged, dropped = [], []
+    for row in rows:
+        player_id = row["player_id"]
+        if player_id in removed:
+            dropped.append(row)
+        elif player_id in pending:
+            merged.append(pending.pop(player_id))
+            dropped.append(row)
+        else:
+            merged.append(row)
+    merged.extend(pending.values())
+    return merged, dropped
+
+
+def _apply_update_performances(data, record):
+    match = mutable(data, "matches", record["match_id"])
+    if match is None:
+        raise KeyError(f"Match inconnu : {record['match_id']}")
+    match["performances"], dropped = merge_player_rows(
+        match.get("performances", []), record["performances"], record["removed"]
+    )
+    repository = get_repository(data)
+    for performance in dropped:
+        repository.discard_performance(performance)
+    for performance in record["performances"]:
+        repository.record_performance(performance)
+
+
+def _apply_update_attendances(data, record):
+    training = mutable(data, "trainings", record["training_id"])
+    if training is None:
+        raise KeyError(f"Séance inconnue : {record['training_id']}")
+    training["attendances"], _ = merge_player_rows(training.get("attendances", []), record["attendances"])
+
+
+def _apply_set_attendances(data, record):
+    training = mutable(data, "trainings", record["training_id"])
+    if training is None:
+        raise KeyError(f"Séance inconnue : {record['training_id']}")
+    training["attendances"] = record["attendances"]
+
+
+def _apply_set_base_ratings(data, record):
+    player = mutable(data, "players", record["player_id"])
+    if player is None:
+        raise KeyError(f"Joueur inconnu : {record['player_id']}")
+    player["base_ratings"] = record["base_ratings"]
+
+
+_APPLY = {
+    "add_player": _apply_add("players", "player"),
+    "add_match": _apply_add("matches", "match"),
+    "add_training": _apply_add("trainings", "training"),
+    "add_performance": _apply_add_performance,
+    "add_performances": _apply_add_performances,
+    "update_performances": _apply_update_performances,
+    "set_attendances": _apply_set_attendances,
+    "update_attendances": _apply_update_attendances,
+    "set_base_ratings": _apply_set_base_ratings,
+}
+
+
+def add_player(data, player):
+    _commit(data, "add_player", player=player)
+    return player
+
+
+def add_match(data, match):
+    _commit(data, "add_match", match=match)
+    return match
+
+
+def add_training(data, training):
+    _commit(data, "add_training", training=training)
+    return training
+
+
+def add_performance(data, match_id, performance):
+    _commit(data, "add_performance", match_id=match_id, performance=performance)
+    return performance
+
+
+def add_performances(data, match_id, performances):
+    """Ajoute toutes les perfs d'un match en une seule écriture (un seul enregistrement de journal)."""
+    _commit(data, "add_performances", match_id=match_id, performances=list(performances))
+    return performances
+
+
+def update_performances(data, match_id, performances, removed=()):
+    """N'écrit que les lignes modifiées d'une feuille de match (voir `merge_player_rows`)."""
+    _commit(data, "update_performances", match_id=match_id, performances=list(performances), removed=list(removed))
+
+
+def set_attendances(data, training_id, attendances):
+    _commit(data, "set_attendances", training_id=training_id, attendances=attendances)
+
+
+def update_attendances(data, training_id, attendances):
+    """N'écrit que les présences modifiées d'une séance."""
+    _commit(data, "update_attendances", training_id=training_id, attendances=list(attendances))
+
+
+def set_base_ratings(data, player_id, base_ratings):
+    _commit(data, "set_base_ratings", player_id=player_id, base_ratings=base_ratings)
+
+
+def collection_of(items):
+    """Nom de la collection ("players", "matches"…) à laquelle appartient cette liste."""
+    repository = _repository_for_items(items)
+    return repository.owns(items) if repository is not None else None
 
 
 def get_next_id(items):
+    repository = _repository_for_items(items)
+    if repository is not None:
+        return repository.next_id(repository.owns(items))
     if not items:
         return 1
     return max(item["id"] for item in items) + 1
 
 
 def find_player(data, player_id):
-    for player in data["players"]:
-        if player["id"] == player_id:
-            return player
-    return None
+    return get_repository(data).find_player(player_id)
 
 
 def find_match(data, match_id):
-    for match in data["matches"]:
-        if match["id"] == match_id:
-            return match
-    return None
+    return get_repository(data).find_match(match_id)
 
 
 def find_training(data, training_id):
-    for training in data["trainings"]:
-        if training["id"] == training_id:
-            return training
-    return None
+    return get_repository(data).find_training(training_id)
@@ -0,0 +1,79 @@
+"""Recherche de joueurs par préfixe, insensible à la casse et aux accents."""
+import bisect
+
+from core.text import fold
+
+
+class PlayerSearchIndex:
+    """Index des noms de joueurs, synchronisé par la fin de liste comme les index par id.
+
+    Chaque mot d'un nom, replié par `core.text.fold`, est rangé dans une
+    liste triée de `(mot, id)` : les joueurs dont un mot commence par un
+    préfixe donné sont trouvés par dichotomie, sans parcourir l'effectif. Les
+    homonymes reçoivent un libellé distinct (« Léo Martin (#12) »).
+    """
+
+    def __init__(self, players):
+        self.players = players
+        self.count = 0
+        self._rebuild()
+
+    def sync(self, players=None):
+        if players is not None and players is not self.players:
+            self.players = players
+            self._rebuild()
+        elif len(self.players) < self.count:
+            self._rebuild()
+        elif len(self.players) > self.count:
+            for player in self.players[self.count:]:
+                self._add(player)
+            self.count = len(self.players)
+
+    def _rebuild(self):
+        self._words = []
+        self._ordered = []
+        self._names = {}
+        self._homonyms = {}
+        self.count = 0
+        for player in self.players:
+            self._add(player)
+        self.count = len(self.players)
+
+    def _add(self, player):
+        player_id = player["id"]
+        name = fold(player["name"])
+        self._names[player_id] = (player["name"], name)
+        self._homonyms.setdefault(name, set()).add(player_id)
+        bisect.insort(self._ordered, (name, player_id))
+        for word in set(name.split()):
+            bisect.insort(self._words, (word, player_id))
+
+    def _with_prefix(self, prefix):
+        ids = set()
+        for word, player_id in self._words[bisect.bisect_left(self._words, (prefix,)):]:
+            if not word.startswith(prefix):
+                break
+            ids.add(player_id)
+        return ids
+
+    def search(self, query=""):
+        """Ids des joueurs dont chaque mot de `query` commence un mot du nom, par ordre alphabétique.
+
+        Une requête vide retourne tout l'effectif.
+        """
+        terms = fold(query).split()
+        if not terms:
+            return [player_id for _, player_id in self._ordered]
+        ids = self._with_prefix(terms[0])
+        for term in terms[1:]:
+            if not ids:
+                break
+            ids &= self._with_prefix(term)
+        return sorted(ids, key=lambda player_id: (self._names[player_id][1], player_id))
+
+    def label(self, player_id):
+        """Nom affiché du joueur, suivi de son id s'il a un homonyme."""
+        name, normalized = self._names[player_id]
+        if len(self._homonyms[normalized]) > 1:
+            return f"{name} (#{player_id})"
+        return name
@@ -0,0 +1,357 @@
+"""Stockage découpé par saison : joueurs partagés, un fichier par saison.
+
+Arborescence :
+    <root>/players.json             joueurs (identité commune à toutes les saisons)
+    <root>/meta.json                derniers ids attribués (matchs, séances)
+    <root>/seasons/2024-2025.json   matchs et séances de la saison
+
+La saison courante (recalculée à chaque appel : un serveur qui tourne
+passe seul à la saison suivante) est chargée d'office ; les saisons
+archivées ne sont lues que lorsqu'une vue (historique, carrière d'un
+joueur) en a besoin. Les écritures prennent `<root>/store.lock`, le même
+verrou entre processus que le journal JSON (`journal.file_lock`).
+"""
+import json
+import threading
+from contextlib import contextmanager
+from datetime import date
+from pathlib import Path
+
+from core import compact, profiling
+from storage import journal, repository
+
+
+# Mois de reprise : une saison commence en août.
+SEASON_START_MONTH = 8
+
+_SHARD_COLLECTIONS = ("matches", "trainings")
+
+
+def season_of(iso_date):
+    """'2024-10-05' → '2024-2025' ; '2025-03-01' → '2024-2025'."""
+    year, month = int(iso_date[:4]), int(iso_date[5:7])
+    start = year if month >= SEASON_START_MONTH else year - 1
+    return f"{start}-{start + 1}"
+
+
+def current_season(today=None):
+    return season_of((today or date.today()).isoformat())
+
+
+def _read_json(path, default):
+    path = Path(path)
+    if not path.exists():
+        return default
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class ShardedStore:
+    """Backend par saison, avec la même API que `storage.repository`."""
+
+    def __init__(self, root, today=None):
+        self.root = Path(root)
+        # Date fixe (tests) ; None : la date du jour, à chaque appel.
+        self.today = today
+        self._lock = threading.RLock()
+        self._lock_depth = 0
+        # fichier → (signature, contenu parsé) : chaque fichier n'est relu que s'il change.
+        self._files = {}
+        # saisons → (signatures des fichiers, données assemblées) : tant qu'aucun
+        # fichier ne change, chaque rerun reçoit le même dictionnaire (même révision).
+        self._assembled = {}
+
+    @property
+    def season(self):
+        return current_season(self.today)
+
+    @contextmanager
+    def _locked(self):
+        """Verrou des écritures : entre threads puis entre processus (réentrant dans le processus)."""
+        with self._lock:
+            if self._lock_depth:
+                self._lock_depth += 1
+                try:
+                    yield
+                finally:
+                    self._lock_depth -= 1
+                return
+            self.root.mkdir(parents=True, exist_ok=True)
+            with journal.file_lock(self.lock_file):
+                self._lock_depth = 1
+                try:
+                    yield
+                finally:
+                    self._lock_depth = 0
+
+    # ----- Fichiers -----
+
+    @property
+    def players_file(self):
+        return self.root / "players.json"
+
+    @property
+    def meta_file(self):
+        return self.root / "meta.json"
+
+    @property
+    def lock_file(self):
+        return self.root / "store.lock"
+
+    def shard_file(self, season):
+        return self.root / "seasons" / f"{season}.json"
+
+    def seasons(self):
+        """Saisons disponibles, de la plus ancienne à la plus récente."""
+        return sorted(p.stem for p in (self.root / "seasons").glob("*.json"))
+
+    def _read(self, path, default):
+        with self._lock:
+            signature = journal.file_signature(path)
+            cached = self._files.get(path)
+            if cached is not None and cached[0] == signature:
+                return cached[1]
+            with profiling.span("seasons.read", file=path.name):
+                content = _read_json(path, default)
+            if isinstance(content, list):
+                content = compact.freeze({"players": content})["players"]
+            else:
+                compact.freeze(content)
+            profiling.count("storage.bytes_read", signature[1] if signature else 0)
+            self._files[path] = (signature, content)
+            return content
+
+    def _write(self, path, content):
+        with self._lock:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with profiling.span("seasons.write", file=path.name):
+                journal.atomic_write_json(path, content)
+            self._files[path] = (journal.file_signature(path), content)
+
+    def _players(self):
+        return self._read(self.players_file, [])
+
+    def _shard(self, season):
+        shard = self._read(self.shard_file(season), {})
+        for name in _SHARD_COLLECTIONS:
+            shard.setdefault(name, [])
+        return shard
+
+    # ----- Lecture -----
+
+    def _signature(self, seasons):
+        return (journal.file_signature(self.players_file),) + tuple(
+            journal.file_signature(self.shard_file(season)) for season in seasons
+        )
+
+    def data_for(self, seasons):
+        """Joueurs + matchs et séances des saisons demandées (lues à la demande).
+
+        Le même dictionnaire est rendu tant que ni le fichier des joueurs ni
+        ceux de ces saisons n'ont changé, comme `repository.load_data`.
+        """
+        key = tuple(seasons)
+        with self._lock:
+            signature = self._signature(key)
+            cached = self._assembled.get(key)
+            if cached is not None and cached[0] == signature:
+                profiling.count("storage.load_cache_hits")
+                return cached[1]
+            data = repository.Dataset(players=list(self._players()), matches=[], trainings=[])
+            for season in seasons:
+                shard = self._shard(season)
+                for name in _SHARD_COLLECTIONS:
+                    data[name].extend(shard[name])
+            repository.get_repository(data)
+            self._assembled[key] = (signature, data)
+            return data
+
+    @contextmanager
+    def _mutating(self, data):
+        """Autour d'une écriture de ce processus sur `data` : si `data` était à jour,
+        il le reste (il contient déjà la modification), sans être réassemblé.
+        Toute l'écriture se fait sous `_locked()`."""
+        with self._locked():
+            fresh = [key for key, (signature, cached) in self._assembled.items()
+                     if cached is data and signature == self._signature(key)]
+            yield
+            for key in fresh:
+                self._assembled[key] = (self._signature(key), data)
+
+    def load_data(self):
+        return self.data_for([self.season])
+
+    def load_history(self):
+        seasons = self.seasons()
+        if self.season not in seasons:
+            seasons.append(self.season)
+        return self.data_for(seasons)
+
+    # ----- Écriture -----
+
+    def _put(self, season, name, record):
+        """Remplace (même id) ou ajoute l'enregistrement dans le fichier de sa saison."""
+        with self._locked():
+            shard = self._shard(season)
+            items = [item for item in shard[name] if item["id"] != record["id"]]
+            items.append(record)
+            items.sort(key=lambda item: item["id"])
+            shard[name] = items
+            self._write(self.shard_file(season), shard)
+
+    def _put_player(self, player):
+        with self._locked():
+            players = [p for p in self._players() if p["id"] != player["id"]]
+            players.append(player)
+            players.sort(key=lambda p: p["id"])
+            self._write(self.players_file, players)
+
+    def _bump_meta(self, name, item_id):
+        with self._locked():
+            meta = self._read(self.meta_file, {})
+            max_ids = meta.setdefault("max_ids", {})
+            if item_id > max_ids.get(name, 0):
+                max_ids[name] = item_id
+                self._write(self.meta_file, meta)
+
+    def save_data(self, data):
+        """Répartit les données par saison ; les saisons absentes de `data` sont conservées."""
+        with self._mutating(data):
+            self._write(self.players_file, data.get("players", []))
+            shards = {}
+            for name in _SHARD_COLLECTIONS:
+                for item in data.get(name, []):
+                    shard = shards.setdefault(season_of(item["date"]), {n: [] for n in _SHARD_COLLECTIONS})
+                    shard[name].append(item)
+                if data.get(name):
+                    self._bump_meta(name, max(item["id"] for item in data[name]))
+            for season, shard in shards.items():
+                self._write(self.shard_file(season), shard)
+            repository.get_repository(data).touch()
+
+    def add_player(self, data, player):
+        with self._mutating(data):
+            repo = repository.get_repository(data)
+            repo.claim_id("players", player)
+            repo.insert("players", player)
+            self._put_player(player)
+            repo.touch()
+            return player
+
+    def add_match(self, data, match):
+        with self._mutating(data):
+            repo = repository.get_repository(data)
+            repo.claim_id("matches", match)
+            repo.insert("matches", match)
+            self._put(season_of(match["date"]), "matches", match)
+            self._bump_meta("matches", match["id"])
+            repo.touch()
+            return match
+
+    def add_training(self, data, training):
+        with self._mutating(data):
+            repo = repository.get_repository(data)
+            repo.claim_id("trainings", training)
+            repo.insert("trainings", training)
+            self._put(season_of(training["date"]), "trainings", training)
+            self._bump_meta("trainings", training["id"])
+            repo.touch()
+            return training
+
+    def add_performance(self, data, match_id, performance):
+        with self._mutating(data):
+            match = repository.mutable(data, "matches", match_id)
+            if match is None:
+                raise KeyError(f"Match inconnu : {match_id}")
+            match.setdefault("performances", []).append(performance)
+            repository.get_repository(data).record_performance(performance)
+            self._put(season_of(match["date"]), "matches", match)
+            repository.get_repository(data).touch()
+            return performance
+
+    def add_performances(self, data, match_id, performances):
+        with self._mutating(data):
+            match = repository.mutable(data, "matches", match_id)
+            if match is None:
+                raise KeyError(f"Match inconnu : {match_id}")
+            match.setdefault("performances", []).extend(performances)
+            for performance in performances:
+                repository.get_repository(data).record_performance(performance)
+            self._put(season_of(match["date"]), "matches", match)
+            repository.get_repository(data).touch()
+            return performances
+
+    def update_performances(self, data, match_id, performances, removed=()):
+        with self._mutating(data):
+            match = repository.mutable(data, "matches", match_id)
+            if match is None:
+                raise KeyError(f"Match inconnu : {match_id}")
+            match["performances"], dropped = repository.merge_player_rows(
+                match.get("performances", []), performances, removed
+            )
+            for performance in dropped:
+                repository.get_repository(data).discard_performance(performance)
+            for performance in performances:
+                repository.get_repository(data).record_performance(performance)
+            self._put(season_of(match["date"]), "matches", match)
+            repository.get_repository(data).touch()
+
+    def set_attendances(self, data, training_id, attendances):
+        with self._mutating(data):
+            training = repository.mutable(data, "trainings", training_id)
+            if training is None:
+                raise KeyError(f"Séance inconnue : {training_id}")
+            training["attendances"] = attendances
+            self._put(season_of(training["date"]), "trainings", training)
+            repository.get_repository(data).touch()
+
+    def update_attendances(self, data, training_id, attendances):
+        with self._mutating(data):
+            training = repository.mutable(data, "trainings", training_id)
+            if training is None:
+                raise KeyError(f"Séance inconnue : {training_id}")
+            merged, _ = repository.merge_player_rows(training.get("attendances", []), attendances)
+            self.set_attendances(data, training_id, merged)
+
+    def set_base_ratings(self, data, player_id, base_ratings):
+        with self._mutating(data):
+            player = repository.mutable(data, "players", player_id)
+            if player is None:
+                raise KeyError(f"Joueur inconnu : {player_id}")
+            player["base_ratings"] = base_ratings
+            self._put_player(player)
+            repository.get_repository(data).touch()
+
+    # ----- Recherche -----
+
+    def get_next_id(self, items):
+        """Id suivant, unique sur toutes les saisons (y compris non chargées)."""
+        next_id = repository.get_next_id(items)
+        name = repository.collection_of(items)
+        if name in _SHARD_COLLECTIONS:
+            max_ids = self._read(self.meta_file, {}).get("max_ids", {})
+            next_id = max(next_id, max_ids.get(name, 0) + 1)
+        return next_id
+
+    @staticmethod
+    def find_player(data, player_id):
+        return repository.find_player(data, player_id)
+
+    @staticmethod
+    def player_search(data):
+        return repository.player_search(data)
+
+    @staticmethod
+    def find_match(data, match_id):
+        return repository.find_match(data, match_id)
+
+    @staticmethod
+    def find_training(data, training_id):
+        return repository.find_training(data, training_id)
+
+
+def migrate_json_to_shards(json_path, root):
+    """Découpe un `u9_data.json` (et son journal) en fichiers par saison."""
+    store = ShardedStore(root)
+    store.save_data(repository.load_data_file(json_path))
+    return store
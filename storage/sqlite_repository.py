@@ -0,0 +1,400 @@
+"""Backend SQLite optionnel, avec la même API que `storage.repository`."""
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+from core import compact, profiling
+from storage import repository
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS players (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    birth_year INTEGER,
+    preferred_position TEXT,
+    foot TEXT,
+    base_ratings TEXT NOT NULL DEFAULT '{}'
+);
+CREATE TABLE IF NOT EXISTS matches (
+    id INTEGER PRIMARY KEY,
+    date TEXT NOT NULL,
+    opponent TEXT,
+    competition TEXT
+);
+CREATE TABLE IF NOT EXISTS performances (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    match_id INTEGER NOT NULL REFERENCES matches(id),
+    player_id INTEGER NOT NULL,
+    position TEXT,
+    minutes INTEGER,
+    tech INTEGER,
+    phys INTEGER,
+    tact INTEGER,
+    mental INTEGER,
+    goals INTEGER,
+    assists INTEGER,
+    comment TEXT
+);
+CREATE TABLE IF NOT EXISTS trainings (
+    id INTEGER PRIMARY KEY,
+    date TEXT NOT NULL,
+    theme TEXT,
+    type TEXT,
+    notes TEXT
+);
+CREATE TABLE IF NOT EXISTS attendances (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    training_id INTEGER NOT NULL REFERENCES trainings(id),
+    player_id INTEGER NOT NULL,
+    present INTEGER,
+    effort INTEGER,
+    focus INTEGER,
+    comment TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_matches_date ON matches(date);
+CREATE INDEX IF NOT EXISTS idx_trainings_date ON trainings(date);
+CREATE INDEX IF NOT EXISTS idx_performances_match ON performances(match_id);
+CREATE INDEX IF NOT EXISTS idx_performances_player ON performances(player_id);
+CREATE INDEX IF NOT EXISTS idx_attendances_training ON attendances(training_id);
+CREATE INDEX IF NOT EXISTS idx_attendances_player ON attendances(player_id);
+"""
+
+PERFORMANCE_FIELDS = (
+    "player_id", "position", "minutes", "tech", "phys", "tact", "mental", "goals", "assists", "comment",
+)
+ATTENDANCE_FIELDS = ("player_id", "present", "effort", "focus", "comment")
+
+
+class SqliteRepository:
+    """Stockage normalisé (joueurs, matchs, perfs, séances, présences) dans SQLite.
+
+    S'utilise à la place du module `storage.repository` : mêmes fonctions
+    de chargement, de sauvegarde, de recherche et de mutation.
+
+    Une seule connexion, partagée par les sessions sous un verrou. Les
+    données chargées sont gardées tant que `PRAGMA data_version` ne change
+    pas, c'est-à-dire tant qu'aucune autre connexion n'a écrit : chaque
+    rerun reçoit le même dictionnaire (même révision). Les écritures de
+    cette connexion passent d'abord en base, puis sont appliquées en mémoire.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = Path(db_path)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        self._conn.executescript(SCHEMA)
+        # (data_version, données) du dernier chargement.
+        self._loaded = None
+
+    @contextmanager
+    def _transaction(self, data):
+        """Connexion dans une transaction (validée en sortie, annulée sur exception).
+
+        Les écritures de cette connexion ne changent pas `data_version` : si
+        `data` n'est pas le jeu de données en cache, celui-ci est oublié.
+        """
+        with self._lock:
+            with self._conn:
+                yield self._conn
+            if self._loaded is not None and self._loaded[1] is not data:
+                self._loaded = None
+
+    def _data_version(self):
+        return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    # ----- Lecture -----
+
+    def load_data(self):
+        """Données de la base, relues seulement si une autre connexion a écrit depuis."""
+        with self._lock:
+            version = self._data_version()
+            if self._loaded is not None and self._loaded[0] == version:
+                profiling.count("storage.load_cache_hits")
+                return self._loaded[1]
+            # Une seule transaction de lecture : un état cohérent même si un autre processus écrit.
+            self._conn.execute("BEGIN")
+            try:
+                data = self._read_all()
+            finally:
+                self._conn.rollback()
+            self._loaded = (version, data)
+            return data
+
+    @profiling.profiled("sqlite.load_data")
+    def _read_all(self):
+        conn = self._conn
+        players = [
+            {
+                "id": row[0],
+                "name": row[1],
+                "birth_year": row[2],
+                "preferred_position": row[3],
+                "foot": row[4],
+                "base_ratings": json.loads(row[5]),
+            }
+            for row in conn.execute(
+                "SELECT id, name, birth_year, preferred_position, foot, base_ratings "
+                "FROM players ORDER BY id"
+            )
+        ]
+        matches = {}
+        for row in conn.execute("SELECT id, date, opponent, competition FROM matches ORDER BY id"):
+            matches[row[0]] = {
+                "id": row[0],
+                "date": row[1],
+                "opponent": row[2],
+                "competition": row[3],
+                "performances": [],
+            }
+        for row in conn.execute(
+            f"SELECT match_id, {', '.join(PERFORMANCE_FIELDS)} FROM performances ORDER BY seq"
+        ):
+            matches[row[0]]["performances"].append(dict(zip(PERFORMANCE_FIELDS, row[1:])))
+        trainings = {}
+        for row in conn.execute("SELECT id, date, theme, type, notes FROM trainings ORDER BY id"):
+            trainings[row[0]] = {
+                "id": row[0],
+                "date": row[1],
+                "theme": row[2],
+                "type": row[3],
+                "notes": row[4],
+                "attendances": [],
+            }
+        for row in conn.execute(
+            f"SELECT training_id, {', '.join(ATTENDANCE_FIELDS)} FROM attendances ORDER BY seq"
+        ):
+            att = dict(zip(ATTENDANCE_FIELDS, row[1:]))
+            att["present"] = bool(att["present"])
+            trainings[row[0]]["attendances"].append(att)
+
+        data = repository.Dataset(
+            players=players,
+            matches=list(matches.values()),
+            trainings=list(trainings.values()),
+        )
+        compact.freeze(data)
+        repository.get_repository(data)
+        return data
+
+    def load_history(self):
+        return self.load_data()
+
+    @profiling.profiled("sqlite.query_performances")
+    def query_performances(self, start=None, end=None, player_ids=None):
+        """Perfs de match filtrées côté SQL (dates ISO incluses, liste de joueurs).
+
+        Les colonnes suivent `services.analytics.PERFORMANCE_COLUMNS`.
+        """
+        clauses = []
+        params = []
+        if start is not None:
+            clauses.append("m.date >= ?")
+            params.append(str(start))
+        if end is not None:
+            clauses.append("m.date <= ?")
+            params.append(str(end))
+        if player_ids is not None:
+            player_ids = list(player_ids)
+            if not player_ids:
+                return []
+            clauses.append(f"p.player_id IN ({', '.join('?' for _ in player_ids)})")
+            params.extend(player_ids)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        query = (
+            "SELECT pl.name, p.player_id, m.date, (p.tech + p.phys + p.tact + p.mental) / 4.0, "
+            "p.tech, p.phys, p.tact, p.mental, p.minutes, p.goals, p.assists, "
+            "m.id, m.opponent, m.competition "
+            "FROM performances p "
+            "JOIN matches m ON m.id = p.match_id "
+            "JOIN players pl ON pl.id = p.player_id "
+            f"{where} ORDER BY m.date, p.seq"
+        )
+        with self._lock:
+            return self._conn.execute(query, params).fetchall()
+
+    # ----- Écriture -----
+
+    @profiling.profiled("sqlite.save_data")
+    def save_data(self, data):
+        """Remplace tout le contenu de la base en une seule transaction."""
+        with self._transaction(data) as conn:
+            for table in ("attendances", "performances", "trainings", "matches", "players"):
+                conn.execute(f"DELETE FROM {table}")
+            _insert_all(conn, data)
+        repository.get_repository(data).touch()
+
+    def _add(self, data, name, item, insert):
+        store = repository.get_repository(data)
+        if item.get("id") is None:
+            item["id"] = store.next_id(name)
+        with self._transaction(data) as conn:
+            insert(conn, item)
+        store.insert(name, item)
+        store.touch()
+        return item
+
+    def add_player(self, data, player):
+        return self._add(data, "players", player, _insert_player)
+
+    def add_match(self, data, match):
+        return self._add(data, "matches", match, _insert_match)
+
+    def add_training(self, data, training):
+        return self._add(data, "trainings", training, _insert_training)
+
+    def add_performance(self, data, match_id, performance):
+        self.add_performances(data, match_id, [performance])
+        return performance
+
+    def add_performances(self, data, match_id, performances):
+        if repository.find_match(data, match_id) is None:
+            raise KeyError(f"Match inconnu : {match_id}")
+        with self._transaction(data) as conn:
+            _insert_performances(conn, match_id, performances)
+        match = repository.mutable(data, "matches", match_id)
+        match.setdefault("performances", []).extend(performances)
+        for performance in performances:
+            repository.get_repository(data).record_performance(performance)
+        repository.get_repository(data).touch()
+        return performances
+
+    def update_performances(self, data, match_id, performances, removed=()):
+        match = repository.find_match(data, match_id)
+        if match is None:
+            raise KeyError(f"Match inconnu : {match_id}")
+        merged, dropped = repository.merge_player_rows(match.get("performances", []), performances, removed)
+        # Les lignes du match sont réécrites pour garder l'ordre (seq) de la liste fusionnée.
+        with self._transaction(data) as conn:
+            conn.execute("DELETE FROM performances WHERE match_id = ?", (match_id,))
+            _insert_performances(conn, match_id, merged)
+        repository.mutable(data, "matches", match_id)["performances"] = merged
+        for performance in dropped:
+            repository.get_repository(data).discard_performance(performance)
+        for performance in performances:
+            repository.get_repository(data).record_performance(performance)
+        repository.get_repository(data).touch()
+
+    def set_attendances(self, data, training_id, attendances):
+        if repository.find_training(data, training_id) is None:
+            raise KeyError(f"Séance inconnue : {training_id}")
+        with self._transaction(data) as conn:
+            conn.execute("DELETE FROM attendances WHERE training_id = ?", (training_id,))
+            _insert_attendances(conn, training_id, attendances)
+        repository.mutable(data, "trainings", training_id)["attendances"] = attendances
+        repository.get_repository(data).touch()
+
+    def update_attendances(self, data, training_id, attendances):
+        training = repository.find_training(data, training_id)
+        if training is None:
+            raise KeyError(f"Séance inconnue : {training_id}")
+        merged, _ = repository.merge_player_rows(training.get("attendances", []), attendances)
+        self.set_attendances(data, training_id, merged)
+
+    def set_base_ratings(self, data, player_id, base_ratings):
+        if repository.find_player(data, player_id) is None:
+            raise KeyError(f"Joueur inconnu : {player_id}")
+        with self._transaction(data) as conn:
+            conn.execute(
+                "UPDATE players SET base_ratings = ? WHERE id = ?",
+                (json.dumps(base_ratings, ensure_ascii=False), player_id),
+            )
+        repository.mutable(data, "players", player_id)["base_ratings"] = base_ratings
+        repository.get_repository(data).touch()
+
+    # ----- Recherche (index en mémoire partagés avec le backend JSON) -----
+
+    @staticmethod
+    def get_next_id(items):
+        return repository.get_next_id(items)
+
+    @staticmethod
+    def find_player(data, player_id):
+        return repository.find_player(data, player_id)
+
+    @staticmethod
+    def player_search(data):
+        return repository.player_search(data)
+
+    @staticmethod
+    def find_match(data, match_id):
+        return repository.find_match(data, match_id)
+
+    @staticmethod
+    def find_training(data, training_id):
+        return repository.find_training(data, training_id)
+
+
+def _insert_player(conn, player):
+    conn.execute(
+        "INSERT INTO players (id, name, birth_year, preferred_position, foot, base_ratings) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        (
+            player["id"],
+            player["name"],
+            player.get("birth_year"),
+            player.get("preferred_position"),
+            player.get("foot"),
+            json.dumps(player.get("base_ratings") or {}, ensure_ascii=False),
+        ),
+    )
+
+
+def _insert_match(conn, match):
+    conn.execute(
+        "INSERT INTO matches (id, date, opponent, competition) VALUES (?, ?, ?, ?)",
+        (match["id"], match["date"], match.get("opponent"), match.get("competition")),
+    )
+    _insert_performances(conn, match["id"], match.get("performances", []))
+
+
+def _insert_training(conn, training):
+    conn.execute(
+        "INSERT INTO trainings (id, date, theme, type, notes) VALUES (?, ?, ?, ?, ?)",
+        (training["id"], training["date"], training.get("theme"), training.get("type"), training.get("notes", "")),
+    )
+    _insert_attendances(conn, training["id"], training.get("attendances", []))
+
+
+def _insert_performances(conn, match_id, performances):
+    conn.executemany(
+        f"INSERT INTO performances (match_id, {', '.join(PERFORMANCE_FIELDS)}) "
+        f"VALUES (?, {', '.join('?' for _ in PERFORMANCE_FIELDS)})",
+        [(match_id, *(perf.get(field) for field in PERFORMANCE_FIELDS)) for perf in performances],
+    )
+
+
+def _insert_attendances(conn, training_id, attendances):
+    conn.executemany(
+        f"INSERT INTO attendances (training_id, {', '.join(ATTENDANCE_FIELDS)}) "
+        f"VALUES (?, {', '.join('?' for _ in ATTENDANCE_FIELDS)})",
+        [(training_id, *(att.get(field) for field in ATTENDANCE_FIELDS)) for att in attendances],
+    )
+
+
+def _insert_all(conn, data):
+    for player in data.get("players", []):
+        _insert_player(conn, player)
+    for match in data.get("matches", []):
+        _insert_match(conn, match)
+    for training in data.get("trainings", []):
+        _insert_training(conn, training)
+
+
+def migrate_json_to_sqlite(json_path, db_path):
+    """Migration unique de `u9_data.json` (et de son journal) vers une base SQLite."""
+    data = repository.load_data_file(json_path)
+    store = SqliteRepository(db_path)
+    store.save_data(data)
+    return store
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) != 3:
+        sys.exit("usage: python -m storage.sqlite_repository u9_data.json u9_data.sqlite3")
+    migrate_json_to_sqlite(sys.argv[1], sys.argv[2])
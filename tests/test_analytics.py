@@ -0,0 +1,121 @@
+import unittest
+from datetime import date
+
+import pandas as pd
+
+from services import analytics
+from storage import repository
+
+
+def _sample_data():
+    return {
+        "players": [
+            {"id": 1, "name": "Alex", "base_ratings": {}},
+            {"id": 2, "name": "Sam", "base_ratings": {}},
+        ],
+        "matches": [
+            {"id": 1, "date": "2024-03-02", "opponent": "FC A", "competition": "Plateau", "performances": [
+                {"player_id": 1, "position": "Milieu", "minutes": 40, "tech": 4, "phys": 3,
+                 "tact": 4, "mental": 5, "goals": 1, "assists": 0, "comment": ""},
+                {"player_id": 2, "position": "Gardien", "minutes": 20, "tech": 2, "phys": 3,
+                 "tact": 3, "mental": 4, "goals": 0, "assists": 1, "comment": ""},
+                {"player_id": 99, "position": "Milieu", "minutes": 10, "tech": 1, "phys": 1,
+                 "tact": 1, "mental": 1, "goals": 0, "assists": 0, "comment": "Joueur supprimé"},
+            ]},
+            {"id": 2, "date": "2024-04-20", "opponent": "FC B", "competition": "Amical", "performances": [
+                {"player_id": 1, "position": "Attaquant", "minutes": 30, "tech": 5, "phys": 4,
+                 "tact": 3, "mental": 4, "goals": 2, "assists": 1, "comment": ""},
+            ]},
+        ],
+        "trainings": [],
+    }
+
+
+class PerformanceFrameTests(unittest.TestCase):
+    def test_frame_is_columnar_and_skips_unknown_players(self):
+        df = analytics.build_performance_frame(_sample_data())
+
+        self.assertEqual(list(df.columns), analytics.PERFORMANCE_COLUMNS)
+        self.assertEqual(df["Joueur"].tolist(), ["Alex", "Sam", "Alex"])
+        self.assertEqual(df["overall"].tolist(), [4.0, 3.0, 4.0])
+        self.assertEqual(df["date"].iloc[2], pd.Timestamp(2024, 4, 20))
+        for col in ("Joueur", "adversaire", "competition"):
+            self.assertIsInstance(df[col].dtype, pd.CategoricalDtype)
+
+    def test_empty_data_gives_empty_frame(self):
+        self.assertTrue(analytics.build_performance_frame({"players": [], "matches": []}).empty)
+        self.assertTrue(analytics.aggregate_match_means({"players": [], "matches": []}).empty)
+
+    def test_aggregates_derive_from_shared_frame(self):
+        data = _sample_data()
+        agg = analytics.aggregate_match_means(data)
+
+        self.assertEqual(agg.loc["Alex", "Tech"], 4.5)
+        self.assertEqual(agg.loc["Alex", "Buts"], 3)
+        self.assertEqual(agg.loc["Sam", "Passes"], 1)
+
+        minutes = analytics.aggregate_minutes(analytics.get_all_match_performances(data))
+        self.assertEqual(minutes.loc["Alex", "Minutes_totales"], 70)
+        self.assertEqual(minutes.loc["Alex", "Minutes / match"], 35.0)
+
+    def test_minutes_follow_the_period(self):
+        data = _sample_data()
+
+        whole = analytics.minutes_between(data)
+        april = analytics.minutes_between(data, start=date(2024, 4, 1))
+
+        self.assertEqual(whole.loc["Alex", "Minutes_totales"], 70)
+        self.assertEqual(april.loc["Alex", "Minutes_totales"], 30)
+        self.assertEqual(april.loc["Alex", "Matches"], 1)
+        self.assertNotIn("Sam", april.index)
+        self.assertTrue(analytics.minutes_between(data, end=date(2024, 1, 1)).empty)
+
+    def test_progress_deltas_compare_date_windows(self):
+        df_all = analytics.get_all_match_performances(_sample_data())
+
+        df_delta, top_up, _ = analytics.compute_progress_deltas(df_all, today=date(2024, 4, 25))
+
+        self.assertEqual(df_delta.loc["Alex", "Delta"], 0.0)
+        self.assertEqual(len(top_up), 1)
+
+
+class AnalyticsCacheTests(unittest.TestCase):
+    def setUp(self):
+        analytics._cache.clear()
+
+    def test_reruns_hit_the_cache_until_data_changes(self):
+        data = _sample_data()
+        first = analytics.get_all_match_performances(data)
+        analytics.aggregate_minutes(first)
+
+        self.assertIs(analytics.get_all_match_performances(data), first)
+        analytics.aggregate_minutes(first)
+        self.assertEqual(analytics.cache_stats()["hits"], 2)
+
+        data["matches"][1]["performances"].append(dict(data["matches"][1]["performances"][0]))
+        repository.get_repository(data).touch()
+
+        second = analytics.get_all_match_performances(data)
+        self.assertIsNot(second, first)
+        self.assertEqual(len(second), 4)
+
+    def test_filtered_frames_are_not_cached(self):
+        data = _sample_data()
+        df_all = analytics.get_all_match_performances(data)
+        misses = analytics.cache_stats()["misses"]
+
+        analytics.aggregate_minutes(df_all[df_all["player_id"] == 1])
+
+        self.assertEqual(analytics.cache_stats()["misses"], misses)
+
+    def test_cache_is_bounded(self):
+        cache = analytics.AnalyticsCache(maxsize=2)
+        for revision in range(3):
+            cache.get_or_compute(("f", revision, ()), lambda: revision)
+
+        self.assertEqual(cache.stats()["size"], 2)
+        self.assertIsNone(cache.peek(("f", 0, ())))
+
+
+if __name__ == "__main__":
+    unittest.main()
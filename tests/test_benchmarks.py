@@ -0,0 +1,34 @@
+import unittest
+
+from benchmarks.run import find_regressions, startup_heavy_modules
+from benchmarks.synthetic import generate_club
+
+
+class SyntheticClubTests(unittest.TestCase):
+    def test_generation_is_seeded_and_sized(self):
+        club = generate_club(seed=3, players=12, matches=5, perfs_per_match=8, trainings=4, attendance_density=1.0)
+
+        self.assertEqual(club, generate_club(seed=3, players=12, matches=5, perfs_per_match=8,
+                                             trainings=4, attendance_density=1.0))
+        self.assertNotEqual(club, generate_club(seed=4, players=12, matches=5, perfs_per_match=8,
+                                                trainings=4, attendance_density=1.0))
+        self.assertEqual(len(club["players"]), 12)
+        self.assertTrue(all(len(m["performances"]) == 8 for m in club["matches"]))
+        self.assertTrue(all(len(t["attendances"]) == 12 for t in club["trainings"]))
+
+
+class RegressionGateTests(unittest.TestCase):
+    def test_only_slowdowns_beyond_tolerance_are_reported(self):
+        baseline = {"a[small]": 1.0, "b[small]": 1.0}
+        results = {"a[small]": 1.2, "b[small]": 1.3, "c[small]": 9.0}
+
+        self.assertEqual(find_regressions(results, baseline, 0.25), [("b[small]", 1.0, 1.3)])
+
+
+class StartupTests(unittest.TestCase):
+    def test_default_page_starts_without_heavy_dependencies(self):
+        self.assertEqual(startup_heavy_modules(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
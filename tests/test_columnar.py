@@ -0,0 +1,131 @@
+import copy
+import io
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import pandas as pd
+
+from benchmarks.run import _import_in_fresh_interpreter
+from benchmarks.synthetic import generate_club
+from core import compact
+from services import analytics, columnar, training_analytics
+from storage import journal, repository
+
+
+def _club():
+    return generate_club(seed=3, players=12, matches=15, perfs_per_match=8, trainings=10, attendance_density=0.8)
+
+
+@unittest.skipUnless(columnar.available(), "needs pyarrow")
+class ColumnarExportTests(unittest.TestCase):
+    def test_flatten_normalizes_every_collection(self):
+        data = _club()
+        data["matches"][0]["performances"][0] = {"player_id": 1, "minutes": 40}
+
+        tables = columnar.flatten(compact.freeze(copy.deepcopy(data)))
+
+        self.assertEqual(tables, columnar.flatten(data))
+        self.assertEqual(len(tables["players"]["id"]), 12)
+        self.assertEqual(len(tables["performances"]["match_id"]), 15 * 8)
+        self.assertEqual(tables["performances"]["match_id"][:2], [1, 1])
+        self.assertIsNone(tables["performances"]["tech"][0])
+        self.assertEqual(
+            len(tables["base_ratings"]["skill"]), sum(len(p["base_ratings"]) for p in data["players"])
+        )
+        self.assertEqual(
+            len(tables["attendances"]["training_id"]), sum(len(t["attendances"]) for t in data["trainings"])
+        )
+
+    def test_archive_round_trip_keeps_types(self):
+        data = _club()
+        for fmt in columnar.FORMATS:
+            buffer = columnar.write_archive(data, io.BytesIO(), fmt)
+            tables = columnar.read_archive(io.BytesIO(buffer.getvalue()))
+
+            self.assertEqual(sorted(tables), sorted(columnar.TABLES))
+            performances = tables["performances"]
+            self.assertEqual(str(performances.schema.field("tech").type), "int8")
+            self.assertEqual(str(tables["matches"].schema.field("date").type), "date32[day]")
+            self.assertEqual(performances.column("player_id").to_pylist(),
+                             [p["player_id"] for m in data["matches"] for p in m["performances"]])
+
+    def test_frames_from_tables_match_frames_from_data(self):
+        data = _club()
+        del data["players"][0]
+        data["trainings"][0]["attendances"].append({"player_id": 2})
+        tables = columnar.to_arrow(data)
+
+        pd.testing.assert_frame_equal(
+            analytics.performance_frame_from_tables(tables), analytics.build_performance_frame(data)
+        )
+        pd.testing.assert_frame_equal(
+            training_analytics.attendance_frame_from_tables(tables),
+            training_analytics.build_attendance_frame(data),
+        )
+
+
+@unittest.skipUnless(columnar.available(), "needs pyarrow")
+class SnapshotCacheTests(unittest.TestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.data_file = Path(tmpdir.name) / "data.json"
+        patcher = mock.patch.object(repository, "DATA_FILE", self.data_file)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        repository.save_data(_club())
+
+    def _cold_start(self):
+        repository.clear_load_cache()
+        return repository.load_data()
+
+    def test_cold_start_reads_the_snapshot(self):
+        expected = analytics.get_all_match_performances(self._cold_start())
+        self.assertTrue((columnar.snapshot_dir_for(self.data_file) / "performances.parquet").exists())
+
+        data = self._cold_start()
+        with mock.patch.object(analytics, "build_performance_frame") as build:
+            df = analytics.get_all_match_performances(data)
+
+        build.assert_not_called()
+        pd.testing.assert_frame_equal(df, expected)
+
+    def test_writes_fall_back_to_memory_until_compaction(self):
+        data = self._cold_start()
+        analytics.get_all_match_performances(data)
+        repository.add_performance(data, 1, dict(data["matches"][0]["performances"][0]))
+
+        with mock.patch.object(columnar, "write_snapshot") as write:
+            df = analytics.get_all_match_performances(data)
+            attendances = training_analytics.build_attendance_frame(data)
+
+        write.assert_not_called()
+        self.assertEqual(len(df), 15 * 8 + 1)
+        self.assertEqual(len(attendances), sum(len(t["attendances"]) for t in data["trainings"]))
+
+        repository.compact()
+        data = self._cold_start()
+        with mock.patch.object(analytics, "build_performance_frame") as build:
+            self.assertEqual(len(analytics.get_all_match_performances(data)), 15 * 8 + 1)
+        build.assert_not_called()
+
+    def test_replaced_data_file_at_same_version_is_not_served_from_snapshot(self):
+        version = self._cold_start()["version"]
+        other = generate_club(seed=4, players=5, matches=3, perfs_per_match=4, trainings=2, attendance_density=0.5)
+        other["version"] = version
+        journal.atomic_write_json(self.data_file, other)
+
+        data = self._cold_start()
+        self.assertEqual(data["version"], version)
+        self.assertIsNone(columnar.snapshot_tables(data, ["performances"]))
+        self.assertEqual(len(analytics.get_all_match_performances(data)), 3 * 4)
+
+
+class LazyImportTests(unittest.TestCase):
+    def test_columnar_import_does_not_load_pyarrow(self):
+        self.assertNotIn("pyarrow", _import_in_fresh_interpreter(["services.columnar"]))
+
+if __name__ == "__main__":
+    unittest.main()
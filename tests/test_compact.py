@@ -0,0 +1,121 @@
+import copy
+import json
+import tempfile
+import tracemalloc
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from benchmarks.synthetic import generate_club
+from core import compact
+from core.models import Match
+from storage import repository
+
+
+def _club():
+    return generate_club(seed=5, players=14, matches=30, perfs_per_match=9, trainings=20, attendance_density=0.9)
+
+
+class CompactModelTests(unittest.TestCase):
+    def test_round_trip_is_lossless(self):
+        original = _club()
+        original["version"] = 7
+        # Rows the compact columns cannot hold are kept as they are
+        original["matches"][0]["performances"][0] = {"player_id": 1, "minutes": 40}
+        original["matches"][1]["performances"][0]["tech"] = True
+        original["matches"][2]["performances"][0]["minutes"] = 10 ** 9
+        original["trainings"][0]["attendances"].append({"player_id": 99, "present": 1})
+        original["players"][0]["nickname"] = "Lolo"
+
+        frozen = compact.freeze(copy.deepcopy(original))
+
+        self.assertIsInstance(frozen["matches"][3], Match)
+        self.assertEqual(frozen, original)
+        self.assertEqual(compact.to_data(frozen), original)
+        self.assertEqual(json.dumps(frozen, default=compact.json_default), json.dumps(original))
+
+    def test_views_read_like_dicts(self):
+        original = _club()
+        frozen = compact.freeze(copy.deepcopy(original))
+
+        match, perf = frozen["matches"][0], frozen["matches"][0]["performances"][0]
+        self.assertEqual(match["date"], original["matches"][0]["date"])
+        self.assertEqual(dict(perf), original["matches"][0]["performances"][0])
+        self.assertEqual(perf.get("missing", "-"), "-")
+        self.assertIs(frozen["trainings"][0]["attendances"][0]["present"],
+                      original["trainings"][0]["attendances"][0]["present"])
+        self.assertEqual(
+            list(compact.iter_rows(match["performances"], ("player_id", "position"))),
+            [(p["player_id"], p["position"]) for p in original["matches"][0]["performances"]],
+        )
+
+    def test_thaw_gives_an_editable_copy(self):
+        frozen = compact.freeze(_club())
+
+        plain = compact.thaw(frozen["matches"][0])
+        plain["performances"].append({"player_id": 1})
+
+        self.assertIs(type(plain["performances"]), list)
+        self.assertEqual(len(frozen["matches"][0]["performances"]) + 1, len(plain["performances"]))
+
+    def test_resident_memory_is_much_smaller(self):
+        payload = json.dumps(generate_club(seed=1, players=20, matches=200, perfs_per_match=10,
+                                           trainings=200, attendance_density=0.9))
+
+        tracemalloc.start()
+        try:
+            plain = json.loads(payload)
+            plain_size = tracemalloc.get_traced_memory()[0]
+            del plain
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            frozen = compact.freeze(json.loads(payload))
+            frozen_size = tracemalloc.get_traced_memory()[0] - base
+        finally:
+            tracemalloc.stop()
+
+        self.assertIsNotNone(frozen)
+        self.assertLess(frozen_size, plain_size / 2)
+
+
+class CompactRepositoryTests(unittest.TestCase):
+    def test_loaded_data_is_compact_and_only_edited_records_are_thawed(self):
+        with tempfile.TemporaryDirectory() as tmpdir, \
+                mock.patch.object(repository, "DATA_FILE", Path(tmpdir) / "data.json"):
+            repository.save_data(_club())
+            repository.clear_load_cache()
+            data = repository.load_data()
+            self.assertTrue(all(isinstance(m, Match) for m in data["matches"]))
+
+            repository.add_performance(data, 2, {"player_id": 1, "minutes": 10})
+
+            self.assertIs(type(repository.find_match(data, 2)), dict)
+            self.assertIsInstance(repository.find_match(data, 3), Match)
+            repository.clear_load_cache()
+            self.assertEqual(repository.load_data(), data)
+
+    def test_views_held_across_a_write_keep_old_values_until_reread(self):
+        with tempfile.TemporaryDirectory() as tmpdir, \
+                mock.patch.object(repository, "DATA_FILE", Path(tmpdir) / "data.json"):
+            repository.save_data(_club())
+            repository.clear_load_cache()
+            data = repository.load_data()
+            match = repository.find_match(data, 2)
+            rows = match["performances"]
+            first = rows[0]
+            before = (len(rows), first["minutes"])
+            edited = dict(first, minutes=first["minutes"] + 1)
+
+            repository.update_performances(data, 2, [edited])
+
+            # Held objects are a consistent pre-write snapshot...
+            self.assertEqual((len(rows), first["minutes"]), before)
+            self.assertIsInstance(match, Match)
+            # ...the new values are read back through the repository
+            reread = repository.find_match(data, 2)
+            self.assertIsNot(reread, match)
+            self.assertEqual(reread["performances"][0]["minutes"], before[1] + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
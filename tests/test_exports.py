@@ -0,0 +1,49 @@
+import gzip
+import json
+import unittest
+from unittest import mock
+
+from services import exports
+
+
+def _sample_data():
+    return {
+        "players": [{"id": i, "name": f"Joueur {i} – é", "base_ratings": {"Tir": 3}} for i in range(1, 200)],
+        "matches": [],
+        "trainings": [],
+    }
+
+
+class JsonExportTests(unittest.TestCase):
+    def test_variants_round_trip(self):
+        data = _sample_data()
+
+        readable = exports.export_json_bytes(data, "lisible")
+        compact = exports.export_json_bytes(data, "compact")
+        compressed = exports.export_json_bytes(data, "gzip")
+
+        self.assertEqual(readable.decode("utf-8"), json.dumps(data, ensure_ascii=False, indent=2))
+        self.assertEqual(json.loads(compact), data)
+        self.assertLess(len(compact), len(readable))
+        self.assertEqual(json.loads(gzip.decompress(compressed)), data)
+
+    def test_encoding_is_chunked(self):
+        with mock.patch.object(exports, "CHUNK_SIZE", 256):
+            chunks = list(exports.iter_json_chunks(_sample_data()))
+
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(json.loads("".join(chunks)), _sample_data())
+
+    def test_export_is_cached_per_revision(self):
+        data = _sample_data()
+        self.assertIsNone(exports.peek_json_export(data, "compact"))
+
+        first = exports.export_json_bytes(data, "compact")
+        self.assertIs(exports.peek_json_export(data, "compact"), first)
+
+        exports.repo.get_repository(data).touch()
+        self.assertIsNone(exports.peek_json_export(data, "compact"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from services import grid_entry
+from storage import journal, repository
+from storage.aggregates import PlayerAggregates
+
+
+PLAYERS = [
+    {"id": 1, "name": "Alex", "preferred_position": "Milieu"},
+    {"id": 2, "name": "Sam", "preferred_position": None},
+    {"id": 3, "name": "Noah", "preferred_position": "Gardien"},
+]
+
+
+def _perf(player_id, **values):
+    perf = {"player_id": player_id, "position": "Milieu", "minutes": 40, "tech": 3, "phys": 3, "tact": 3,
+            "mental": 3, "goals": 0, "assists": 0, "comment": ""}
+    perf.update(values)
+    return perf
+
+
+class AttendanceGridTests(unittest.TestCase):
+    def test_only_edited_rows_and_unsaved_players_are_written(self):
+        training = {"attendances": [
+            {"player_id": 1, "present": True, "effort": 3, "focus": 3, "comment": ""},
+            {"player_id": 2, "present": True, "effort": 4, "focus": 4, "comment": ""},
+        ]}
+        grid = grid_entry.attendance_grid(PLAYERS, training)
+        edited = grid.copy()
+        edited.loc[2, "Présent"] = False
+
+        changes, errors = grid_entry.attendance_changes(PLAYERS, training, edited)
+
+        self.assertEqual(errors, [])
+        self.assertEqual([c["player_id"] for c in changes], [2, 3])
+        self.assertFalse(changes[0]["present"])
+        self.assertEqual(changes[1], {"player_id": 3, "present": True, "effort": 3, "focus": 3, "comment": ""})
+
+    def test_untouched_sheet_has_no_changes(self):
+        training = {"attendances": [
+            {"player_id": p["id"], "present": True, "effort": 3, "focus": 3, "comment": ""} for p in PLAYERS
+        ]}
+
+        grid = grid_entry.attendance_grid(PLAYERS, training)
+
+        self.assertEqual(grid_entry.attendance_changes(PLAYERS, training, grid.copy()), ([], []))
+
+    def test_cleared_or_out_of_range_cells_are_reported(self):
+        training = {"attendances": [
+            {"player_id": p["id"], "present": True, "effort": 3, "focus": 3, "comment": ""} for p in PLAYERS
+        ]}
+        edited = grid_entry.attendance_grid(PLAYERS, training)
+        edited["Effort"] = edited["Effort"].astype(float)
+        edited.loc[1, "Effort"] = float("nan")
+        edited.loc[2, "Concentration"] = 9
+        edited.loc[3, "Commentaire"] = "Bien"
+
+        changes, errors = grid_entry.attendance_changes(PLAYERS, training, edited)
+
+        self.assertEqual(changes, [{"player_id": 3, "present": True, "effort": 3, "focus": 3, "comment": "Bien"}])
+        self.assertEqual(errors, ["Alex : Effort hors limites (1-5)", "Sam : Concentration hors limites (1-5)"])
+
+
+class MatchGridTests(unittest.TestCase):
+    def test_added_edited_and_removed_rows(self):
+        match = {"performances": [_perf(1), _perf(2, position="Défenseur")]}
+        edited = grid_entry.match_grid(PLAYERS, match)
+        edited.loc[1, "Buts"] = 2
+        edited.loc[2, "Joué"] = False
+        edited.loc[3, "Joué"] = True
+
+        performances, removed, errors = grid_entry.match_changes(PLAYERS, match, edited)
+
+        self.assertEqual(errors, [])
+        self.assertEqual(removed, [2])
+        self.assertEqual(performances, [_perf(1, goals=2), _perf(3, position="Gardien")])
+
+    def test_invalid_rows_are_reported(self):
+        match = {"performances": []}
+        edited = grid_entry.match_grid(PLAYERS, match)
+        edited["Joué"] = True
+
+        performances, _, errors = grid_entry.match_changes(PLAYERS, match, edited)
+
+        self.assertEqual([p["player_id"] for p in performances], [1, 3])
+        self.assertEqual(errors, ["Sam : poste manquant"])
+
+
+class UpdateMutationsTests(unittest.TestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.tmp = Path(tmpdir.name)
+        patcher = mock.patch.object(repository, "DATA_FILE", self.tmp / "data.json")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.data = {
+            "players": [dict(p, base_ratings={}) for p in PLAYERS],
+            "matches": [{"id": 1, "date": "2024-04-20", "opponent": "FC", "competition": "",
+                         "performances": [_perf(1), _perf(2)]}],
+            "trainings": [{"id": 1, "date": "2024-04-15", "theme": "T", "type": "Technique",
+                           "attendances": [{"player_id": 1, "present": True, "effort": 3, "focus": 3, "comment": ""}]}],
+        }
+        repository.save_data(self.data)
+
+    def test_update_performances_keeps_aggregates_and_journal_in_sync(self):
+        repository.player_aggregates(self.data)
+
+        repository.update_performances(self.data, 1, [_perf(1, minutes=10), _perf(3)], removed=[2])
+
+        match = repository.find_match(self.data, 1)
+        self.assertEqual([(p["player_id"], p["minutes"]) for p in match["performances"]], [(1, 10), (3, 40)])
+        self.assertEqual(repository.player_aggregates(self.data), PlayerAggregates.from_data(self.data))
+        self.assertEqual(len(journal.read_records(self.tmp / "data.journal.jsonl")), 1)
+        repository.clear_load_cache()
+        self.assertEqual(repository.load_data(), self.data)
+
+    def test_update_attendances_merges_by_player(self):
+        repository.update_attendances(self.data, 1, [
+            {"player_id": 1, "present": False, "effort": 1, "focus": 1, "comment": ""},
+            {"player_id": 2, "present": True, "effort": 5, "focus": 5, "comment": ""},
+        ])
+
+        attendances = repository.find_training(self.data, 1)["attendances"]
+        self.assertEqual([(a["player_id"], a["present"]) for a in attendances], [(1, False), (2, True)])
+        repository.clear_load_cache()
+        self.assertEqual(repository.load_data(), self.data)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,8 @@
 import copy
+import tempfile
 import unittest
 from datetime import date
+from pathlib import Path
 from unittest import mock
 
 from storage import repository
@@ -15,7 +17,14 @@ class FakeContext:
         return False
 
 
+class FakeColumnConfig:
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
 class FakeStreamlit:
+    column_config = FakeColumnConfig()
+
     def __init__(self):
         self.session_state = {"mobile_mode": True}
 
@@ -34,6 +43,12 @@ class FakeStreamlit:
     def warning(self, *args, **kwargs):
         pass
 
+    def error(self, *args, **kwargs):
+        pass
+
+    def caption(self, *args, **kwargs):
+        pass
+
     def success(self, *args, **kwargs):
         pass
 
@@ -52,6 +67,12 @@ class FakeStreamlit:
     def bar_chart(self, *args, **kwargs):
         pass
 
+    def line_chart(self, *args, **kwargs):
+        pass
+
+    def data_editor(self, data, **kwargs):
+        return data
+
     def download_button(self, *args, **kwargs):
         return None
 
@@ -71,6 +92,9 @@ class FakeStreamlit:
             return options[index]
         return options[0]
 
+    def multiselect(self, label, options, default=None, **kwargs):
+        return list(default or [])
+
     def checkbox(self, label, value=False, **kwargs):
         return value
 
@@ -83,6 +107,9 @@ class FakeStreamlit:
     def text_area(self, label, value="", **kwargs):
         return value
 
+    def file_uploader(self, label, **kwargs):
+        return None
+
     def date_input(self, label, value=None, **kwargs):
         return value or date.today()
 
@@ -113,6 +140,11 @@ class StreamlitPagesIntegrationTests(unittest.TestCase):
     def setUp(self):
         self.fake_st = FakeStreamlit()
         self.repo_stub = RepoStub()
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        data_file_patch = mock.patch.object(repository, "DATA_FILE", Path(tmpdir.name) / "data.json")
+        data_file_patch.start()
+        self.addCleanup(data_file_patch.stop)
         self.data = {
             "players": [
                 {
@@ -201,10 +233,25 @@ class StreamlitPagesIntegrationTests(unittest.TestCase):
         self._render_with_fake_streamlit(profiles, datasets["profiles"])
 
         with mock.patch.object(exports, "st", self.fake_st), mock.patch.object(
-            exports, "generate_player_pdf", return_value=b"PDF"
+            exports, "render_player_pdf", return_value=b"PDF"
         ):
             exports.render(self.repo_stub, datasets["exports"])
 
+    def test_attendance_form_keeps_existing_values_and_saves(self):
+        data = copy.deepcopy(self.data)
+        self.fake_st.checkbox = lambda label, value=False, key=None, **kwargs: (
+            False if key == "attendance_grid_mode" else value
+        )
+        self.fake_st.form_submit_button = lambda label, **kwargs: label == "💾 Enregistrer la séance"
+
+        self._render_with_fake_streamlit(trainings, data)
+
+        attendances = repository.find_training(data, 7)["attendances"]
+        self.assertEqual(
+            [(a["player_id"], a["present"], a["effort"], a["focus"], a["comment"]) for a in attendances],
+            [(1, True, 4, 3, "Bon investissement"), (2, True, 3, 3, "")],
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,114 @@
+import os
+import threading
+import unittest
+
+from services import jobs
+from storage import repository
+
+
+def _wait(job):
+    for _ in range(500):
+        if job.finished:
+            return job
+        threading.Event().wait(0.01)
+    raise AssertionError(f"tâche {job.id} toujours {job.state}")
+
+
+class JobQueueTests(unittest.TestCase):
+    def setUp(self):
+        self.queue = jobs.JobQueue(max_workers=2, max_results=2, max_bytes=100)
+        self.addCleanup(self.queue.shutdown)
+
+    def test_identical_requests_share_one_job(self):
+        release = threading.Event()
+        calls = []
+
+        def build(fileobj, progress):
+            calls.append(1)
+            progress(1, 2)
+            release.wait(5)
+            progress(2, 2)
+            fileobj.write(b"pdf")
+
+        first = self.queue.submit(("player_pdf", 1, (7,)), build)
+        second = self.queue.submit(("player_pdf", 1, (7,)), build)
+        self.assertIs(first, second)
+        self.assertFalse(first.finished)
+
+        release.set()
+        _wait(first)
+        self.assertEqual(first.state, jobs.DONE)
+        with first.open() as result:
+            self.assertEqual(result.read(), b"pdf")
+        self.assertEqual(first.fraction, 1.0)
+        self.assertEqual(calls, [1])
+        self.assertEqual(self.queue.stats()["deduplicated"], 1)
+
+    def test_failed_job_reports_error_and_can_be_resubmitted(self):
+        def broken(fileobj, progress):
+            fileobj.write(b"partiel")
+            raise ValueError("joueur inconnu")
+
+        failed = _wait(self.queue.submit(("player_pdf", 1, (7,)), broken))
+        self.assertEqual(failed.state, jobs.FAILED)
+        self.assertIn("joueur inconnu", failed.error)
+        self.assertFalse(os.path.exists(failed.path))
+
+        retried = _wait(self.queue.submit(("player_pdf", 1, (7,)), lambda fileobj, progress: fileobj.write(b"ok")))
+        self.assertIsNot(retried, failed)
+        with retried.open() as result:
+            self.assertEqual(result.read(), b"ok")
+
+    def test_failed_jobs_are_evicted_like_results(self):
+        def broken(fileobj, progress):
+            raise ValueError("joueur inconnu")
+
+        failed = [_wait(self.queue.submit(("player_pdf", 1, (i,)), broken)) for i in range(3)]
+
+        self.assertIsNone(self.queue.get(failed[0].id))
+        self.assertNotIn(failed[0].key, self.queue._by_key)
+        self.assertEqual([self.queue.get(job.id) for job in failed[1:]], failed[1:])
+        self.assertEqual(self.queue.stats()["failed"], 2)
+
+        done = _wait(self.queue.submit(("squad_zip", 1, ()), lambda fileobj, progress: fileobj.write(b"zip")))
+        self.assertIsNone(self.queue.get(failed[1].id))
+        self.assertIs(self.queue.get(done.id), done)
+        self.assertEqual(len(self.queue._jobs), 2)
+
+    def test_result_store_is_bounded(self):
+        def build(size):
+            return lambda fileobj, progress: fileobj.write(b"x" * size)
+
+        done = [_wait(self.queue.submit(("player_pdf", 1, (i,)), build(40))) for i in range(3)]
+
+        self.assertIsNone(self.queue.get(done[0].id))
+        self.assertFalse(os.path.exists(done[0].path))
+        self.assertEqual([self.queue.get(job.id) for job in done[1:]], done[1:])
+        self.assertEqual(self.queue.stats()["result_bytes"], 80)
+
+        big = _wait(self.queue.submit(("squad_zip", 1, ()), build(150)))
+        self.assertIs(self.queue.get(big.id), big)
+        self.assertEqual(self.queue.stats()["results"], 1)
+        self.assertEqual(big.size, 150)
+
+        self.queue.clear()
+        self.assertFalse(os.path.exists(big.path))
+
+    def test_data_change_drops_results_of_old_revision(self):
+        data = {"players": [], "matches": [], "trainings": []}
+        repo = repository.get_repository(data)
+        repository.add_change_listener(self.queue.invalidate_revision)
+        self.addCleanup(repository._change_listeners.remove, self.queue.invalidate_revision)
+
+        old = _wait(self.queue.submit(("season_pdf", repo.revision, ("2024-2025",)), lambda fileobj, progress: fileobj.write(b"v1")))
+        repo.touch()
+
+        self.assertIsNone(self.queue.get(old.id))
+        self.assertFalse(os.path.exists(old.path))
+        fresh = _wait(self.queue.submit(("season_pdf", repo.revision, ("2024-2025",)), lambda fileobj, progress: fileobj.write(b"v2")))
+        with fresh.open() as result:
+            self.assertEqual(result.read(), b"v2")
+
+
+if __name__ == "__main__":
+    unittest.main()
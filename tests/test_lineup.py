@@ -0,0 +1,78 @@
+import itertools
+import unittest
+
+import numpy as np
+
+from services import lineup
+
+
+def _player(player_id, **ratings):
+    return {"id": player_id, "name": f"J{player_id}", "base_ratings": ratings}
+
+
+def _goalkeeper(player_id):
+    return _player(player_id, **{"Placement": 5, "Agilité": 5, "Attitude / Comportement": 5, "Tir": 1, "Dribble": 1})
+
+
+def _striker(player_id):
+    return _player(player_id, **{"Placement": 2, "Agilité": 2, "Attitude / Comportement": 2, "Tir": 5, "Dribble": 5})
+
+
+class AssignmentTests(unittest.TestCase):
+    def test_matches_brute_force(self):
+        rng = np.random.default_rng(1)
+        for _ in range(100):
+            n, m = (int(size) for size in rng.integers(1, 6, size=2))
+            cost = rng.integers(0, 10, size=(n, m)).astype(float)
+
+            rows = lineup.solve_assignment(cost)
+
+            assigned = [(i, j) for i, j in enumerate(rows) if j >= 0]
+            self.assertEqual(len(assigned), min(n, m))
+            self.assertEqual(len({j for _, j in assigned}), min(n, m))
+            if n <= m:
+                best = min(sum(cost[i, p[i]] for i in range(n)) for p in itertools.permutations(range(m), n))
+            else:
+                best = min(sum(cost[p[j], j] for j in range(m)) for p in itertools.permutations(range(n), m))
+            self.assertAlmostEqual(sum(cost[i, j] for i, j in assigned), best)
+
+
+class LineupTests(unittest.TestCase):
+    def test_each_player_goes_where_the_team_gains_most(self):
+        players = [_striker(1), _goalkeeper(2), _striker(3)]
+
+        assignments, unfilled = lineup.optimize_lineup(players, {"Gardien": 1, "Attaquant": 1})
+
+        self.assertEqual([(a["position"], a["player_id"]) for a in assignments], [("Gardien", 2), ("Attaquant", 1)])
+        self.assertEqual(unfilled, [])
+
+    def test_missing_players_leave_positions_unfilled(self):
+        assignments, unfilled = lineup.optimize_lineup([_goalkeeper(1)], lineup.FORMATIONS["Foot à 5 : 1-2-1"])
+
+        self.assertEqual([a["position"] for a in assignments], ["Gardien"])
+        self.assertEqual(unfilled, ["Défenseur", "Milieu", "Milieu", "Attaquant"])
+
+    def test_share_cap_rotates_positions(self):
+        players = [_goalkeeper(1), _striker(2)]
+        matches = [
+            {"id": m, "date": f"2024-04-0{m}", "performances": [
+                {"player_id": 1, "position": "Gardien"}, {"player_id": 2, "position": "Attaquant"},
+            ]}
+            for m in (1, 2, 3)
+        ]
+        recent = lineup.recent_position_counts(matches, last=2)
+        self.assertEqual(recent[0], 2)
+
+        assignments, unfilled = lineup.optimize_lineup(
+            players, {"Gardien": 1, "Attaquant": 1}, recent=recent, max_share=0.7
+        )
+
+        self.assertEqual([(a["position"], a["player_id"]) for a in assignments], [("Gardien", 2), ("Attaquant", 1)])
+
+        # Nobody may stay in place and nobody else is available: the cap wins
+        assignments, unfilled = lineup.optimize_lineup(players[:1], {"Gardien": 1}, recent=recent, max_share=0.5)
+        self.assertEqual((assignments, unfilled), ([], ["Gardien"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from services.match_import import import_match_sheet, parse_match_sheet
+from storage import journal, repository
+
+
+PLAYERS = [
+    {"id": 1, "name": "Léo Martin", "base_ratings": {}},
+    {"id": 2, "name": "Sam", "base_ratings": {}},
+    {"id": 3, "name": "Noah", "base_ratings": {}},
+    {"id": 4, "name": "Noah", "base_ratings": {}},
+]
+
+
+class ParseMatchSheetTests(unittest.TestCase):
+    def test_semicolon_csv_with_accents_and_defaults(self):
+        text = "Joueur;Poste;Minutes;Tech;Buts;Commentaire\nleo martin;milieu;30;4;1;Bien\nSAM;Gardien;;;;\n"
+
+        performances, errors = parse_match_sheet(text, PLAYERS)
+
+        self.assertEqual(errors, [])
+        self.assertEqual(performances[0], {
+            "player_id": 1, "position": "Milieu", "minutes": 30, "tech": 4, "phys": 3, "tact": 3,
+            "mental": 3, "goals": 1, "assists": 0, "comment": "Bien",
+        })
+        self.assertEqual(performances[1]["minutes"], 40)
+
+    def test_pasted_tab_separated_table(self):
+        text = "Player\tPosition\tMinutes\nSam\tAttaquant\t20\n"
+
+        performances, errors = parse_match_sheet(text, PLAYERS)
+
+        self.assertEqual(errors, [])
+        self.assertEqual([(p["player_id"], p["minutes"]) for p in performances], [(2, 20)])
+
+    def test_every_invalid_row_is_reported(self):
+        text = (
+            "Joueur,Poste,Minutes,Tech\n"
+            "Inconnu,Milieu,20,3\n"
+            "Noah,Milieu,20,3\n"
+            "Sam,Libero,20,9\n"
+            "Léo Martin,Milieu,vingt,3\n"
+            "Sam,Milieu,20,3\n"
+        )
+
+        performances, errors = parse_match_sheet(text, PLAYERS, existing_player_ids=[1])
+
+        self.assertEqual(performances, [])
+        self.assertEqual([e.split(" :")[0] for e in errors], ["Ligne 2", "Ligne 3", "Ligne 4", "Ligne 5", "Ligne 6"])
+        self.assertIn("Libero", errors[2])
+        self.assertIn("tech hors limites", errors[2])
+        self.assertIn("déjà une performance", errors[4])
+
+    def test_homonyms_are_told_apart_by_id(self):
+        ambiguous = parse_match_sheet("Joueur;Poste\nNoah;Milieu\n", PLAYERS)[1]
+        self.assertEqual(len(ambiguous), 1)
+        self.assertIn("« Noah (#3) » ou « Noah (#4) »", ambiguous[0])
+
+        text = "Joueur;Poste;Minutes\nNoah (#4);Milieu;20\nnoah(#3);Gardien;30\n"
+        performances, errors = parse_match_sheet(text, PLAYERS)
+        self.assertEqual(errors, [])
+        self.assertEqual([(p["player_id"], p["minutes"]) for p in performances], [(4, 20), (3, 30)])
+
+        text = "Id;Joueur;Poste\n3;Noah;Milieu\n2;Noah;Milieu\n;Sam;Milieu\n"
+        performances, errors = parse_match_sheet(text, PLAYERS)
+        self.assertEqual([p["player_id"] for p in performances], [3, 2])
+        self.assertEqual(errors, ["Ligne 3 : l'id 2 est celui de « Sam », pas de « Noah »"])
+
+        performances, errors = parse_match_sheet("Id;Poste\n4;Milieu\n9;Milieu\n", PLAYERS)
+        self.assertEqual(errors, ["Ligne 3 : aucun joueur n'a l'id 9"])
+
+    def test_missing_player_column(self):
+        self.assertEqual(parse_match_sheet("Poste;Minutes\nMilieu;20\n", PLAYERS)[1],
+                         ["En-tête : colonne « Joueur » introuvable."])
+
+
+class ImportMatchSheetTests(unittest.TestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.tmp = Path(tmpdir.name)
+        patcher = mock.patch.object(repository, "DATA_FILE", self.tmp / "data.json")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.data = {"players": [dict(p) for p in PLAYERS], "matches": [], "trainings": []}
+        repository.save_data(self.data)
+        repository.add_match(self.data, {"id": 1, "date": "2024-04-20", "opponent": "FC", "competition": "",
+                                         "performances": []})
+
+    def test_whole_sheet_is_one_journal_record(self):
+        text = "Joueur;Poste;Minutes\nSam;Milieu;40\nLéo Martin;Défenseur;30\n"
+
+        performances, errors = import_match_sheet(repository, self.data, 1, text)
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(performances), 2)
+        records = journal.read_records(self.tmp / "data.journal.jsonl")
+        self.assertEqual([r["op"] for r in records], ["add_match", "add_performances"])
+        self.assertEqual(repository.player_aggregates(self.data).get(1).sums["minutes"], 30)
+        repository.clear_load_cache()
+        self.assertEqual(repository.load_data(), self.data)
+
+    def test_invalid_sheet_writes_nothing(self):
+        text = "Joueur;Poste;Minutes\nSam;Milieu;40\nPersonne;Milieu;30\n"
+
+        performances, errors = import_match_sheet(repository, self.data, 1, text)
+
+        self.assertEqual(performances, [])
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(repository.find_match(self.data, 1)["performances"], [])
+        self.assertEqual(len(journal.read_records(self.tmp / "data.journal.jsonl")), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
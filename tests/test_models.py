@@ -1,7 +1,7 @@
 import unittest
 
 from core import constants
-from core.models import best_position_from_scores, compute_position_scores
+from core.models import best_position_from_scores, compute_position_scores, score_roster
 
 
 class ComputePositionScoresTests(unittest.TestCase):
@@ -59,5 +59,34 @@ class BestPositionTests(unittest.TestCase):
         self.assertIsNone(best_position_from_scores({"Gardien": None}))
 
 
+class ScoreRosterTests(unittest.TestCase):
+    @staticmethod
+    def _reference_scores(ratings):
+        scores = {}
+        for pos, weights in constants.POSITION_WEIGHTS.items():
+            num = sum(ratings[s] * w for s, w in weights.items() if s in ratings and w > 0)
+            den = sum(w for s, w in weights.items() if s in ratings and w > 0)
+            scores[pos] = round(num / den, 2) if den > 0 else None
+        return scores
+
+    def test_batch_matches_scalar_reference(self):
+        players = [
+            {"base_ratings": {skill: (i + j) % 5 + 1 for j, skill in enumerate(constants.SKILLS) if (i + j) % 3}}
+            for i in range(20)
+        ]
+        players.append({"base_ratings": {"Engagement": 4}})
+        players.append({})
+
+        all_scores, best = score_roster(players)
+
+        for player, scores, best_pos in zip(players, all_scores, best):
+            self.assertEqual(scores, self._reference_scores(player.get("base_ratings", {})))
+            self.assertEqual(best_pos, best_position_from_scores(scores))
+        self.assertIsNone(best[-1])
+
+    def test_empty_roster(self):
+        self.assertEqual(score_roster([]), ([], []))
+
+
 if __name__ == "__main__":
     unittest.main()
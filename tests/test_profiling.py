@@ -0,0 +1,96 @@
+import io
+import json
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from core import profiling
+from storage import repository
+
+
+class ProfilingTests(unittest.TestCase):
+    def setUp(self):
+        profiling.reset()
+        self.addCleanup(profiling.reset)
+        self.addCleanup(profiling.disable)
+
+    def test_disabled_profiling_records_nothing(self):
+        profiling.disable()
+
+        with profiling.span("page.Joueurs"):
+            profiling.count("storage.bytes_read", 10)
+
+        self.assertEqual(profiling.spans(), [])
+        self.assertEqual(profiling.counters(), {})
+
+    def test_spans_nest_and_summarise(self):
+        profiling.enable()
+        work = profiling.profiled("analytics.work")(lambda: 42)
+
+        with profiling.span("page.Profils", rows=3):
+            self.assertEqual(work(), 42)
+            self.assertEqual(work(), 42)
+        profiling.count("storage.bytes_read", 10)
+        profiling.count("storage.bytes_read", 5)
+
+        spans = profiling.spans()
+        self.assertEqual([s["name"] for s in spans], ["analytics.work", "analytics.work", "page.Profils"])
+        self.assertEqual(spans[0]["parent"], "page.Profils")
+        self.assertEqual(spans[2]["rows"], 3)
+        summary = {row["name"]: row for row in profiling.summary()}
+        self.assertEqual(summary["analytics.work"]["calls"], 2)
+        self.assertEqual(profiling.counters(), {"storage.bytes_read": 15})
+
+        buffer = io.StringIO()
+        profiling.dump_jsonl(buffer)
+        lines = [json.loads(line) for line in buffer.getvalue().splitlines()]
+        self.assertEqual([line["type"] for line in lines], ["span", "span", "span", "counter"])
+
+    def test_session_profiling_is_per_thread_and_tagged(self):
+        profiling.disable()
+
+        def other_session():
+            with profiling.span("page.Matchs"):
+                profiling.count("storage.bytes_read", 99)
+
+        with profiling.session("a"):
+            with profiling.span("page.Joueurs"):
+                profiling.count("storage.bytes_read", 10)
+            thread = threading.Thread(target=other_session)
+            thread.start()
+            thread.join()
+        with profiling.span("page.Profils"):
+            pass
+
+        self.assertFalse(profiling.is_enabled())
+        self.assertEqual([s["name"] for s in profiling.spans()], ["page.Joueurs"])
+        self.assertEqual(profiling.spans()[0]["session"], "a")
+        self.assertEqual(profiling.counters("a"), {"storage.bytes_read": 10})
+        self.assertEqual(profiling.counters("b"), {})
+
+        with profiling.session("b"):
+            profiling.count("storage.bytes_read", 5)
+        profiling.reset("a")
+        self.assertEqual(profiling.spans(), [])
+        self.assertEqual(profiling.counters(), {"storage.bytes_read": 5})
+
+    def test_repository_io_is_measured(self):
+        profiling.enable()
+        with tempfile.TemporaryDirectory() as tmpdir, \
+                mock.patch.object(repository, "DATA_FILE", Path(tmpdir) / "data.json"):
+            repository.save_data({"players": [], "matches": [], "trainings": []})
+            repository.clear_load_cache()
+            data = repository.load_data()
+            repository.add_player(data, {"id": 1, "name": "Alex"})
+
+        names = {s["name"] for s in profiling.spans()}
+        self.assertTrue({"storage.save_data", "storage.load_data", "storage.add_player"} <= names)
+        counters = profiling.counters()
+        self.assertGreater(counters["storage.bytes_written"], 0)
+        self.assertGreater(counters["storage.bytes_read"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
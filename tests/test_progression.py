@@ -0,0 +1,76 @@
+import unittest
+from datetime import date, timedelta
+
+import pandas as pd
+
+from services.progression import ProgressionEngine, season_start
+from storage.seasons import season_of
+
+
+def _frame():
+    rows = [
+        # (Joueur, player_id, date, overall)
+        ("Alex", 1, "2024-01-10", 2.0),
+        ("Alex", 1, "2024-02-20", 3.0),
+        ("Alex", 1, "2024-03-20", 4.0),
+        ("Alex", 1, "2023-09-15", 1.0),
+        ("Alex", 1, "2023-05-01", 1.0),
+        ("Sam", 2, "2024-02-25", 3.5),
+        ("Sam", 2, "2024-03-25", 2.5),
+    ]
+    df = pd.DataFrame(rows, columns=["Joueur", "player_id", "date", "overall"])
+    df["date"] = pd.to_datetime(df["date"])
+    df["Joueur"] = df["Joueur"].astype("category")
+    return df
+
+
+class ProgressionEngineTests(unittest.TestCase):
+    def setUp(self):
+        self.engine = ProgressionEngine(_frame())
+
+    def test_dates_are_sorted_once_and_sliced(self):
+        self.assertTrue(self.engine.frame["date"].is_monotonic_increasing)
+        window = self.engine.window(start=date(2024, 2, 1), end=date(2024, 3, 20))
+        self.assertEqual(window["overall"].tolist(), [3.0, 3.5])
+
+    def test_compare_days(self):
+        df_delta, top_up, top_down = self.engine.compare_days(30, today=date(2024, 3, 30))
+
+        self.assertEqual(list(df_delta.columns), ["Note 30 derniers jours", "Note 30–60 jours", "Delta"])
+        self.assertEqual(df_delta.loc["Alex", "Delta"], 1.0)
+        self.assertEqual(df_delta.loc["Sam", "Delta"], -1.0)
+        self.assertEqual(top_up.index[0], "Alex")
+        self.assertEqual(top_down.index[0], "Sam")
+
+    def test_compare_last_matches_per_player(self):
+        df_delta, _, _ = self.engine.compare_matches(2)
+
+        # Alex: (3 + 4) / 2 vs (1 + 2) / 2 ; Sam has no previous matches
+        self.assertEqual(df_delta.index.tolist(), ["Alex"])
+        self.assertEqual(df_delta.loc["Alex", "Delta"], 2.0)
+
+    def test_compare_season(self):
+        df_delta, _, _ = self.engine.compare_season(today=date(2024, 3, 30))
+
+        self.assertEqual(df_delta.index.tolist(), ["Alex"])
+        self.assertEqual(df_delta.loc["Alex", "Delta"], 1.5)
+        self.assertTrue(self.engine.compare_season(today=date(2024, 10, 1))[0].empty)
+
+    def test_season_start_matches_storage_seasons(self):
+        for today in (date(2024, 7, 31), date(2024, 8, 1), date(2025, 1, 15)):
+            start = season_start(today)
+            self.assertEqual(season_of(start.isoformat()), season_of(today.isoformat()))
+            self.assertNotEqual(season_of((start - timedelta(days=1)).isoformat()), season_of(today.isoformat()))
+
+    def test_rolling_and_ewma_curves(self):
+        curves = self.engine.curves(window=2, span=3)
+        alex = curves[curves["player_id"] == 1]
+
+        self.assertEqual(alex["overall"].tolist(), [1.0, 1.0, 2.0, 3.0, 4.0])
+        self.assertEqual(alex["Moyenne glissante"].tolist(), [1.0, 1.0, 1.5, 2.5, 3.5])
+        expected = alex["overall"].ewm(span=3).mean().tolist()
+        self.assertEqual(alex["Moyenne exponentielle"].tolist(), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+import io
+import unittest
+import zipfile
+from unittest import mock
+
+from services import analytics, reports
+
+
+def _sample_data():
+    return {
+        "players": [
+            {"id": 1, "name": "Alex Martin", "birth_year": 2016, "base_ratings": {"Dribble": 4}},
+            {"id": 2, "name": "Sam", "birth_year": 2015, "base_ratings": {}},
+            {"id": 3, "name": "Sam", "birth_year": 2016, "base_ratings": {}},
+        ],
+        "matches": [
+            {"id": 1, "date": "2024-03-02", "opponent": "FC A", "competition": "Plateau", "performances": [
+                {"player_id": 1, "position": "Milieu", "minutes": 40, "tech": 4, "phys": 3,
+                 "tact": 4, "mental": 5, "goals": 1, "assists": 0, "comment": ""},
+                {"player_id": 1, "position": "Milieu", "minutes": 40, "tech": 3, "phys": 3,
+                 "tact": 4, "mental": 4, "goals": 0, "assists": 2, "comment": ""},
+            ]},
+        ],
+        "trainings": [
+            {"id": 1, "date": "2024-03-01", "theme": "Passes", "type": "Technique", "attendances": [
+                {"player_id": 1, "present": True, "effort": 4, "focus": 3, "comment": ""},
+                {"player_id": 2, "present": False, "effort": 3, "focus": 2, "comment": ""},
+            ]},
+        ],
+    }
+
+
+class PlayerStatsTests(unittest.TestCase):
+    def test_single_pass_aggregates(self):
+        stats = reports.compute_player_stats(_sample_data())
+
+        self.assertEqual(stats[1]["matches"], 2)
+        self.assertEqual(stats[1]["tech"], 7)
+        self.assertEqual(stats[1]["assists"], 2)
+        self.assertEqual(stats[2]["sessions"], 1)
+        self.assertEqual(stats[2]["present"], 0)
+        self.assertEqual(stats[3], reports._empty_stats())
+
+
+class SquadZipTests(unittest.TestCase):
+    def _export(self, **kwargs):
+        calls = []
+        buffer = io.BytesIO()
+        reports.export_squad_zip(_sample_data(), buffer, progress=lambda done, total: calls.append((done, total)), **kwargs)
+        return zipfile.ZipFile(buffer), calls
+
+    def test_zip_contains_one_sheet_per_player(self):
+        archive, calls = self._export(max_workers=1)
+
+        self.assertEqual(
+            sorted(archive.namelist()),
+            ["Fiche_Alex_Martin.pdf", "Fiche_Sam.pdf", "Fiche_Sam_3.pdf"],
+        )
+        self.assertTrue(archive.read("Fiche_Sam.pdf").startswith(b"%PDF"))
+        self.assertEqual(calls[-1], (3, 3))
+
+    def test_process_pool_export(self):
+        archive, calls = self._export(max_workers=2)
+
+        self.assertEqual(len(archive.namelist()), 3)
+        self.assertEqual([done for done, _ in calls], [1, 2, 3])
+
+
+class SeasonReportTests(unittest.TestCase):
+    def test_report_has_summary_player_pages_and_podiums(self):
+        data = _sample_data()
+        data["matches"].append({"id": 2, "date": "2023-05-01", "opponent": "FC B", "competition": "Amical",
+                                "performances": []})
+        calls = []
+        with mock.patch.object(reports, "compute_player_stats", wraps=reports.compute_player_stats) as stats:
+            buffer = reports.write_season_report(data, io.BytesIO(), title="2023-2024",
+                                                 progress=lambda done, total: calls.append((done, total)))
+
+        pdf = buffer.getvalue()
+        self.assertTrue(pdf.startswith(b"%PDF"))
+        # Summary + one page per player + podiums
+        self.assertEqual(pdf.count(b"/Type /Page\n"), 5)
+        self.assertEqual(stats.call_count, 1)
+        self.assertEqual(calls, [(1, 3), (2, 3), (3, 3)])
+
+    def test_report_reaches_fileobj_only_when_the_document_is_saved(self):
+        buffer = io.BytesIO()
+        written_during_pages = []
+
+        reports.write_season_report(_sample_data(), buffer,
+                                    progress=lambda done, total: written_during_pages.append(buffer.tell()))
+
+        self.assertEqual(written_during_pages, [0, 0, 0])
+        self.assertTrue(buffer.getvalue().startswith(b"%PDF"))
+
+    def test_season_filter(self):
+        data = _sample_data()
+        data["matches"].append({"id": 2, "date": "2024-09-14", "opponent": "FC B", "competition": "Amical",
+                                "performances": []})
+
+        self.assertEqual(reports.seasons_in(data), ["2023-2024", "2024-2025"])
+        season = reports.season_data(data, "2024-2025")
+        self.assertEqual([m["id"] for m in season["matches"]], [2])
+        self.assertEqual(season["trainings"], [])
+        self.assertIs(season["players"], data["players"])
+
+    def test_top_three_for_all_matches_in_one_sort(self):
+        df_all = analytics.get_all_match_performances(_sample_data())
+
+        _, positions = analytics.top_three_by_match(df_all)
+        first = analytics.top_three_for_match(df_all, 1)
+
+        self.assertEqual(first["Note globale"].tolist(), [4.0, 3.5])
+        self.assertEqual(list(positions), [1])
+        self.assertTrue(analytics.top_three_for_match(df_all, 2).empty)
+
+
+if __name__ == "__main__":
+    unittest.main()
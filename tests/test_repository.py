@@ -1,9 +1,15 @@
+import copy
+import gc
+import multiprocessing
 import tempfile
+import threading
 import unittest
 from pathlib import Path
 from unittest import mock
 
-from storage import repository
+from core import compact
+from storage import journal, repository
+from storage.aggregates import PlayerAggregates
 
 
 class RepositoryTests(unittest.TestCase):
@@ -45,6 +51,374 @@ class RepositoryTests(unittest.TestCase):
         self.assertEqual(repository.find_training(data, 3)["id"], 3)
         self.assertIsNone(repository.find_training(data, 0))
 
+    def test_indexes_follow_inserts_and_appends(self):
+        data = {"players": [{"id": 1, "name": "Alex"}], "matches": [], "trainings": []}
+        repo = repository.get_repository(data)
+
+        added = repo.insert("players", {"name": "Sam"})
+        self.assertEqual(added["id"], 2)
+        self.assertIs(repository.find_player(data, 2), added)
+
+        # Direct appends to the lists are picked up on the next lookup
+        data["players"].append({"id": 7, "name": "Lou"})
+        self.assertEqual(repository.find_player(data, 7)["name"], "Lou")
+        self.assertEqual(repository.get_next_id(data["players"]), 8)
+        self.assertEqual(repository.get_next_id(data["matches"]), 1)
+
+    def test_next_id_is_monotonic_after_removal(self):
+        data = {"players": [{"id": 1}, {"id": 2}], "matches": [], "trainings": []}
+        repo = repository.get_repository(data)
+
+        data["players"].pop()
+        self.assertIsNone(repo.find_player(2))
+        self.assertEqual(repo.next_id("players"), 3)
+
+    def test_mutable_replaces_the_record_at_its_position(self):
+        data = compact.freeze({
+            "players": [{"id": i, "name": f"J{i}", "position": None, "base_ratings": {}} for i in (1, 2, 3)],
+            "matches": [],
+            "trainings": [],
+        })
+        repo = repository.get_repository(data)
+
+        plain = repo.mutable("players", 2)
+        self.assertIs(type(plain), dict)
+        self.assertIs(data["players"][1], plain)
+        self.assertIs(repo.find_player(2), plain)
+
+        # Reordered outside the repository: the stale position is detected
+        data["players"].reverse()
+        plain = repo.mutable("players", 3)
+        self.assertIs(data["players"][0], plain)
+        self.assertEqual([p["id"] for p in data["players"]], [3, 2, 1])
+
+    def test_loaded_data_keeps_its_repository_whatever_else_is_indexed(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with mock.patch.object(repository, "DATA_FILE", Path(tmpdir) / "data.json"):
+                repository.clear_load_cache()
+                data = repository.load_data()
+        repo = repository.get_repository(data)
+        repo.disk_signature = ("marker",)
+
+        snapshots = [repository.snapshot(data) for _ in range(3 * repository._REGISTRY_SIZE)]
+        for scratch in [{"players": [], "matches": [], "trainings": []} for _ in range(3 * repository._REGISTRY_SIZE)]:
+            repository.get_repository(scratch)
+
+        self.assertIs(repository.get_repository(data), repo)
+        self.assertEqual(repo.disk_signature, ("marker",))
+        self.assertTrue(all(id(s) not in repository._registry for s in snapshots))
+        self.assertIsNot(repository.get_repository(snapshots[0]), repo)
+        self.assertIsNot(repository.get_repository(copy.deepcopy(data)), repo)
+
+        # Snapshots are only weakly referenced: they are freed with their repository
+        key = id(snapshots[0])
+        del snapshots
+        gc.collect()
+        self.assertNotIn(key, repository._datasets)
+
+
+class JournalTests(unittest.TestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.tmp = Path(tmpdir.name)
+        patcher = mock.patch.object(repository, "DATA_FILE", self.tmp / "data.json")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _reload(self):
+        # Bypass the in-process cache to check what is actually on disk
+        repository.clear_load_cache()
+        return repository.load_data()
+
+    def test_mutations_are_journaled_and_replayed(self):
+        data = repository.load_data()
+        repository.add_player(data, {"id": 1, "name": "Alex", "base_ratings": {}})
+        repository.add_match(data, {"id": 1, "date": "2024-04-20", "opponent": "FC", "competition": "", "performances": []})
+        repository.add_performance(data, 1, {"player_id": 1, "minutes": 40})
+        repository.add_training(data, {"id": 1, "date": "2024-04-15", "theme": "T", "type": "Technique", "attendances": []})
+        repository.set_attendances(data, 1, [{"player_id": 1, "present": True}])
+        repository.set_base_ratings(data, 1, {"Dribble": 4})
+
+        self.assertFalse((self.tmp / "data.json").exists())
+        self.assertEqual(len(journal.read_records(self.tmp / "data.journal.jsonl")), 6)
+
+        reloaded = self._reload()
+        self.assertEqual(data, reloaded)
+        self.assertEqual(reloaded["version"], 6)
+
+    def test_threshold_compaction_folds_journal_into_snapshot(self):
+        data = repository.load_data()
+        with mock.patch.object(repository, "COMPACT_THRESHOLD", 3):
+            for player_id in range(1, 4):
+                repository.add_player(data, {"id": player_id, "name": f"J{player_id}"})
+
+        self.assertFalse((self.tmp / "data.journal.jsonl").exists())
+        self.assertEqual(self._reload(), data)
+
+    def test_truncated_last_record_is_ignored(self):
+        data = repository.load_data()
+        repository.add_player(data, {"id": 1, "name": "Alex"})
+        with open(self.tmp / "data.journal.jsonl", "a", encoding="utf-8") as f:
+            f.write('{"op": "add_player", "vers')
+
+        self.assertEqual(self._reload(), data)
+
+    def test_appends_after_truncated_record_survive_compaction(self):
+        data = repository.load_data()
+        repository.add_player(data, {"id": 1, "name": "Alex"})
+        with open(self.tmp / "data.journal.jsonl", "a", encoding="utf-8") as f:
+            f.write('{"op": "add_player", "vers')
+
+        data = self._reload()
+        repository.add_player(data, {"id": 2, "name": "Sam"})
+        repository.add_player(data, {"id": 3, "name": "Lou"})
+        self.assertEqual([p["name"] for p in self._reload()["players"]], ["Alex", "Sam", "Lou"])
+
+        repository.compact()
+        self.assertEqual([p["name"] for p in self._reload()["players"]], ["Alex", "Sam", "Lou"])
+
+    def test_save_is_atomic_and_clears_journal(self):
+        data = repository.load_data()
+        repository.add_player(data, {"id": 1, "name": "Alex"})
+        repository.save_data(data)
+
+        # The columnar snapshot (data.columnar) is rewritten with the file when services.columnar is loaded
+        files = sorted(p.name for p in self.tmp.iterdir() if p.name != "data.columnar")
+        self.assertEqual(files, ["data.json", "data.lock"])
+        self.assertEqual(self._reload(), data)
+
+
+def _attendance(player_id, effort):
+    return {"player_id": player_id, "present": True, "effort": effort, "focus": 3, "comment": ""}
+
+
+def _add_performances(match_id, count):
+    repository.clear_load_cache()
+    data = repository.load_data()
+    for _ in range(count):
+        repository.add_performance(data, match_id, {"player_id": 1, "minutes": 1})
+
+
+class ConcurrentSessionsTests(unittest.TestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        patcher = mock.patch.object(repository, "DATA_FILE", Path(tmpdir.name) / "data.json")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        repository.save_data({
+            "players": [{"id": 1, "name": "Alex", "base_ratings": {}}, {"id": 2, "name": "Sam", "base_ratings": {}}],
+            "matches": [{"id": m, "date": "2024-04-20", "opponent": "FC", "competition": "", "performances": []}
+                        for m in (1, 2)],
+            "trainings": [{"id": 1, "date": "2024-04-15", "theme": "T", "type": "Technique", "attendances": []}],
+        })
+
+    def _session(self):
+        # Each session holds its own copy, as separate processes would
+        repository.clear_load_cache()
+        return repository.load_data()
+
+    def test_appends_from_two_sessions_are_merged(self):
+        first, second = self._session(), self._session()
+
+        repository.add_performance(first, 1, {"player_id": 1, "minutes": 40})
+        repository.add_performance(second, 2, {"player_id": 2, "minutes": 30})
+        repository.add_player(first, {"id": 3, "name": "Lou"})
+        repository.add_player(second, {"id": 3, "name": "Noé"})
+
+        self.assertEqual(second["version"], first["version"] + 1)
+        self.assertEqual([p["name"] for p in second["players"]], ["Alex", "Sam", "Lou", "Noé"])
+        self.assertEqual(repository.find_player(second, 4)["name"], "Noé")
+        reloaded = self._session()
+        self.assertEqual(reloaded, second)
+        self.assertEqual(repository.player_aggregates(second), PlayerAggregates.from_data(reloaded))
+
+    def test_same_sheet_different_players_merge_same_player_conflicts(self):
+        first, second, third = self._session(), self._session(), self._session()
+
+        repository.update_attendances(first, 1, [_attendance(1, 5)])
+        repository.update_attendances(second, 1, [_attendance(2, 4)])
+        with self.assertRaises(repository.ConflictError):
+            repository.update_attendances(third, 1, [_attendance(1, 1)])
+
+        expected = [(1, 5), (2, 4)]
+        for data in (third, self._session()):
+            attendances = repository.find_training(data, 1)["attendances"]
+            self.assertEqual([(a["player_id"], a["effort"]) for a in attendances], expected)
+
+    def test_merge_after_compaction_by_another_session(self):
+        first, second, third = self._session(), self._session(), self._session()
+        with mock.patch.object(repository, "COMPACT_THRESHOLD", 1):
+            repository.set_base_ratings(first, 1, {"Tir": 4})
+
+        second_revision = repository.data_revision(second)
+        repository.set_base_ratings(second, 2, {"Tir": 2})
+        with self.assertRaises(repository.ConflictError):
+            repository.set_base_ratings(third, 1, {"Tir": 1})
+
+        # The journal was folded: the merged data is a new dict published through the load cache
+        merged = repository.load_data()
+        self.assertIsNot(merged, second)
+        self.assertEqual(repository.find_player(second, 1)["base_ratings"], {})
+        self.assertEqual(repository.data_revision(second), second_revision)
+        self.assertEqual(repository.find_player(merged, 1)["base_ratings"], {"Tir": 4})
+        self.assertEqual(repository.find_player(merged, 2)["base_ratings"], {"Tir": 2})
+        self.assertEqual(self._session(), merged)
+
+    def test_sessions_sharing_one_dict_never_commit_the_same_id(self):
+        shared = repository.load_data()
+        first_id = repository.get_next_id(shared["players"])
+        second_id = repository.get_next_id(shared["players"])
+        repository.add_player(shared, {"id": first_id, "name": "A"})
+        repository.add_player(shared, {"id": second_id, "name": "B"})
+        self.assertEqual([(p["id"], p["name"]) for p in shared["players"][-2:]], [(3, "A"), (4, "B")])
+
+        barrier = threading.Barrier(8)
+
+        def add_players():
+            barrier.wait()
+            for _ in range(10):
+                player_id = repository.get_next_id(shared["players"])
+                repository.add_player(shared, {"id": player_id, "name": "J"})
+
+        threads = [threading.Thread(target=add_players) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for data in (shared, self._session()):
+            ids = [p["id"] for p in data["players"]]
+            self.assertEqual(len(ids), 84)
+            self.assertEqual(len(set(ids)), 84)
+
+    def test_stale_full_save_is_rejected(self):
+        first, second = self._session(), self._session()
+        repository.add_performance(first, 1, {"player_id": 1, "minutes": 40})
+
+        with self.assertRaises(repository.ConflictError):
+            repository.save_data(second)
+
+    @unittest.skipUnless("fork" in multiprocessing.get_all_start_methods(), "needs fork")
+    def test_parallel_writers_lose_nothing(self):
+        context = multiprocessing.get_context("fork")
+        workers = [context.Process(target=_add_performances, args=(1 + i % 2, 20)) for i in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        data = self._session()
+        self.assertEqual(sum(len(m["performances"]) for m in data["matches"]), 80)
+        self.assertEqual(len({r["version"] for r in journal.read_records(journal.journal_path_for(repository.DATA_FILE))}), 80)
+
+
+class PlayerAggregatesTests(unittest.TestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        patcher = mock.patch.object(repository, "DATA_FILE", Path(tmpdir.name) / "data.json")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_appends_update_aggregates_incrementally(self):
+        data = {
+            "players": [{"id": 1, "name": "Alex"}],
+            "matches": [{"id": 1, "date": "2024-04-20", "performances": [
+                {"player_id": 1, "tech": 4, "phys": 3, "tact": 2, "mental": 5, "minutes": 40, "goals": 1, "assists": 0},
+            ]}],
+            "trainings": [],
+        }
+        aggregates = repository.player_aggregates(data)
+        self.assertEqual(aggregates.get(1).count, 1)
+
+        repository.add_performance(data, 1, {"player_id": 1, "tech": 2, "phys": 3, "tact": 4, "mental": 5,
+                                             "minutes": 20, "goals": 0, "assists": 2})
+
+        totals = repository.player_aggregates(data).get(1)
+        self.assertEqual(totals.count, 2)
+        self.assertEqual(totals.sums["minutes"], 60)
+        self.assertEqual(totals.sumsq["tech"], 20)
+        self.assertEqual(totals.mean("tech"), 3.0)
+        self.assertEqual(totals.std("tech"), 1.0)
+        self.assertEqual(repository.player_aggregates(data), PlayerAggregates.from_data(data))
+
+
+class PlayerSearchTests(unittest.TestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        patcher = mock.patch.object(repository, "DATA_FILE", Path(tmpdir.name) / "data.json")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_accent_folded_prefix_search_with_homonyms(self):
+        data = {
+            "players": [
+                {"id": 1, "name": "Éloïse Martin"},
+                {"id": 2, "name": "Léo Martin"},
+                {"id": 3, "name": "Léo Martin"},
+                {"id": 4, "name": "Lucas Petit"},
+            ],
+            "matches": [],
+            "trainings": [],
+        }
+        index = repository.player_search(data)
+
+        self.assertEqual(index.search(""), [1, 2, 3, 4])
+        self.assertEqual(index.search("mar"), [1, 2, 3])
+        self.assertEqual(index.search("ELOI"), [1])
+        self.assertEqual(index.search("mart le"), [2, 3])
+        self.assertEqual(index.search("zz"), [])
+        self.assertEqual(index.label(1), "Éloïse Martin")
+        self.assertEqual([index.label(2), index.label(3)], ["Léo Martin (#2)", "Léo Martin (#3)"])
+
+    def test_index_follows_added_players(self):
+        data = {"players": [{"id": 1, "name": "Alex"}], "matches": [], "trainings": []}
+        index = repository.player_search(data)
+
+        repository.add_player(data, {"id": 2, "name": "Alexandre"})
+
+        self.assertIs(repository.player_search(data), index)
+        self.assertEqual(index.search("alex"), [1, 2])
+
+
+class LoadCacheTests(unittest.TestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.data_file = Path(tmpdir.name) / "data.json"
+        patcher = mock.patch.object(repository, "DATA_FILE", self.data_file)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        repository.clear_load_cache()
+
+    def test_unchanged_file_is_not_parsed_again(self):
+        repository.save_data({"players": [{"id": 1, "name": "Alex"}], "matches": [], "trainings": []})
+
+        first = repository.load_data()
+        second = repository.load_data()
+
+        self.assertIs(first, second)
+        self.assertEqual(repository.load_stats(), {"hits": 1, "misses": 1})
+
+    def test_own_writes_keep_the_cache_warm(self):
+        data = repository.load_data()
+        repository.add_player(data, {"id": 1, "name": "Alex"})
+
+        self.assertIs(repository.load_data(), data)
+        self.assertEqual(repository.load_stats()["misses"], 1)
+
+    def test_external_write_triggers_reload(self):
+        data = repository.load_data()
+        journal.atomic_write_json(self.data_file, {"players": [{"id": 3, "name": "Lou"}]})
+
+        reloaded = repository.load_data()
+
+        self.assertIsNot(reloaded, data)
+        self.assertEqual(repository.find_player(reloaded, 3)["name"], "Lou")
+
 
 if __name__ == "__main__":
     unittest.main()
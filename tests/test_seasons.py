@@ -0,0 +1,138 @@
+import multiprocessing
+import tempfile
+import unittest
+from datetime import date
+from pathlib import Path
+from unittest import mock
+
+from storage import repository, seasons
+from storage.seasons import ShardedStore, migrate_json_to_shards, season_of
+
+
+def _club():
+    return {
+        "players": [{"id": 1, "name": "Alex", "base_ratings": {}}, {"id": 2, "name": "Sam", "base_ratings": {}}],
+        "matches": [
+            {"id": 1, "date": "2023-10-07", "opponent": "FC A", "competition": "Plateau", "performances": [
+                {"player_id": 1, "minutes": 40, "tech": 3, "phys": 3, "tact": 3, "mental": 3, "goals": 1, "assists": 0},
+            ]},
+            {"id": 2, "date": "2024-09-14", "opponent": "FC B", "competition": "Plateau", "performances": []},
+        ],
+        "trainings": [
+            {"id": 1, "date": "2024-06-01", "theme": "T", "type": "Technique", "attendances": []},
+            {"id": 2, "date": "2024-09-10", "theme": "T", "type": "Physique", "attendances": []},
+        ],
+    }
+
+
+def _add_matches(root, first_id, count):
+    store = ShardedStore(root, today=date(2024, 10, 1))
+    data = store.load_data()
+    for match_id in range(first_id, first_id + count):
+        store.add_match(data, {"id": match_id, "date": "2024-10-05", "opponent": "FC", "competition": "",
+                               "performances": []})
+
+
+class SeasonOfTests(unittest.TestCase):
+    def test_season_starts_in_august(self):
+        self.assertEqual(season_of("2024-08-01"), "2024-2025")
+        self.assertEqual(season_of("2025-07-31"), "2024-2025")
+
+
+class ShardedStoreTests(unittest.TestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.root = Path(tmpdir.name)
+        self.store = ShardedStore(self.root, today=date(2024, 10, 1))
+        self.store.save_data(_club())
+
+    def test_data_is_split_by_season(self):
+        self.assertEqual(self.store.seasons(), ["2023-2024", "2024-2025"])
+
+        current = self.store.load_data()
+
+        self.assertEqual([m["id"] for m in current["matches"]], [2])
+        self.assertEqual([t["id"] for t in current["trainings"]], [2])
+        self.assertEqual(len(current["players"]), 2)
+
+    def test_archived_seasons_are_read_only_on_demand(self):
+        with mock.patch.object(seasons, "_read_json", wraps=seasons._read_json) as reads:
+            fresh = ShardedStore(self.root, today=date(2024, 10, 1))
+            fresh.load_data()
+            read_paths = [call.args[0] for call in reads.call_args_list]
+            self.assertNotIn(fresh.shard_file("2023-2024"), read_paths)
+
+            history = fresh.load_history()
+            self.assertEqual(sorted(m["id"] for m in history["matches"]), [1, 2])
+
+    def test_mutations_write_to_the_right_shard_and_keep_ids_unique(self):
+        data = self.store.load_data()
+        next_match_id = self.store.get_next_id(data["matches"])
+        self.assertEqual(next_match_id, 3)
+
+        self.store.add_match(data, {"id": next_match_id, "date": "2023-11-04", "opponent": "FC C",
+                                    "competition": "", "performances": []})
+        self.store.add_performance(data, 2, {"player_id": 2, "minutes": 20})
+        self.store.set_base_ratings(data, 2, {"Tir": 4})
+
+        reopened = ShardedStore(self.root, today=date(2024, 10, 1))
+        archived = reopened.data_for(["2023-2024"])
+        self.assertEqual(sorted(m["id"] for m in archived["matches"]), [1, 3])
+        current = reopened.load_data()
+        self.assertEqual(reopened.find_match(current, 2)["performances"], [{"player_id": 2, "minutes": 20}])
+        self.assertEqual(reopened.find_player(current, 2)["base_ratings"], {"Tir": 4})
+
+    def test_reruns_get_the_same_data_until_a_file_changes(self):
+        data = self.store.load_data()
+        revision = repository.data_revision(data)
+        self.assertIs(self.store.load_data(), data)
+        self.assertEqual(repository.data_revision(self.store.load_data()), revision)
+
+        self.store.add_performance(data, 2, {"player_id": 1, "minutes": 30})
+        self.assertIs(self.store.load_data(), data)
+
+        other = ShardedStore(self.root, today=date(2024, 10, 1))
+        other.set_base_ratings(other.load_data(), 1, {"Tir": 2})
+        reloaded = self.store.load_data()
+        self.assertIsNot(reloaded, data)
+        self.assertEqual(self.store.find_player(reloaded, 1)["base_ratings"], {"Tir": 2})
+        self.assertEqual(
+            self.store.find_match(reloaded, 2)["performances"], self.store.find_match(data, 2)["performances"]
+        )
+
+    def test_current_season_rolls_over_without_a_new_store(self):
+        store = ShardedStore(self.root)
+        with mock.patch.object(seasons, "date", wraps=date) as clock:
+            clock.today.return_value = date(2024, 7, 31)
+            self.assertEqual(store.season, "2023-2024")
+            self.assertEqual([m["id"] for m in store.load_data()["matches"]], [1])
+
+            clock.today.return_value = date(2024, 8, 1)
+            self.assertEqual(store.season, "2024-2025")
+            self.assertEqual([m["id"] for m in store.load_data()["matches"]], [2])
+
+    @unittest.skipUnless("fork" in multiprocessing.get_all_start_methods(), "needs fork")
+    def test_parallel_processes_do_not_clobber_a_shard(self):
+        context = multiprocessing.get_context("fork")
+        workers = [context.Process(target=_add_matches, args=(self.root, 100 * (i + 1), 15)) for i in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        matches = ShardedStore(self.root, today=date(2024, 10, 1)).load_data()["matches"]
+        self.assertEqual(len(matches), 1 + 4 * 15)
+
+    def test_migration_from_single_file(self):
+        json_path = self.root / "u9_data.json"
+        with mock.patch.object(repository, "DATA_FILE", json_path):
+            repository.save_data(_club())
+
+        store = migrate_json_to_shards(json_path, self.root / "shards")
+
+        self.assertEqual(sorted(m["id"] for m in store.load_history()["matches"]), [1, 2])
+
+
+if __name__ == "__main__":
+    unittest.main()
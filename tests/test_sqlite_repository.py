@@ -0,0 +1,142 @@
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from services.analytics import (
+    get_all_match_performances,
+    get_match_performances_from_store,
+    performances_between,
+)
+from storage import repository
+from storage.sqlite_repository import SqliteRepository, migrate_json_to_sqlite
+
+
+def _sample_data():
+    return {
+        "players": [
+            {"id": 1, "name": "Alex", "birth_year": 2016, "preferred_position": "Milieu",
+             "foot": "Droit", "base_ratings": {"Dribble": 4}},
+            {"id": 2, "name": "Sam", "birth_year": 2015, "preferred_position": None,
+             "foot": None, "base_ratings": {}},
+        ],
+        "matches": [
+            {"id": 1, "date": "2024-03-02", "opponent": "FC A", "competition": "Plateau", "performances": [
+                {"player_id": 1, "position": "Milieu", "minutes": 40, "tech": 4, "phys": 3,
+                 "tact": 4, "mental": 5, "goals": 1, "assists": 0, "comment": ""},
+                {"player_id": 2, "position": "Gardien", "minutes": 20, "tech": 2, "phys": 3,
+                 "tact": 3, "mental": 4, "goals": 0, "assists": 1, "comment": "Bien"},
+            ]},
+            {"id": 2, "date": "2024-04-20", "opponent": "FC B", "competition": "Amical", "performances": [
+                {"player_id": 1, "position": "Attaquant", "minutes": 30, "tech": 5, "phys": 4,
+                 "tact": 3, "mental": 4, "goals": 2, "assists": 1, "comment": ""},
+            ]},
+        ],
+        "trainings": [
+            {"id": 1, "date": "2024-03-01", "theme": "Passes", "type": "Technique", "notes": "", "attendances": [
+                {"player_id": 1, "present": True, "effort": 4, "focus": 3, "comment": ""},
+                {"player_id": 2, "present": False, "effort": 3, "focus": 3, "comment": "Malade"},
+            ]},
+        ],
+    }
+
+
+class SqliteRepositoryTests(unittest.TestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.tmp = Path(tmpdir.name)
+
+    def test_migration_round_trip(self):
+        json_path = self.tmp / "u9_data.json"
+        sample = _sample_data()
+        with mock.patch.object(repository, "DATA_FILE", json_path):
+            repository.save_data(sample)
+
+        store = migrate_json_to_sqlite(json_path, self.tmp / "u9.sqlite3")
+
+        self.assertEqual(store.load_data(), _sample_data())
+
+    def test_mutations_are_persisted(self):
+        store = SqliteRepository(self.tmp / "u9.sqlite3")
+        data = store.load_data()
+        store.add_player(data, {"id": store.get_next_id(data["players"]), "name": "Lou", "birth_year": 2016,
+                                "preferred_position": None, "foot": None, "base_ratings": {}})
+        store.add_match(data, {"id": 1, "date": "2024-05-01", "opponent": "X", "competition": "", "performances": []})
+        store.add_performance(data, 1, {"player_id": 1, "position": "Milieu", "minutes": 40, "tech": 3,
+                                        "phys": 3, "tact": 3, "mental": 3, "goals": 0, "assists": 0,
+                                        "comment": ""})
+        store.add_training(data, {"id": 1, "date": "2024-05-02", "theme": "T", "type": "Technique",
+                                  "notes": "", "attendances": []})
+        store.set_attendances(data, 1, [{"player_id": 1, "present": True, "effort": 5, "focus": 4, "comment": ""}])
+        store.set_base_ratings(data, 1, {"Tir": 5})
+
+        reloaded = store.load_data()
+        self.assertEqual(reloaded, data)
+        self.assertEqual(store.find_player(reloaded, 1)["base_ratings"], {"Tir": 5})
+
+    def test_filters_are_pushed_down_to_sql(self):
+        store = SqliteRepository(self.tmp / "u9.sqlite3")
+        store.save_data(_sample_data())
+
+        df_all = get_match_performances_from_store(store)
+        expected = get_all_match_performances(_sample_data())
+        self.assertEqual(list(df_all.columns), list(expected.columns))
+        self.assertEqual(len(df_all), 3)
+
+        df_april = get_match_performances_from_store(store, start="2024-04-01")
+        self.assertEqual(df_april["match_id"].tolist(), [2])
+
+        df_sam = get_match_performances_from_store(store, player_ids=[2], end="2024-03-31")
+        self.assertEqual(df_sam["Joueur"].tolist(), ["Sam"])
+        self.assertTrue(get_match_performances_from_store(store, player_ids=[]).empty)
+
+    def test_loaded_data_is_reused_until_another_connection_writes(self):
+        store = SqliteRepository(self.tmp / "u9.sqlite3")
+        store.save_data(_sample_data())
+        data = store.load_data()
+        revision = repository.data_revision(data)
+
+        self.assertIs(store.load_data(), data)
+        store.set_base_ratings(data, 2, {"Tir": 3})
+        self.assertIs(store.load_data(), data)
+        self.assertNotEqual(repository.data_revision(data), revision)
+
+        other = SqliteRepository(self.tmp / "u9.sqlite3")
+        other.set_base_ratings(other.load_data(), 1, {"Tir": 1})
+        reloaded = store.load_data()
+        self.assertIsNot(reloaded, data)
+        self.assertEqual(store.find_player(reloaded, 1)["base_ratings"], {"Tir": 1})
+        self.assertEqual(store.find_player(reloaded, 2)["base_ratings"], {"Tir": 3})
+
+    def test_failed_insert_leaves_memory_unchanged(self):
+        store = SqliteRepository(self.tmp / "u9.sqlite3")
+        store.save_data(_sample_data())
+        data = store.load_data()
+        revision = repository.data_revision(data)
+
+        with self.assertRaises(sqlite3.IntegrityError):
+            store.add_player(data, {"id": 1, "name": "Doublon"})
+
+        self.assertEqual([p["name"] for p in data["players"]], ["Alex", "Sam"])
+        self.assertEqual(repository.data_revision(data), revision)
+        self.assertEqual(store.load_data(), _sample_data())
+
+    def test_dashboard_period_is_filtered_in_sql(self):
+        store = SqliteRepository(self.tmp / "u9.sqlite3")
+        store.save_data(_sample_data())
+        data = store.load_data()
+
+        with mock.patch.object(store, "query_performances", wraps=store.query_performances) as query:
+            from_sql = performances_between(data, start="2024-04-01", store=store)
+        query.assert_called_once_with(start="2024-04-01", end=None, player_ids=None)
+        in_memory = performances_between(data, start="2024-04-01")
+
+        self.assertEqual(from_sql["match_id"].tolist(), [2])
+        self.assertEqual(in_memory["match_id"].tolist(), [2])
+        self.assertIs(performances_between(data), get_all_match_performances(data))
+
+
+if __name__ == "__main__":
+    unittest.main()
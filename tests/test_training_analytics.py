@@ -0,0 +1,70 @@
+import unittest
+
+from services import training_analytics
+
+
+def _att(player_id, present, effort=3, focus=3):
+    return {"player_id": player_id, "present": present, "effort": effort, "focus": focus, "comment": ""}
+
+
+def _sample_data():
+    return {
+        "players": [{"id": 1, "name": "Alex"}, {"id": 2, "name": "Sam"}],
+        "matches": [],
+        "trainings": [
+            {"id": 1, "date": "2024-03-01", "type": "Technique", "attendances": [_att(1, True, 4, 5), _att(2, False)]},
+            {"id": 2, "date": "2024-03-08", "type": "Physique", "attendances": [_att(1, False), _att(2, False)]},
+            {"id": 3, "date": "2024-03-15", "type": "Technique", "attendances": [_att(1, False), _att(2, True, 5, 4)]},
+            {"id": 4, "date": "2024-04-05", "type": "Technique", "attendances": [_att(1, True, 2, 2), _att(2, False)]},
+            # Out of order on purpose: streaks follow dates, not list order
+            {"id": 5, "date": "2024-02-23", "type": "Physique", "attendances": [_att(1, True), _att(9, True)]},
+        ],
+    }
+
+
+class TrainingAnalyticsTests(unittest.TestCase):
+    def test_index_points_to_each_player_rows(self):
+        data = _sample_data()
+
+        rows = training_analytics.player_attendances(data, 2)
+
+        self.assertEqual(sorted(rows["training_id"].tolist()), [1, 2, 3, 4])
+        self.assertTrue(training_analytics.player_attendances(data, 42).empty)
+
+    def test_squad_stats(self):
+        stats = training_analytics.squad_attendance_stats(_sample_data())
+
+        self.assertEqual(stats.index.tolist(), ["Alex", "Sam"])
+        self.assertEqual(stats.loc["Alex", "Séances"], 5)
+        self.assertEqual(stats.loc["Alex", "Taux de présence"], 0.6)
+        self.assertEqual(stats.loc["Alex", "Effort moyen"], 3.0)
+        self.assertEqual(stats.loc["Alex", "Absences en cours"], 0)
+        self.assertEqual(stats.loc["Alex", "Plus longue série d'absences"], 2)
+        self.assertEqual(stats.loc["Sam", "Absences en cours"], 1)
+        self.assertEqual(stats.loc["Sam", "Plus longue série d'absences"], 2)
+
+    def test_totals_match_pdf_figures(self):
+        totals = training_analytics.attendance_totals(_sample_data())
+
+        self.assertEqual(totals[1], {"sessions": 5, "present": 3, "effort": 15, "focus": 16})
+        self.assertEqual(totals[9]["sessions"], 1)
+
+    def test_by_type_and_trends(self):
+        data = _sample_data()
+
+        by_type = training_analytics.attendance_by_type(data)
+        self.assertEqual(by_type.loc["Technique", "Séances"], 3)
+        self.assertEqual(by_type.loc["Technique", "Taux de présence"], 0.5)
+
+        trends = training_analytics.attendance_trends(data)
+        self.assertEqual(len(trends), 3)
+
+    def test_no_attendance(self):
+        data = {"players": [{"id": 1, "name": "Alex"}], "matches": [], "trainings": []}
+
+        self.assertTrue(training_analytics.squad_attendance_stats(data).empty)
+        self.assertEqual(training_analytics.attendance_totals(data), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
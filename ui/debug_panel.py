@@ -0,0 +1,60 @@
+import io
+import uuid
+
+import streamlit as st
+
+from core import profiling
+from storage.repository import load_stats
+
+
+def profiling_toggle():
+    """Case à cocher de la barre latérale, propre à la session.
+
+    Retourne l'id de profilage de la session si la case est cochée, sinon None :
+    la page est alors rendue dans `profiling.session(...)` (voir `ui.main`),
+    sans toucher au profilage des autres sessions.
+    """
+    if not st.sidebar.checkbox("🔧 Profilage (debug)", key="profiling_enabled"):
+        return None
+    return st.session_state.setdefault("profiling_session", uuid.uuid4().hex)
+
+
+def render_debug_sidebar(session_id):
+    """Durées par span, compteurs d'I/O (de cette session) et état des caches, avec export JSON lines."""
+    # Importés ici : la case à cocher seule ne doit pas charger pandas au démarrage.
+    import pandas as pd
+
+    from services.analytics import cache_stats
+    from services.jobs import job_stats
+
+    with st.sidebar.expander("Profilage", expanded=True):
+        summary = profiling.summary(session_id)
+        if summary:
+            st.dataframe(
+                pd.DataFrame(summary, columns=["name", "calls", "total_ms", "mean_ms", "max_ms"]).set_index("name"),
+                use_container_width=True,
+            )
+        else:
+            st.caption("Aucune mesure pour l'instant.")
+
+        counters = profiling.counters(session_id)
+        for name in ("storage.bytes_read", "storage.bytes_written"):
+            if name in counters:
+                counters[name] = f"{counters[name] / 1024:.1f} Kio"
+        st.json({
+            "compteurs": counters,
+            "chargement": load_stats(),
+            "cache analytics": cache_stats(),
+            "tâches": job_stats(),
+        })
+
+        buffer = io.StringIO()
+        profiling.dump_jsonl(buffer, session_id)
+        st.download_button(
+            "Télécharger les mesures (JSONL)",
+            data=buffer.getvalue().encode("utf-8"),
+            file_name="u9_profil.jsonl",
+            mime="application/x-ndjson",
+        )
+        if st.button("Réinitialiser les mesures"):
+            profiling.reset(session_id)
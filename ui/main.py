@@ -1,19 +1,57 @@
+import contextlib
+import importlib
+import os
+
 import streamlit as st
 
-from storage import repository as repo
-from ui.pages import exports, matches, players, profiles, trainings
+from core import profiling
+from storage import repository
+from ui.debug_panel import profiling_toggle, render_debug_sidebar
 from ui.theme import apply_mobile_theme
 
 
+# Libellé → module de la page. Le module n'est importé qu'à la première visite :
+# ouvrir « Joueurs » ne charge ni l'analytics (pandas) ni les rapports PDF (reportlab).
 PAGES = {
-    "Joueurs": players.render,
-    "Profils": profiles.render,
-    "Entraînements": trainings.render,
-    "Matchs": matches.render,
-    "Exports": exports.render,
+    "Joueurs": "ui.pages.players",
+    "Profils": "ui.pages.profiles",
+    "Entraînements": "ui.pages.trainings",
+    "Matchs": "ui.pages.matches",
+    "Exports": "ui.pages.exports",
 }
 
 
+def page_renderer(page):
+    """Fonction `render(repo, data)` de la page, en important son module si besoin."""
+    return importlib.import_module(PAGES[page]).render
+
+
+def get_repository_backend():
+    """Module JSON par défaut, base SQLite si `U9_SQLITE_DB` est défini,
+    stockage par saison si `U9_SEASONS_DIR` est défini."""
+    db_path = os.environ.get("U9_SQLITE_DB")
+    if db_path:
+        return _sqlite_store(db_path)
+    seasons_dir = os.environ.get("U9_SEASONS_DIR")
+    if seasons_dir:
+        return _sharded_store(seasons_dir)
+    return repository
+
+
+@st.cache_resource
+def _sqlite_store(db_path):
+    from storage.sqlite_repository import SqliteRepository
+
+    return SqliteRepository(db_path)
+
+
+@st.cache_resource
+def _sharded_store(seasons_dir):
+    from storage.seasons import ShardedStore
+
+    return ShardedStore(seasons_dir)
+
+
 def main():
     st.set_page_config(page_title="Suivi U9", layout="wide")
 
@@ -21,6 +59,17 @@ def main():
 
     st.title("⚽ Suivi U9 – Joueurs, Entraînements, Matchs & Profils postes")
 
+    profiling_session = profiling_toggle()
+    measured = profiling.session(profiling_session) if profiling_session else contextlib.nullcontext()
+    with measured:
+        _render_page()
+
+    if profiling_session:
+        render_debug_sidebar(profiling_session)
+
+
+def _render_page():
+    repo = get_repository_backend()
     data = repo.load_data()
 
     mobile_mode = st.sidebar.checkbox("Mode mobile (terrain)", value=True)
@@ -28,8 +77,11 @@ def main():
 
     page = st.sidebar.selectbox("Navigation", list(PAGES.keys()))
 
-    render_page = PAGES[page]
-    render_page(repo, data)
+    try:
+        with profiling.span(f"page.{page}"):
+            page_renderer(page)(repo, data)
+    except repository.ConflictError as exc:
+        st.warning(f"⚠️ {exc}")
 
 
 if __name__ == "__main__":
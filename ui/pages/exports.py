@@ -1,21 +1,49 @@
-import json
-
 import streamlit as st
 
-from services.reports import generate_player_pdf
+from services import columnar, jobs
+from services.exports import (
+    JSON_VARIANTS,
+    export_columnar_bytes,
+    export_json_bytes,
+    peek_columnar_export,
+    peek_json_export,
+)
+from services.reports import (
+    compute_player_stats,
+    export_squad_zip,
+    pdf_file_name,
+    render_player_pdf,
+    season_data,
+    seasons_in,
+    write_season_report,
+)
+from storage import repository
+from ui.player_picker import select_player
 
 
 def render(repo, data):
     st.header("📤 Exports & rapports")
 
     st.subheader("Exporter les données brutes")
-    json_data = json.dumps(data, ensure_ascii=False, indent=2)
-    st.download_button(
-        label="📥 Télécharger les données (JSON)",
-        data=json_data,
-        file_name="u9_data.json",
-        mime="application/json",
+    variant = st.selectbox(
+        "Format",
+        list(JSON_VARIANTS.keys()),
+        format_func=lambda key: JSON_VARIANTS[key][0],
     )
+    json_bytes = peek_json_export(data, variant)
+    if json_bytes is None and st.button("Préparer l'export"):
+        json_bytes = export_json_bytes(data, variant)
+    if json_bytes is not None:
+        _, _, _, file_name, mime = JSON_VARIANTS[variant]
+        st.download_button(
+            label="📥 Télécharger les données",
+            data=json_bytes,
+            file_name=file_name,
+            mime=mime,
+        )
+
+    st.markdown("---")
+    _render_columnar_export(data)
 
     st.markdown("---")
     st.subheader("📄 Fiche joueur (PDF)")
@@ -24,17 +52,100 @@ def render(repo, data):
         st.info("Ajoute d'abord des joueurs pour générer une fiche.")
         return
 
-    player_names = {p["name"]: p["id"] for p in data["players"]}
-    selected_name = st.selectbox("Choisir un joueur pour générer sa fiche PDF", list(player_names.keys()))
+    player = select_player(repo, data, "Choisir un joueur pour générer sa fiche PDF", key="pdf_player")
 
-    if st.button("Générer la fiche PDF"):
-        player = repo.find_player(data, player_names[selected_name])
-        pdf_bytes = generate_player_pdf(player, data)
-        file_name = f"Fiche_{player['name'].replace(' ', '_')}.pdf"
+    if player is not None and st.button("Générer la fiche PDF"):
+        # La fiche couvre toute la carrière, saisons archivées comprises.
+        history = repo.load_history()
+        # Stats agrégées ici, à partir des index du repository : la tâche ne fait que dessiner.
+        sheet = (dict(player), compute_player_stats(history, [player["id"]])[player["id"]])
+        job = jobs.submit(
+            "player_pdf", history, (player["id"],),
+            lambda fileobj, progress: fileobj.write(render_player_pdf(*sheet)),
+            label=f"Fiche de {player['name']}",
+        )
+        st.session_state["job_player_pdf"] = (job.id, pdf_file_name(player))
+    _render_job("job_player_pdf", "📥 Télécharger la fiche joueur (PDF)", "application/pdf")
+
+    st.markdown("---")
+    _render_season_report(data)
+
+    st.markdown("---")
+    st.subheader("🗂️ Toutes les fiches (ZIP)")
+
+    if st.button("Générer toutes les fiches"):
+        history = repo.load_history()
+        frozen = repository.snapshot(history)
+        job = jobs.submit(
+            "squad_zip", history, (),
+            lambda fileobj, progress: export_squad_zip(frozen, fileobj, progress=progress),
+            label="Fiches de l'effectif",
+        )
+        st.session_state["job_squad_zip"] = (job.id, "Fiches_joueurs.zip")
+    _render_job("job_squad_zip", "📥 Télécharger toutes les fiches (ZIP)", "application/zip")
 
+
+def _render_job(slot, label, mime):
+    """État de la tâche gardée dans `st.session_state[slot]`, puis son téléchargement une fois prête."""
+    if slot not in st.session_state:
+        return
+    job_id, file_name = st.session_state[slot]
+    job = jobs.get_job(job_id)
+    if job is None:
+        del st.session_state[slot]
+        st.info("Ce fichier n'est plus disponible : relance la génération.")
+    elif job.state == jobs.FAILED:
+        st.error(f"Échec de la génération : {job.error}")
+    elif job.state == jobs.DONE:
+        result = job.open()
+        if result is None:
+            del st.session_state[slot]
+            st.info("Ce fichier n'est plus disponible : relance la génération.")
+            return
+        with result:
+            st.download_button(label=label, data=result, file_name=file_name, mime=mime, key=f"{slot}_download")
+    else:
+        progress = f" ({job.done} / {job.total})" if job.total else ""
+        st.progress(job.fraction, text=f"{job.label} : {job.state}{progress}…")
+        st.button("🔄 Actualiser", key=f"{slot}_refresh")
+
+
+def _render_season_report(data):
+    st.subheader("📘 Bilan de saison (PDF)")
+    seasons = seasons_in(data)
+    if not seasons:
+        st.info("Aucun match ni aucune séance : pas encore de bilan de saison.")
+        return
+    season = st.selectbox("Saison", seasons, index=len(seasons) - 1)
+
+    if st.button("Générer le bilan de saison"):
+        frozen = repository.snapshot(season_data(data, season))
+        job = jobs.submit(
+            "season_pdf", data, (season,),
+            lambda fileobj, progress: write_season_report(frozen, fileobj, title=season, progress=progress),
+            label=f"Bilan {season}",
+        )
+        st.session_state["job_season_pdf"] = (job.id, f"Bilan_saison_{season}.pdf")
+    _render_job("job_season_pdf", "📥 Télécharger le bilan de saison (PDF)", "application/pdf")
+
+
+def _render_columnar_export(data):
+    st.subheader("📊 Tables pour l'analyse (Parquet / Arrow)")
+    if not columnar.available():
+        st.caption("Installe `pyarrow` pour exporter joueurs, matchs, perfs, séances et présences en tables typées.")
+        return
+    fmt = st.selectbox(
+        "Format des tables",
+        list(columnar.FORMATS.keys()),
+        format_func=lambda key: columnar.FORMATS[key][0],
+    )
+    archive = peek_columnar_export(data, fmt)
+    if archive is None and st.button("Préparer les tables"):
+        archive = export_columnar_bytes(data, fmt)
+    if archive is not None:
         st.download_button(
-            label="📥 Télécharger la fiche joueur (PDF)",
-            data=pdf_bytes,
-            file_name=file_name,
-            mime="application/pdf"
+            label="📥 Télécharger les tables (ZIP)",
+            data=archive,
+            file_name=f"u9_tables_{fmt}.zip",
+            mime="application/zip",
         )
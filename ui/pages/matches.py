@@ -3,6 +3,12 @@ from datetime import date
 import pandas as pd
 import streamlit as st
 
+from core.models import POSITIONS
+from services.grid_entry import match_changes, match_grid
+from services.lineup import FORMATIONS, optimize_lineup, recent_position_counts
+from services.match_import import TEMPLATE, import_match_sheet
+from ui.player_picker import select_player
+
 
 def render(repo, data):
     st.header("🏟️ Matchs & performances")
@@ -28,10 +34,14 @@ def render(repo, data):
             "competition": competition.strip(),
             "performances": [],
         }
-        data["matches"].append(new_match)
-        repo.save_data(data)
+        repo.add_match(data, new_match)
         st.success(f"Match vs {opponent} ajouté.")
 
+    if data["players"]:
+        st.markdown("---")
+        _render_lineup(data)
+        st.markdown("---")
+
     if not data["matches"]:
         st.info("Aucun match enregistré pour l’instant.")
         return
@@ -49,11 +59,132 @@ def render(repo, data):
         return
 
     st.markdown("---")
+    _render_bulk_import(repo, data, match)
+
+    st.markdown("---")
+    if st.checkbox("Saisie en grille (tableau éditable)", value=True, key="match_grid_mode"):
+        _render_match_grid(repo, data, match)
+    else:
+        _render_performance_form(repo, data, match)
+
+    if match["performances"]:
+        st.subheader("Performances déjà saisies pour ce match")
+        rows = []
+        for perf in match["performances"]:
+            p = repo.find_player(data, perf["player_id"])
+            rows.append({
+                "Joueur": p["name"] if p else "Inconnu",
+                "Poste": perf["position"],
+                "Minutes": perf["minutes"],
+                "Tech": perf["tech"],
+                "Phys": perf["phys"],
+                "Tact": perf["tact"],
+                "Mental": perf["mental"],
+                "Buts": perf["goals"],
+                "Passes": perf["assists"],
+                "Commentaire": perf["comment"],
+            })
+        df_match = pd.DataFrame(rows)
+        st.dataframe(df_match, use_container_width=True)
+
+
+def _render_lineup(data):
+    st.subheader("🧩 Composition optimale")
+    st.caption("Répartit les joueurs disponibles sur les postes du système pour maximiser la somme des scores par poste.")
+    formation_name = st.selectbox("Système", list(FORMATIONS.keys()))
+    players_by_id = {p["id"]: p for p in data["players"]}
+    available_ids = st.multiselect(
+        "Joueurs disponibles",
+        list(players_by_id),
+        default=list(players_by_id),
+        format_func=lambda player_id: players_by_id[player_id]["name"],
+    )
+
+    recent = max_share = None
+    if st.checkbox("Faire tourner les postes (limiter la part d'un même poste)", key="lineup_rotation"):
+        last = st.number_input("Matchs récents pris en compte", min_value=1, max_value=20, value=5)
+        max_share = st.slider("Part maximale d'un même poste", min_value=0.2, max_value=1.0, value=0.5, step=0.05)
+        recent = recent_position_counts(data["matches"], last=int(last))
+
+    assignments, unfilled = optimize_lineup(
+        [players_by_id[player_id] for player_id in available_ids],
+        FORMATIONS[formation_name],
+        recent=recent,
+        max_share=max_share,
+    )
+    if assignments:
+        st.table(pd.DataFrame(
+            [{"Poste": a["position"], "Joueur": a["name"], "Score": a["score"]} for a in assignments]
+        ).set_index("Poste"))
+        st.caption(f"Score total : {round(sum(a['score'] for a in assignments), 2)}")
+    if unfilled:
+        st.warning("Postes non pourvus : " + ", ".join(unfilled))
+
+
+def _render_bulk_import(repo, data, match):
+    st.subheader("Import groupé de la feuille de match")
+    st.caption(
+        "CSV (séparateur ; , ou tabulation) ou tableau collé depuis un tableur, une ligne par joueur. "
+        "Pour des homonymes, écrire « Nom (#id) » ou ajouter une colonne « Id »."
+    )
+    with st.form("bulk_import"):
+        uploaded = st.file_uploader("Fichier CSV", type=["csv", "txt"])
+        pasted = st.text_area("… ou coller le tableau ici", value=TEMPLATE, height=200)
+        submit = st.form_submit_button("📥 Importer toutes les performances")
+
+    if not submit:
+        return
+    text = uploaded.getvalue().decode("utf-8-sig") if uploaded is not None else pasted
+    performances, errors = import_match_sheet(repo, data, match["id"], text)
+    if errors:
+        st.error("Import annulé, aucune performance enregistrée :\n\n" + "\n".join(f"- {e}" for e in errors))
+    else:
+        st.success(f"{len(performances)} performances importées.")
+
+
+def _render_match_grid(repo, data, match):
+    st.subheader("Feuille de match")
+    st.caption("Coche « Joué » pour chaque joueur aligné ; décocher retire sa performance.")
+    with st.form("match_grid"):
+        edited = st.data_editor(
+            match_grid(data["players"], match),
+            column_config={
+                "Joué": st.column_config.CheckboxColumn("Joué"),
+                "Poste": st.column_config.SelectboxColumn("Poste", options=POSITIONS),
+                "Minutes": st.column_config.NumberColumn("Minutes", min_value=0, max_value=90, step=5),
+                **{
+                    label: st.column_config.NumberColumn(label, min_value=1, max_value=5, step=1)
+                    for label in ("Tech", "Phys", "Tact", "Mental")
+                },
+                "Buts": st.column_config.NumberColumn("Buts", min_value=0, max_value=10, step=1),
+                "Passes": st.column_config.NumberColumn("Passes", min_value=0, max_value=10, step=1),
+                "Commentaire": st.column_config.TextColumn("Commentaire"),
+            },
+            disabled=["Joueur"],
+            hide_index=True,
+            use_container_width=True,
+            key=f"match_grid_{match['id']}",
+        )
+        submit = st.form_submit_button("💾 Enregistrer la feuille de match")
+
+    if not submit:
+        return
+    performances, removed, errors = match_changes(data["players"], match, edited)
+    if errors:
+        st.error("Rien n'a été enregistré :\n\n" + "\n".join(f"- {e}" for e in errors))
+    elif performances or removed:
+        repo.update_performances(data, match["id"], performances, removed)
+        st.success(f"Feuille de match mise à jour ({len(performances) + len(removed)} joueur(s) modifié(s)).")
+    else:
+        st.info("Aucune modification à enregistrer.")
+
+
+def _render_performance_form(repo, data, match):
     st.subheader("Ajouter une performance joueur pour ce match")
 
-    player_names = {p["name"]: p["id"] for p in data["players"]}
-    perf_player_name = st.selectbox("Joueur", list(player_names.keys()))
-    perf_player = repo.find_player(data, player_names[perf_player_name])
+    perf_player = select_player(repo, data, "Joueur", key="perf_player")
+    if perf_player is None:
+        return
 
     col1, col2 = st.columns(2)
     with col1:
@@ -82,26 +213,5 @@ def render(repo, data):
             "assists": int(assists),
             "comment": comment.strip(),
         }
-        match["performances"].append(perf)
-        repo.save_data(data)
+        repo.add_performance(data, match["id"], perf)
         st.success(f"Performance ajoutée pour {perf_player['name']}.")
-
-    if match["performances"]:
-        st.subheader("Performances déjà saisies pour ce match")
-        rows = []
-        for perf in match["performances"]:
-            p = repo.find_player(data, perf["player_id"])
-            rows.append({
-                "Joueur": p["name"] if p else "Inconnu",
-                "Poste": perf["position"],
-                "Minutes": perf["minutes"],
-                "Tech": perf["tech"],
-                "Phys": perf["phys"],
-                "Tact": perf["tact"],
-                "Mental": perf["mental"],
-                "Buts": perf["goals"],
-                "Passes": perf["assists"],
-                "Commentaire": perf["comment"],
-            })
-        df_match = pd.DataFrame(rows)
-        st.dataframe(df_match, use_container_width=True)
@@ -1,4 +1,3 @@
-import pandas as pd
 import streamlit as st
 
 
@@ -25,13 +24,12 @@ def render(repo, data):
             "foot": foot or None,
             "base_ratings": {},
         }
-        data["players"].append(new_player)
-        repo.save_data(data)
+        repo.add_player(data, new_player)
         st.success(f"Joueur '{name}' ajouté.")
 
     if data["players"]:
         st.subheader("Liste des joueurs")
-        df = pd.DataFrame([
+        rows = [
             {
                 "ID": p["id"],
                 "Nom": p["name"],
@@ -40,7 +38,7 @@ def render(repo, data):
                 "Pied": p.get("foot") or "",
             }
             for p in data["players"]
-        ])
-        st.dataframe(df, use_container_width=True)
+        ]
+        st.dataframe(rows, use_container_width=True)
     else:
         st.info("Aucun joueur pour l’instant.")
@@ -1,5 +1,3 @@
-from datetime import date
-
 import pandas as pd
 import streamlit as st
 
@@ -7,12 +5,20 @@ from core.constants import SKILLS
 from core.models import best_position_from_scores, compute_position_scores
 from services.analytics import (
     aggregate_match_means,
-    aggregate_minutes,
     build_profile_rows,
-    compute_progress_deltas,
     get_all_match_performances,
+    get_progression_engine,
+    minutes_between,
+    performances_between,
     top_three_for_match,
 )
+from services.training_analytics import (
+    attendance_by_type,
+    attendance_trends,
+    squad_attendance_stats,
+)
+from storage.sqlite_repository import SqliteRepository
+from ui.player_picker import select_player
 
 
 def _render_base_ratings(repo, data):
@@ -22,9 +28,9 @@ def _render_base_ratings(repo, data):
         st.warning("Ajoute d'abord des joueurs dans l’onglet 'Joueurs'.")
         return
 
-    player_names = {p["name"]: p["id"] for p in data["players"]}
-    selected_name = st.selectbox("Choisir un joueur", list(player_names.keys()))
-    player = repo.find_player(data, player_names[selected_name])
+    player = select_player(repo, data, "Choisir un joueur", key="ratings_player")
+    if player is None:
+        return
 
     st.markdown(f"### {player['name']}")
 
@@ -38,8 +44,7 @@ def _render_base_ratings(repo, data):
         )
 
     if st.button("💾 Enregistrer les notes"):
-        player["base_ratings"] = new_ratings
-        repo.save_data(data)
+        repo.set_base_ratings(data, player["id"], new_ratings)
         st.success("Profil mis à jour.")
 
     if player.get("base_ratings"):
@@ -51,6 +56,25 @@ def _render_base_ratings(repo, data):
             st.success(f"Poste recommandé selon le profil : **{best_pos}**")
 
 
+def _render_attendance(data):
+    st.markdown("---")
+    st.markdown("#### 🏋️ Assiduité aux entraînements")
+
+    attendance = squad_attendance_stats(data)
+    if attendance.empty:
+        st.info("Aucune présence saisie pour le moment.")
+        return
+
+    st.dataframe(attendance, use_container_width=True)
+    st.bar_chart(attendance["Taux de présence"])
+
+    st.markdown("##### Par type de séance")
+    st.dataframe(attendance_by_type(data), use_container_width=True)
+    trends = attendance_trends(data)
+    if len(trends) > 1:
+        st.line_chart(trends)
+
+
 def _render_stats(repo, data):
     st.subheader("Profils, moyennes et tendances")
 
@@ -58,6 +82,9 @@ def _render_stats(repo, data):
         st.warning("Aucun joueur.")
         return
 
+    if st.checkbox("Inclure les saisons archivées", value=False):
+        data = repo.load_history()
+
     rows = build_profile_rows(data)
     df_profiles = pd.DataFrame(rows)
     st.markdown("#### Profils postes (profil de base)")
@@ -73,6 +100,8 @@ def _render_stats(repo, data):
         st.markdown("#### Visualisation rapide – moyenne technique")
         st.bar_chart(agg["Tech"])
 
+    _render_attendance(data)
+
     st.markdown("---")
     st.markdown("#### Dashboard Coach")
 
@@ -81,14 +110,31 @@ def _render_stats(repo, data):
         st.info("Aucune performance de match saisie pour le moment.")
         return
 
-    if not isinstance(df_all["date"].iloc[0], date):
-        df_all["date"] = pd.to_datetime(df_all["date"]).dt.date
+    start, end = _dashboard_period(df_all)
+    # Avec le backend SQLite, la période est filtrée directement en SQL.
+    store = repo if isinstance(repo, SqliteRepository) else None
+    df_all = performances_between(data, start, end, store=store)
+    if df_all.empty:
+        st.info("Aucune performance de match sur cette période.")
+        return
 
-    st.markdown("##### Joueurs en progression / en difficulté (30j vs 30–60j)")
-    _, top_up, top_down = compute_progress_deltas(df_all)
+    st.markdown("##### Joueurs en progression / en difficulté")
+    engine = get_progression_engine(df_all)
+    window_kind = st.selectbox(
+        "Comparer",
+        ["Derniers jours", "Derniers matchs", "Saison en cours"],
+    )
+    if window_kind == "Derniers jours":
+        days = int(st.number_input("Nombre de jours", min_value=7, max_value=365, value=30, step=7))
+        _, top_up, top_down = engine.compare_days(days)
+    elif window_kind == "Derniers matchs":
+        count = int(st.number_input("Nombre de matchs", min_value=1, max_value=20, value=3))
+        _, top_up, top_down = engine.compare_matches(count)
+    else:
+        _, top_up, top_down = engine.compare_season()
 
     if top_up.empty and top_down.empty:
-        st.info("Pas assez de données pour comparer les 30 derniers jours aux 30 jours précédents.")
+        st.info("Pas assez de données pour comparer ces deux périodes.")
     else:
         col1, col2 = st.columns(2)
         with col1:
@@ -98,10 +144,22 @@ def _render_stats(repo, data):
             st.markdown("###### 📉 Joueurs en difficulté")
             st.dataframe(top_down, use_container_width=True)
 
+    st.markdown("###### 📈 Courbe de forme")
+    curves = engine.curves()
+    curve_player = select_player(repo, data, "Joueur (courbe)", key="curve_player")
+    if curve_player is not None:
+        player_curve = curves.loc[curves["player_id"] == curve_player["id"]]
+        if player_curve.empty:
+            st.info("Aucune performance de match pour ce joueur.")
+        else:
+            st.line_chart(
+                player_curve.set_index("date")[["overall", "Moyenne glissante", "Moyenne exponentielle"]]
+            )
+
     st.markdown("---")
     st.markdown("##### ⏱️ Temps de jeu & charge de travail")
 
-    agg_minutes = aggregate_minutes(df_all)
+    agg_minutes = minutes_between(data, start, end, store=store)
     st.dataframe(
         agg_minutes.sort_values("Minutes_totales", ascending=False),
         use_container_width=True,
@@ -130,6 +188,16 @@ def _render_stats(repo, data):
     st.table(top3.set_index("Joueur"))
 
 
+def _dashboard_period(df_all):
+    """Période choisie pour le dashboard : (début, fin), None pour une borne non restreinte."""
+    first, last = df_all["date"].min().date(), df_all["date"].max().date()
+    period = st.date_input("Période analysée", value=(first, last), min_value=first, max_value=last)
+    if not isinstance(period, (tuple, list)) or len(period) != 2:
+        return None, None
+    start, end = period
+    return (start if start > first else None), (end if end < last else None)
+
+
 def render(repo, data):
     st.header("📊 Profils joueurs & analytics")
 
@@ -3,6 +3,8 @@ from datetime import date
 import pandas as pd
 import streamlit as st
 
+from services.grid_entry import attendance_changes, attendance_grid
+
 
 def render(repo, data):
     st.header("🏋️ Entraînements")
@@ -32,8 +34,7 @@ def render(repo, data):
             "notes": notes.strip(),
             "attendances": [],
         }
-        data["trainings"].append(new_training)
-        repo.save_data(data)
+        repo.add_training(data, new_training)
         st.success(f"Séance du {t_date} créée.")
 
     if not data["trainings"]:
@@ -53,11 +54,63 @@ def render(repo, data):
     if training.get("notes"):
         st.markdown(f"**Objectifs / Notes :** {training['notes']}")
 
-    existing = {a["player_id"]: a for a in training.get("attendances", [])}
-
     st.markdown("---")
     st.subheader("Présence & comportement par joueur")
 
+    if st.checkbox("Saisie en grille (tableau éditable)", value=True, key="attendance_grid_mode"):
+        _render_attendance_grid(repo, data, training)
+    else:
+        _render_attendance_form(repo, data, training)
+
+    if training.get("attendances"):
+        st.subheader("Récapitulatif séance")
+
+        table_rows = []
+        for att in training["attendances"]:
+            p = repo.find_player(data, att["player_id"])
+            table_rows.append(
+                {
+                    "Joueur": p["name"] if p else "Inconnu",
+                    "Présent": "Oui" if att["present"] else "Non",
+                    "Effort": att["effort"],
+                    "Concentration": att["focus"],
+                    "Commentaire": att["comment"],
+                }
+            )
+        df = pd.DataFrame(table_rows)
+        st.dataframe(df, use_container_width=True)
+
+
+def _render_attendance_grid(repo, data, training):
+    with st.form("update_attendance_grid"):
+        edited = st.data_editor(
+            attendance_grid(data["players"], training),
+            column_config={
+                "Présent": st.column_config.CheckboxColumn("Présent"),
+                "Effort": st.column_config.NumberColumn("Effort (1-5)", min_value=1, max_value=5, step=1),
+                "Concentration": st.column_config.NumberColumn("Concentration (1-5)", min_value=1, max_value=5, step=1),
+                "Commentaire": st.column_config.TextColumn("Commentaire"),
+            },
+            disabled=["Joueur"],
+            hide_index=True,
+            use_container_width=True,
+            key=f"attendance_grid_{training['id']}",
+        )
+        submit = st.form_submit_button("💾 Enregistrer la séance")
+
+    if submit:
+        changes, errors = attendance_changes(data["players"], training, edited)
+        if errors:
+            st.error("Rien n'a été enregistré :\n\n" + "\n".join(f"- {e}" for e in errors))
+        elif changes:
+            repo.update_attendances(data, training["id"], changes)
+            st.success(f"Séance mise à jour ({len(changes)} joueur(s) modifié(s)).")
+        else:
+            st.info("Aucune modification à enregistrer.")
+
+
+def _render_attendance_form(repo, data, training):
+    existing = {a["player_id"]: a for a in training.get("attendances", [])}
     with st.form("update_attendance"):
         rows = []
         for p in data["players"]:
@@ -105,24 +158,5 @@ def render(repo, data):
                     "comment": comment.strip(),
                 }
             )
-        training["attendances"] = new_attendances
-        repo.save_data(data)
+        repo.set_attendances(data, training["id"], new_attendances)
         st.success("Séance mise à jour.")
-
-    if training.get("attendances"):
-        st.subheader("Récapitulatif séance")
-
-        table_rows = []
-        for att in training["attendances"]:
-            p = repo.find_player(data, att["player_id"])
-            table_rows.append(
-                {
-                    "Joueur": p["name"] if p else "Inconnu",
-                    "Présent": "Oui" if att["present"] else "Non",
-                    "Effort": att["effort"],
-                    "Concentration": att["focus"],
-                    "Commentaire": att["comment"],
-                }
-            )
-        df = pd.DataFrame(table_rows)
-        st.dataframe(df, use_container_width=True)
@@ -0,0 +1,23 @@
+import streamlit as st
+
+
+# Nombre maximal de joueurs proposés dans la liste déroulante.
+MAX_OPTIONS = 50
+
+
+def select_player(repo, data, label, key):
+    """Champ de recherche + liste des joueurs correspondants ; retourne le joueur choisi (ou None).
+
+    Les options viennent de l'index de recherche du repository : rien n'est
+    reconstruit à chaque rerun et les homonymes restent distincts.
+    """
+    index = repo.player_search(data)
+    query = st.text_input(f"{label} – rechercher", key=f"{key}_query", placeholder="Début du nom ou du prénom")
+    matches = index.search(query)
+    if not matches:
+        st.caption("Aucun joueur ne correspond à cette recherche.")
+        return None
+    if len(matches) > MAX_OPTIONS:
+        st.caption(f"{len(matches)} joueurs correspondent : les {MAX_OPTIONS} premiers sont proposés, affine la recherche.")
+    player_id = st.selectbox(label, matches[:MAX_OPTIONS], format_func=index.label, key=key)
+    return repo.find_player(data, player_id)